@@ -0,0 +1,53 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from .database import SQLALCHEMY_DATABASE_URL, engine_options, install_sqlite_pragmas
+
+# Async database configuration for the opt-in async app (app.async_main).
+# The engine is created on first use so the sync app never needs the async
+# driver (aiosqlite) installed.
+
+ASYNC_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+_async_engine = None
+_AsyncSessionLocal = None
+
+
+def get_async_engine():
+    """Return the shared async engine, creating it on first use."""
+    global _async_engine
+    if _async_engine is None:
+        options = engine_options(ASYNC_DATABASE_URL)
+        if "pool_size" in options:
+            # aiosqlite defaults to NullPool; keep connections (and their threads) pooled
+            options["poolclass"] = AsyncAdaptedQueuePool
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL, **options)
+        install_sqlite_pragmas(_async_engine.sync_engine)
+    return _async_engine
+
+
+def get_async_sessionmaker():
+    """Return the shared AsyncSession factory, creating it on first use."""
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        _AsyncSessionLocal = async_sessionmaker(
+            bind=get_async_engine(), class_=AsyncSession, autocommit=False, autoflush=False
+        )
+    return _AsyncSessionLocal
+
+
+async def dispose_async_engine():
+    """Close the shared engine's pooled connections, if it was ever created.
+
+    aiosqlite runs each connection on a non-daemon thread, so an engine left
+    open keeps the process alive after the server has stopped.
+    """
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        engine, _async_engine, _AsyncSessionLocal = _async_engine, None, None
+        await engine.dispose()
+
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
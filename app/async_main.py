@@ -0,0 +1,626 @@
+from fastapi import FastAPI, HTTPException, Depends, status, Path, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from dataclasses import astuple
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from .async_database import dispose_async_engine, get_async_db
+from .models import User, HelpRequest, HelpOffer
+from .schemas import (
+    UserCreate, UserResponse, LoginRequest, LoginResponse,
+    HelpRequestCreate, HelpRequestResponse, HelpRequestStatusUpdate,
+    HelpRequestBatchCreate, UserBatchCreate, BatchResponse, ReputationChange,
+    LeaderboardEntry, UserRank, StatsResponse, RequestSummary,
+    HelpOfferCreate, HelpOfferResponse, SyncResponse
+)
+from .auth import (
+    authenticate_user_async, create_access_token,
+    get_current_user_async, require_admin_async, ACCESS_TOKEN_EXPIRE_MINUTES
+)
+from .pagination import decode_cursor, decode_int_cursor
+from . import (
+    changelog, compression, crud, feed, fieldsets, hashing, leaderboard, notifications, principals,
+    request_status, search, serialization, stats, versioning
+)
+from .versioning import USERS, HELP_REQUESTS
+from .reputation import apply_delta, record_adjustment, delete_user_events
+from .main import app as sync_app, parse_fieldset, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+# Opt-in async variant of the TrustLoop API: uvicorn app.async_main:app
+#
+# Routes run as coroutines on the event loop with SQLAlchemy's async engine
+# instead of occupying Starlette's threadpool. Query logic is shared with the
+# sync app through AsyncSession.run_sync. Any route not redefined here (such as
+# the streaming exports) is served by the sync implementation from app.main;
+# SYNC_ROUTES lists them and the README repeats the list.
+
+app = FastAPI(
+    title="TrustLoop API (async)",
+    description="Community-driven help exchange platform",
+    version="1.0.0"
+)
+
+
+@app.get("/")
+async def read_root():
+    """Root endpoint - API health check."""
+    return {"message": "Welcome to TrustLoop API", "status": "healthy"}
+
+@app.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    """Register a new user."""
+    result = await db.execute(
+        select(User.id).where((User.username == user.username) | (User.email == user.email))
+    )
+    if result.first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username or email already registered"
+        )
+
+    hashed_password = await hashing.pool.hash_async(user.password)
+    db_user = User(
+        username=user.username,
+        email=user.email,
+        password_hash=hashed_password,
+        reputation=0
+    )
+    db.add(db_user)
+    versions = await db.run_sync(versioning.bump_version, USERS)
+    await db.run_sync(changelog.record, changelog.USER, [db_user.id])
+    await db.commit()
+    await db.refresh(db_user)
+    leaderboard.rank_index.apply({db_user.id: db_user.reputation}, versions[USERS])
+
+    return db_user
+
+@app.post("/login", response_model=LoginResponse)
+async def login_user(login_data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    """Login user and return JWT token."""
+    user = await authenticate_user_async(db, login_data.username, login_data.password)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": user.username}, expires_delta=access_token_expires
+    )
+
+    return LoginResponse(
+        access_token=access_token,
+        token_type="bearer",
+        user=UserResponse.model_validate(user)
+    )
+
+@app.post("/requests", response_model=HelpRequestResponse, status_code=status.HTTP_201_CREATED)
+async def create_help_request(
+    request: HelpRequestCreate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new help request (requires authentication)."""
+    creator = UserResponse.model_validate(current_user)
+    db_request = HelpRequest(
+        title=request.title,
+        description=request.description,
+        created_by=creator.id
+    )
+    db.add(db_request)
+    await db.run_sync(versioning.bump_version, HELP_REQUESTS)
+    await db.run_sync(stats.record_created, [db_request])
+    await db.run_sync(changelog.record, changelog.HELP_REQUEST, [db_request.id])
+    await db.commit()
+    await db.refresh(db_request)
+
+    created = HelpRequestResponse(
+        id=db_request.id,
+        title=db_request.title,
+        description=db_request.description,
+        created_by=db_request.created_by,
+        created_at=db_request.created_at,
+        status=db_request.status,
+        creator=creator,
+    )
+    feed.publish_requests(feed.REQUEST_CREATED, [created])
+    return created
+
+@app.post("/requests/batch", response_model=BatchResponse)
+async def create_help_requests_batch(
+    batch: HelpRequestBatchCreate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create many help requests in one transaction (requires authentication)."""
+    results = await db.run_sync(crud.bulk_create_help_requests, current_user.id, batch.items)
+    ids = [result.id for result in results]
+    if results:
+        await db.run_sync(versioning.bump_version, HELP_REQUESTS)
+        await db.run_sync(changelog.record, changelog.HELP_REQUEST, ids)
+    await db.commit()
+    feed.publish_requests(feed.REQUEST_CREATED, await db.run_sync(crud.get_help_requests, ids))
+    return BatchResponse(created=len(results), failed=0, results=results)
+
+@app.get("/requests", response_model=List[HelpRequestResponse])
+async def get_help_requests(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    created_by: Optional[int] = Query(None, gt=0),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    status_filter: Optional[str] = Query(None, alias="status", pattern=request_status.STATUS_PATTERN),
+    fields: Optional[str] = Query(None, max_length=500),
+    expand: Optional[str] = Query(None, max_length=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a page of help requests ordered by (created_at, id), oldest first by default.
+
+    order=desc returns the newest first and status narrows the list to one
+    lifecycle status. fields=id,title,creator.username returns only those
+    fields and expand=creator adds the whole creator. The cursor for the
+    following page is returned in the X-Next-Cursor header.
+    """
+    fieldset = parse_fieldset(fields, fieldsets.HELP_REQUEST_FIELDS, expand, nested=True)
+    not_modified = await db.run_sync(
+        lambda session: versioning.conditional_response(
+            request, response, session, (HELP_REQUESTS, USERS), request.url.query
+        )
+    )
+    if not_modified:
+        return not_modified
+    cached = compression.compressor.cached(request, response)
+    if cached:
+        return cached
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    requests, next_cursor = await db.run_sync(
+        lambda session: crud.list_help_requests(
+            session,
+            limit=limit,
+            after=after,
+            created_by=created_by,
+            created_after=created_after,
+            created_before=created_before,
+            descending=order == "desc",
+            status=status_filter,
+            fieldset=fieldset,
+        )
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    body = serialization.dump(requests)
+    return compression.compressor.respond(request, response, body)
+
+@app.patch("/requests/{request_id}/status", response_model=HelpRequestResponse)
+async def update_help_request_status(
+    update: HelpRequestStatusUpdate,
+    request_id: int = Path(..., gt=0),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Move a help request through its lifecycle (creator only)."""
+    help_request = await db.get(HelpRequest, request_id)
+    if not help_request:
+        raise HTTPException(status_code=404, detail="Help request not found")
+    if help_request.created_by != current_user.id:
+        raise HTTPException(status_code=403, detail="Only the creator can change a request's status")
+    try:
+        await db.run_sync(request_status.change_status, help_request, update.status)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    await db.run_sync(versioning.bump_version, HELP_REQUESTS)
+    await db.run_sync(changelog.record, changelog.HELP_REQUEST, [request_id])
+    await db.commit()
+    updated = await db.run_sync(crud.get_help_request, request_id)
+    feed.publish_requests(feed.REQUEST_UPDATED, [updated])
+    return updated
+
+@app.get("/requests/search", response_model=List[HelpRequestResponse])
+async def search_help_requests(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search over request titles and descriptions, best matches first.
+
+    The offset of the following page is returned in the X-Next-Offset header.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Search requires the SQLite FTS5 index")
+    requests, has_more = await db.run_sync(
+        lambda session: search.search_help_requests(session, q, limit=limit, offset=offset)
+    )
+    if has_more:
+        response.headers["X-Next-Offset"] = str(offset + limit)
+    body = serialization.dump(requests)
+    return compression.compressor.respond(request, response, body)
+
+@app.post(
+    "/requests/{request_id}/offers",
+    response_model=HelpOfferResponse,
+    status_code=status.HTTP_201_CREATED
+)
+async def create_help_offer(
+    offer: HelpOfferCreate,
+    request_id: int = Path(..., gt=0),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Offer to help with a request (requires authentication); its creator is notified."""
+    help_request = await db.get(HelpRequest, request_id)
+    if not help_request:
+        raise HTTPException(status_code=404, detail="Help request not found")
+    # Read before committing, which expires the loaded request
+    requester_id, request_title = help_request.created_by, help_request.title
+    if requester_id == current_user.id:
+        raise HTTPException(status_code=400, detail="You cannot offer help on your own request")
+    db_offer = HelpOffer(request_id=request_id, helper_id=current_user.id, message=offer.message)
+    db.add(db_offer)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="You already offered help on this request")
+    await db.refresh(db_offer)
+    created = HelpOfferResponse(
+        id=db_offer.id,
+        request_id=request_id,
+        helper_id=current_user.id,
+        helper_username=current_user.username,
+        message=db_offer.message,
+        created_at=db_offer.created_at,
+    )
+    notifications.hub.publish(
+        requester_id,
+        {"type": "offer", "request_title": request_title, **created.model_dump(mode="json")},
+    )
+    return created
+
+@app.get("/requests/{request_id}/offers", response_model=List[HelpOfferResponse])
+async def get_help_offers(request_id: int = Path(..., gt=0), db: AsyncSession = Depends(get_async_db)):
+    """Get the offers made on a help request, oldest first."""
+    if not await db.get(HelpRequest, request_id):
+        raise HTTPException(status_code=404, detail="Help request not found")
+    return await db.run_sync(crud.list_help_offers, request_id)
+
+@app.get("/stats", response_model=StatsResponse)
+async def get_stats(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """Help request counts per user, per status and per day, for charts."""
+    not_modified = await db.run_sync(
+        lambda session: versioning.conditional_response(
+            request, response, session, (HELP_REQUESTS, USERS), "stats"
+        )
+    )
+    if not_modified:
+        return not_modified
+    return await db.run_sync(stats.get_stats)
+
+@app.get("/sync", response_model=SyncResponse)
+async def sync_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Changes to users and help requests after the since cursor, oldest first."""
+    return await db.run_sync(changelog.get_changes, since, limit)
+
+@app.get("/users/me", response_model=UserResponse)
+async def read_users_me(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user_async)
+):
+    """Get current user information (requires authentication)."""
+    # The body is the principal, possibly cached, so the ETag covers its fields
+    not_modified = versioning.conditional_content(request, response, "me", *astuple(current_user))
+    if not_modified:
+        return not_modified
+    return current_user
+
+@app.get("/users/me/requests", response_model=List[HelpRequestResponse])
+async def read_my_requests(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a page of the current user's help requests, newest first by default."""
+    not_modified = await db.run_sync(
+        lambda session: versioning.conditional_response(
+            request, response, session, (HELP_REQUESTS, USERS), "me", current_user.id,
+            request.url.query
+        )
+    )
+    if not_modified:
+        return not_modified
+    cached = compression.compressor.cached(request, response)
+    if cached:
+        return cached
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    requests, next_cursor = await db.run_sync(
+        lambda session: crud.list_help_requests(
+            session,
+            limit=limit,
+            after=after,
+            created_by=current_user.id,
+            descending=order == "desc",
+        )
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    body = serialization.dump(requests)
+    return compression.compressor.respond(request, response, body)
+
+@app.get("/users/me/summary", response_model=RequestSummary)
+async def read_my_summary(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the current user's request counts by status and the platform-wide total."""
+    not_modified = await db.run_sync(
+        lambda session: versioning.conditional_response(
+            request, response, session, (HELP_REQUESTS,), "me", current_user.id
+        )
+    )
+    if not_modified:
+        return not_modified
+    return await db.run_sync(stats.get_user_summary, current_user.id)
+
+
+# --- User Management Endpoints ---
+@app.post("/users/batch", response_model=BatchResponse)
+async def create_users_batch(
+    batch: UserBatchCreate,
+    admin: User = Depends(require_admin_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Register many users in one transaction (admin only).
+
+    Items whose username or email is taken get an error result; the rest are created.
+    """
+    results, accepted = await db.run_sync(crud.check_new_users, batch.items)
+    hashes = await hashing.pool.hash_many_async(batch.items[index].password for index in accepted)
+    results = await db.run_sync(crud.insert_new_users, batch.items, results, accepted, hashes)
+    created_ids = [result.id for result in results if result.status == "created"]
+    if created_ids:
+        versions = await db.run_sync(versioning.bump_version, USERS)
+        await db.run_sync(changelog.record, changelog.USER, created_ids)
+    await db.commit()
+    if created_ids:
+        leaderboard.rank_index.apply({user_id: 0 for user_id in created_ids}, versions[USERS])
+    return BatchResponse(
+        created=len(created_ids), failed=len(results) - len(created_ids), results=results
+    )
+
+@app.get("/users", response_model=List[UserResponse])
+async def get_all_users(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = Query("id", pattern="^(id|reputation)$"),
+    q: Optional[str] = Query(None, max_length=100),
+    fields: Optional[str] = Query(None, max_length=500),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a page of registered users, optionally only those whose username starts with q.
+
+    sort=reputation lists the highest reputation first and fields=id,username
+    returns only those fields. The cursor for the following page is returned
+    in the X-Next-Cursor header.
+    """
+    fieldset = parse_fieldset(fields, fieldsets.USER_FIELDS)
+    not_modified = await db.run_sync(
+        lambda session: versioning.conditional_response(
+            request, response, session, (USERS,), request.url.query
+        )
+    )
+    if not_modified:
+        return not_modified
+    cached = compression.compressor.cached(request, response)
+    if cached:
+        return cached
+    after = None
+    if cursor:
+        try:
+            after = decode_int_cursor(cursor, crud.USER_SORT_KEY_LENGTHS[sort])
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    users, next_cursor = await db.run_sync(
+        lambda session: crud.list_users(
+            session, limit=limit, after=after, sort=sort, username_prefix=q, fieldset=fieldset
+        )
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    body = serialization.dump(users)
+    return compression.compressor.respond(request, response, body)
+
+@app.get("/users/leaderboard", response_model=List[LeaderboardEntry])
+async def get_leaderboard(
+    request: Request,
+    response: Response,
+    limit: int = Query(leaderboard.LEADERBOARD_DEFAULT_SIZE, ge=1, le=leaderboard.LEADERBOARD_MAX_SIZE),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the highest-reputation users, best first."""
+    not_modified = await db.run_sync(
+        lambda session: versioning.conditional_response(
+            request, response, session, (USERS,), "leaderboard", limit
+        )
+    )
+    if not_modified:
+        return not_modified
+    return await db.run_sync(leaderboard.top_users, limit)
+
+@app.get("/users/{user_id}", response_model=UserResponse)
+async def get_user(
+    request: Request,
+    response: Response,
+    user_id: int = Path(..., gt=0),
+    fields: Optional[str] = Query(None, max_length=500),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a user by ID; fields=id,username returns only those fields."""
+    fieldset = parse_fieldset(fields, fieldsets.USER_FIELDS)
+    not_modified = await db.run_sync(
+        lambda session: versioning.conditional_response(
+            request, response, session, (USERS,), user_id, request.url.query
+        )
+    )
+    if not_modified:
+        return not_modified
+    if fieldset is not None:
+        user = await db.run_sync(crud.get_user, user_id, fieldset)
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return serialization.object_response(user, response)
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+@app.get("/users/{user_id}/rank", response_model=UserRank)
+async def get_user_rank(user_id: int = Path(..., gt=0), db: AsyncSession = Depends(get_async_db)):
+    """Get a user's leaderboard rank; users with equal reputation share a rank."""
+    rank = await db.run_sync(leaderboard.user_rank, user_id)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return rank
+
+@app.delete("/users/{user_id}", status_code=204)
+async def delete_user(user_id: int = Path(..., gt=0), db: AsyncSession = Depends(get_async_db)):
+    """Delete a user by ID."""
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    await db.run_sync(delete_user_events, user_id)
+    await db.run_sync(crud.delete_user_offers, user_id)
+    deleted_requests = await db.run_sync(crud.delete_user_help_requests, user_id)
+    if deleted_requests:
+        await db.run_sync(versioning.bump_version, HELP_REQUESTS)
+        await db.run_sync(
+            changelog.record, changelog.HELP_REQUEST, deleted_requests, changelog.DELETE
+        )
+    await db.delete(user)
+    versions = await db.run_sync(versioning.bump_version, USERS)
+    await db.run_sync(changelog.record, changelog.USER, [user_id], changelog.DELETE)
+    await db.commit()
+    feed.publish_deleted(deleted_requests)
+    leaderboard.rank_index.apply({user_id: None}, versions[USERS])
+    principals.cache.invalidate_user(user_id)
+    return
+
+@app.put("/users/{user_id}", response_model=UserResponse)
+async def update_user(
+    user_id: int = Path(..., gt=0),
+    username: Optional[str] = None,
+    email: Optional[str] = None,
+    reputation: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update a user's username, email, or reputation."""
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if username:
+        user.username = username
+    if email:
+        user.email = email
+    if reputation is not None:
+        await db.run_sync(record_adjustment, user_id, reputation)
+    try:
+        versions = await db.run_sync(versioning.bump_version, USERS)
+        await db.run_sync(changelog.record, changelog.USER, [user_id])
+        await db.commit()
+        await db.refresh(user)
+        leaderboard.rank_index.apply({user_id: user.reputation}, versions[USERS])
+        principals.cache.invalidate_user(user_id)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Username or email already exists.")
+    return user
+
+@app.post("/users/{user_id}/reputation", response_model=UserResponse)
+async def change_reputation(
+    change: ReputationChange,
+    user_id: int = Path(..., gt=0),
+    moderator: User = Depends(require_admin_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Add a (possibly negative) delta to a user's reputation (admin only)."""
+    applied = await db.run_sync(
+        apply_delta, user_id, change.delta, change.reason, actor_id=moderator.id
+    )
+    if not applied:
+        raise HTTPException(status_code=404, detail="User not found")
+    versions = await db.run_sync(versioning.bump_version, USERS)
+    await db.run_sync(changelog.record, changelog.USER, [user_id])
+    await db.commit()
+    principals.cache.invalidate_user(user_id)
+    user = await db.get(User, user_id, populate_existing=True)
+    leaderboard.rank_index.apply({user_id: user.reputation}, versions[USERS])
+    return user
+
+
+# Serve every remaining route (exports, metrics and anything added later) from the sync
+# app, keeping the sync app's route order so literal paths such as /users/me
+# are still matched before parameterized ones.
+def _route_key(route):
+    return route.path, frozenset(getattr(route, "methods", None) or ())
+
+# Routes served by the sync implementation. /metrics and the event streams
+# never touch the database; the exports stream from a sync session.
+SYNC_ROUTES = frozenset({
+    ("GET", "/metrics"),
+    ("GET", "/requests/stream"),
+    ("WEBSOCKET", "/requests/stream/ws"),
+    ("GET", "/users/me/notifications/stream"),
+    ("GET", "/export/users"),
+    ("GET", "/export/requests"),
+})
+
+_async_routes = {_route_key(route): route for route in app.router.routes}
+app.router.routes[:] = [
+    _async_routes.pop(_route_key(route), route) for route in sync_app.router.routes
+] + list(_async_routes.values())
+
+# Share the sync app's startup and shutdown handlers (background workers, pools)
+app.router.on_startup.extend(sync_app.router.on_startup)
+app.router.on_shutdown.extend(sync_app.router.on_shutdown)
+
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    """Release the async engine's pooled connections and their threads."""
+    await dispose_async_engine()
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8000)
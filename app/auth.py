@@ -3,30 +3,35 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from .database import get_db
+from .async_database import get_async_db
 from .models import User
 from .schemas import TokenData
+from . import hashing, principals
+from .config import settings
 
 # JWT Configuration
 SECRET_KEY = "your-secret-key-here-change-in-production"  # Change this in production!
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Ids of the users allowed to call admin-only endpoints. Ids, unlike
+# usernames, cannot be changed through PUT /users/{id}.
+ADMIN_USER_IDS = settings.admin_user_ids
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a password against its hash on the hashing process pool."""
+    return hashing.pool.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Hash a password."""
-    return pwd_context.hash(password)
+    """Hash a password on the hashing process pool."""
+    return hashing.pool.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token."""
@@ -39,33 +44,82 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Verify JWT token and extract user information."""
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_token(token: str):
+    """Decode a JWT and return its TokenData and expiry time."""
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    username: str = payload.get("sub")
+    if username is None:
+        raise _credentials_exception()
+    expires_at = payload.get("exp")
+    if expires_at is not None:
+        expires_at = datetime.fromtimestamp(expires_at, tz=timezone.utc)
+    return TokenData(username=username), expires_at
+
+def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Verify JWT token and extract user information."""
+    token_data, _ = decode_token(credentials.credentials)
     return token_data
 
-def get_current_user(token_data: TokenData = Depends(verify_token), db: Session = Depends(get_db)):
-    """Get the current authenticated user."""
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)
+):
+    """Get the current authenticated user.
+
+    Returns a detached Principal snapshot; repeat calls with the same token are
+    served from the principal cache without decoding the token or querying.
+    """
+    principal = principals.cache.get(credentials.credentials)
+    if principal is not None:
+        return principal
+    token_data, expires_at = decode_token(credentials.credentials)
+    generation = principals.cache.generation()
     user = db.query(User).filter(User.username == token_data.username).first()
     if user is None:
+        raise _credentials_exception()
+    principal = principals.Principal.from_user(user)
+    principals.cache.put(credentials.credentials, principal, expires_at, generation)
+    return principal
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the current authenticated user (async session)."""
+    principal = principals.cache.get(credentials.credentials)
+    if principal is not None:
+        return principal
+    token_data, expires_at = decode_token(credentials.credentials)
+    generation = principals.cache.generation()
+    result = await db.execute(select(User).where(User.username == token_data.username))
+    user = result.scalars().first()
+    if user is None:
+        raise _credentials_exception()
+    principal = principals.Principal.from_user(user)
+    principals.cache.put(credentials.credentials, principal, expires_at, generation)
+    return principal
+
+def require_admin(current_user=Depends(get_current_user)):
+    """Require the current user's id to be listed in TRUSTLOOP_ADMIN_USER_IDS."""
+    if current_user.id not in ADMIN_USER_IDS:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
         )
-    return user
+    return current_user
+
+async def require_admin_async(current_user=Depends(get_current_user_async)):
+    """require_admin for routes authenticated with an async session."""
+    return require_admin(current_user)
 
 def authenticate_user(db: Session, username: str, password: str):
     """Authenticate a user with username and password."""
@@ -75,3 +129,16 @@ def authenticate_user(db: Session, username: str, password: str):
     if not verify_password(password, user.password_hash):
         return False
     return user
+
+async def authenticate_user_async(db: AsyncSession, username: str, password: str):
+    """Authenticate a user with username and password (async session).
+
+    Password verification runs on the hashing process pool so bcrypt never blocks the event loop.
+    """
+    result = await db.execute(select(User).where(User.username == username))
+    user = result.scalars().first()
+    if not user:
+        return False
+    if not await hashing.pool.verify_async(password, user.password_hash):
+        return False
+    return user
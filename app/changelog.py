@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+from sqlalchemy import delete, exists, func, insert, literal, select
+from sqlalchemy.orm import Session, aliased
+from . import crud
+from .compaction import PeriodicCompactor
+from .config import settings
+from .models import ChangeLogEntry, HelpRequest, TableVersion, User
+from .schemas import ChangeEntry, SyncResponse, UserResponse
+
+# Change log for delta sync.
+# Every write to users or help_requests appends one change_log row per touched
+# entity in its own transaction: "upsert" for inserts and updates, "delete"
+# (a tombstone) for removals. seq is assigned while the write holds SQLite's
+# single writer lock, so seq order is commit order and GET /sync?since=<seq>
+# returns exactly the changes a client has not seen yet.
+#
+# The compactor drops entries superseded by a later entry for the same entity,
+# which every client can skip, and tombstones older than the retention window.
+# Once a tombstone is gone a client that last synced before it could miss the
+# delete, so the highest dropped seq is kept as the horizon and such clients
+# are told to reset and sync again from 0.
+
+USER = "user"
+HELP_REQUEST = "help_request"
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+# table_versions row holding the highest seq of any dropped tombstone
+HORIZON = "change_log_horizon"
+
+
+def record(db: Session, entity: str, entity_ids: Iterable[int], op: str = UPSERT):
+    """Append one entry per entity id; call before committing the write."""
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"entity": entity, "entity_id": entity_id, "op": op, "changed_at": now}
+        for entity_id in entity_ids
+    ]
+    if rows:
+        db.execute(insert(ChangeLogEntry), rows)
+
+
+def get_horizon(db: Session) -> int:
+    return db.scalar(select(TableVersion.version).where(TableVersion.name == HORIZON)) or 0
+
+
+def _raise_horizon(db: Session, seq: int):
+    now = datetime.now(timezone.utc)
+    current = db.scalar(select(TableVersion).where(TableVersion.name == HORIZON))
+    if current is None:
+        db.add(TableVersion(name=HORIZON, version=seq, updated_at=now))
+    elif seq > current.version:
+        current.version = seq
+        current.updated_at = now
+    db.flush()
+
+
+def get_changes(db: Session, since: int, limit: int) -> SyncResponse:
+    """The changes after since, oldest first, with the current state of every upserted entity.
+
+    Only the latest entry per entity within the page is returned. Entities
+    removed after their entry was written are reported as deletes.
+    """
+    reset = SyncResponse(changes=[], next_since=0, has_more=False, reset=True)
+    horizon = get_horizon(db)
+    if 0 < since < horizon:
+        return reset
+    rows = db.execute(
+        select(ChangeLogEntry.seq, ChangeLogEntry.entity, ChangeLogEntry.entity_id, ChangeLogEntry.op)
+        .where(ChangeLogEntry.seq > since)
+        .order_by(ChangeLogEntry.seq)
+        .limit(limit + 1)
+    ).all()
+    if not rows:
+        # A cursor ahead of the log comes from a different (e.g. recreated) database
+        latest = db.scalar(select(func.max(ChangeLogEntry.seq))) or 0
+        if since > max(latest, horizon):
+            return reset
+        return SyncResponse(changes=[], next_since=since, has_more=False)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    latest_entries = {(row.entity, row.entity_id): row for row in rows}
+    entries = sorted(latest_entries.values(), key=lambda row: row.seq)
+
+    def upserted(entity):
+        return [row.entity_id for row in entries if row.entity == entity and row.op == UPSERT]
+
+    user_ids = upserted(USER)
+    users = {}
+    if user_ids:
+        users = {
+            user.id: UserResponse.model_validate(user)
+            for user in db.scalars(select(User).where(User.id.in_(user_ids)))
+        }
+    requests = {
+        help_request.id: help_request
+        for help_request in crud.get_help_requests(db, upserted(HELP_REQUEST))
+    }
+    changes = []
+    for row in entries:
+        user = users.get(row.entity_id) if row.entity == USER else None
+        request = requests.get(row.entity_id) if row.entity == HELP_REQUEST else None
+        op = UPSERT if user or request else DELETE
+        changes.append(
+            ChangeEntry(seq=row.seq, entity=row.entity, id=row.entity_id, op=op, user=user, request=request)
+        )
+    return SyncResponse(changes=changes, next_since=rows[-1].seq, has_more=has_more)
+
+
+def compact_changes(db: Session, retention: timedelta) -> int:
+    """Drop superseded entries and tombstones older than retention. Returns rows removed."""
+    # Only touch entries that existed when compaction started
+    high_water = db.scalar(select(func.max(ChangeLogEntry.seq)))
+    if high_water is None:
+        return 0
+    later = aliased(ChangeLogEntry)
+    superseded = exists().where(
+        later.entity == ChangeLogEntry.entity,
+        later.entity_id == ChangeLogEntry.entity_id,
+        later.seq > ChangeLogEntry.seq,
+        later.seq <= high_water,
+    )
+    removed = db.execute(
+        delete(ChangeLogEntry).where(ChangeLogEntry.seq < high_water, superseded)
+    ).rowcount
+    cutoff = (datetime.now(timezone.utc) - retention).replace(tzinfo=None)
+    old_tombstones = (
+        (ChangeLogEntry.seq <= high_water)
+        & (ChangeLogEntry.op == DELETE)
+        & (ChangeLogEntry.changed_at < cutoff)
+    )
+    dropped_through = db.scalar(select(func.max(ChangeLogEntry.seq)).where(old_tombstones))
+    if dropped_through is not None:
+        _raise_horizon(db, dropped_through)
+        removed += db.execute(delete(ChangeLogEntry).where(old_tombstones)).rowcount
+    return removed
+
+
+def ensure_change_log(engine):
+    """Log every existing user and help request for databases that predate the change log."""
+    with Session(engine) as db:
+        if db.scalar(select(ChangeLogEntry.seq).limit(1)) is not None or get_horizon(db):
+            return
+        now = datetime.now(timezone.utc)
+        for entity, column in ((USER, User.id), (HELP_REQUEST, HelpRequest.id)):
+            db.execute(
+                insert(ChangeLogEntry).from_select(
+                    ["entity", "entity_id", "op", "changed_at"],
+                    select(literal(entity), column, literal(UPSERT), literal(now)).order_by(column),
+                )
+            )
+        db.commit()
+
+
+class ChangeLogCompactor(PeriodicCompactor):
+    """Background thread that periodically runs compact_changes in its own session."""
+
+    name = "change-log-compactor"
+    label = "change log entries"
+
+    def __init__(
+        self,
+        session_factory,
+        interval: float = settings.change_log_compact_interval,
+        retention: timedelta = timedelta(days=settings.change_log_retention_days),
+    ):
+        super().__init__(session_factory, interval, retention)
+
+    def compact(self, db: Session) -> int:
+        return compact_changes(db, self.retention)
@@ -0,0 +1,61 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class PeriodicCompactor(ABC):
+    """Background thread that periodically runs compact in its own session."""
+
+    # Thread name and what the log lines call the removed rows
+    name = "compactor"
+    label = "rows"
+
+    def __init__(self, session_factory, interval: float, retention: timedelta):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.retention = retention
+        self._stop = threading.Event()
+        self._thread = None
+
+    @abstractmethod
+    def compact(self, db: Session) -> int:
+        """Remove what is no longer needed. Returns rows removed."""
+
+    def run_once(self) -> int:
+        db = self.session_factory()
+        try:
+            removed = self.compact(db)
+            db.commit()
+            return removed
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                removed = self.run_once()
+                if removed:
+                    logger.info("Compacted %d %s", removed, self.label)
+            except Exception:
+                logger.exception("Compaction of %s failed", self.label)
+
+    def start(self):
+        """Start compacting every interval seconds; an interval of 0 disables it."""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,182 @@
+import gzip
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from fastapi import Request, Response
+from .config import settings
+
+# Negotiated gzip for list responses, with a cache of ready bodies.
+# List endpoints hand their encoded JSON to respond(), which gzips it when the
+# client sends Accept-Encoding: gzip and the body is at least GZIP_MIN_SIZE
+# bytes. Smaller bodies are sent as they are; gzip framing would eat most of
+# the saving.
+#
+# A list's ETag already covers the table versions and query that shaped it,
+# so (path, ETag) names one exact body. Each such body is kept in an LRU with
+# the headers the route added (e.g. X-Next-Cursor) and, once a client asks for
+# it, its gzipped form. A repeated request for unchanged data is answered from
+# there by cached() right after the version check, skipping the page query,
+# serialization and compression. ETag and Last-Modified always come from that
+# version check, never from the stored entry.
+# A write bumps the version, so the next request misses and stores a new body.
+#
+# The gzipped representation carries a weak ETag, since a strong ETag must
+# differ between content codings; conditional requests compare weakly, so
+# either form revalidates.
+
+GZIP_MIN_SIZE = settings.gzip_min_size
+GZIP_LEVEL = settings.gzip_level
+COMPRESSION_CACHE_SIZE = settings.compression_cache_size
+
+# Set on each request by versioning.conditional_response rather than stored
+VALIDATORS = (b"etag", b"last-modified")
+
+
+def accepts_gzip(request: Request) -> bool:
+    """True if Accept-Encoding allows gzip, explicitly or through *, with q > 0."""
+    weights = {}
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.strip().lower()] = weight
+    return weights.get("gzip", weights.get("*", 0.0)) > 0
+
+
+class _Entry:
+    __slots__ = ("body", "headers", "gzipped")
+
+    def __init__(self, body: bytes, headers: list):
+        self.body = body
+        self.headers = headers
+        self.gzipped: Optional[bytes] = None
+
+
+class ResponseCompressor:
+    """Compresses JSON bodies on demand and caches them by (path, ETag)."""
+
+    def __init__(
+        self,
+        min_size: int = GZIP_MIN_SIZE,
+        level: int = GZIP_LEVEL,
+        max_entries: int = COMPRESSION_CACHE_SIZE,
+    ):
+        self.min_size = min_size
+        self.level = level
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.compressions = 0
+        self.compress_seconds = 0.0
+        self.compressed_responses = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+
+    @staticmethod
+    def _key(request: Request, response: Response) -> Optional[Tuple[str, str]]:
+        etag = response.headers.get("etag")
+        if etag is None:
+            return None
+        return request.url.path, etag
+
+    def cached(self, request: Request, response: Response) -> Optional[Response]:
+        """The stored response for the ETag set on response, or None on a miss."""
+        key = self._key(request, response)
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return self._render(request, response, entry)
+
+    def respond(self, request: Request, response: Response, body: bytes) -> Response:
+        """A JSON response for body with response's headers, stored for reuse if it has an ETag."""
+        entry = _Entry(
+            body, [(name, value) for name, value in response.headers.raw if name not in VALIDATORS]
+        )
+        key = self._key(request, response)
+        if key is not None and self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return self._render(request, response, entry)
+
+    def _render(self, request: Request, response: Response, entry: _Entry) -> Response:
+        validators = [(name, value) for name, value in response.headers.raw if name in VALIDATORS]
+        headers = validators + entry.headers
+        if len(entry.body) < self.min_size:
+            fast = Response(entry.body, media_type="application/json")
+            fast.headers.raw.extend(headers)
+            return fast
+        if not accepts_gzip(request):
+            fast = Response(entry.body, media_type="application/json")
+            fast.headers.raw.extend(headers)
+            fast.headers["Vary"] = "Accept-Encoding"
+            return fast
+        gzipped = entry.gzipped
+        if gzipped is None:
+            started = time.thread_time()
+            gzipped = gzip.compress(entry.body, compresslevel=self.level, mtime=0)
+            elapsed = time.thread_time() - started
+            entry.gzipped = gzipped
+            with self._lock:
+                self.compressions += 1
+                self.compress_seconds += elapsed
+        with self._lock:
+            self.compressed_responses += 1
+            self.bytes_before += len(entry.body)
+            self.bytes_after += len(gzipped)
+        fast = Response(gzipped, media_type="application/json")
+        fast.headers.raw.extend(
+            (name, b"W/" + value if name == b"etag" else value) for name, value in headers
+        )
+        fast.headers["Content-Encoding"] = "gzip"
+        fast.headers["Vary"] = "Accept-Encoding"
+        return fast
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> dict:
+        """Snapshot of cache counters, bytes saved and time spent compressing."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "min_size": self.min_size,
+                "level": self.level,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "compressions": self.compressions,
+                "compress_cpu_seconds": round(self.compress_seconds, 6),
+                "compressed_responses": self.compressed_responses,
+                "bytes_before": self.bytes_before,
+                "bytes_after": self.bytes_after,
+                "bytes_saved": self.bytes_before - self.bytes_after,
+            }
+
+
+# Shared compressor used by the list endpoints
+compressor = ResponseCompressor()
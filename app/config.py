@@ -0,0 +1,114 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional
+
+# Application settings, read once from TRUSTLOOP_* environment variables.
+
+# SQLite pragma profiles applied to every new connection. "production" favours
+# concurrency: WAL lets readers proceed while a writer commits, NORMAL sync is
+# durable across application crashes in WAL mode, and busy_timeout makes
+# writers wait for the lock instead of failing with "database is locked".
+SQLITE_PRAGMA_PROFILES: Dict[str, Dict[str, str]] = {
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": "5000",
+        "cache_size": "-65536",  # negative means KiB, i.e. 64 MiB
+        "mmap_size": "268435456",  # 256 MiB
+        "temp_store": "MEMORY",
+    },
+    # SQLite's built-in defaults
+    "default": {},
+}
+
+# Individual pragma overrides, e.g. TRUSTLOOP_SQLITE_BUSY_TIMEOUT=10000
+SQLITE_PRAGMAS = ("journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size", "temp_store")
+
+
+def _env(name: str, default: Optional[str] = None) -> Optional[str]:
+    return os.environ.get(f"TRUSTLOOP_{name}", default)
+
+
+@dataclass(frozen=True)
+class Settings:
+    database_url: str = "sqlite:///./trustloop.db"
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    sqlite_profile: str = "production"
+    sqlite_pragmas: Dict[str, str] = field(default_factory=dict)
+    hash_workers: int = os.cpu_count() or 1
+    hash_queue_depth: int = 32
+    principal_cache_size: int = 4096
+    principal_cache_ttl: float = 60.0
+    admin_user_ids: FrozenSet[int] = frozenset()
+    batch_max_items: int = 1000
+    reputation_compact_interval: float = 300.0
+    reputation_retention_days: int = 30
+    notification_queue_size: int = 100
+    notification_keepalive: float = 15.0
+    feed_history_size: int = 1000
+    change_log_compact_interval: float = 300.0
+    change_log_retention_days: int = 7
+    gzip_min_size: int = 1024
+    gzip_level: int = 6
+    compression_cache_size: int = 64
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Build settings from the environment, falling back to the defaults above."""
+        defaults = cls()
+        profile = _env("SQLITE_PROFILE", defaults.sqlite_profile)
+        if profile not in SQLITE_PRAGMA_PROFILES:
+            raise ValueError(
+                f"Unknown TRUSTLOOP_SQLITE_PROFILE {profile!r}; "
+                f"expected one of {sorted(SQLITE_PRAGMA_PROFILES)}"
+            )
+        pragmas = dict(SQLITE_PRAGMA_PROFILES[profile])
+        for name in SQLITE_PRAGMAS:
+            value = _env(f"SQLITE_{name.upper()}")
+            if value is not None:
+                pragmas[name] = value
+        return cls(
+            database_url=_env("DATABASE_URL", defaults.database_url),
+            db_pool_size=int(_env("DB_POOL_SIZE", defaults.db_pool_size)),
+            db_max_overflow=int(_env("DB_MAX_OVERFLOW", defaults.db_max_overflow)),
+            db_pool_timeout=float(_env("DB_POOL_TIMEOUT", defaults.db_pool_timeout)),
+            sqlite_profile=profile,
+            sqlite_pragmas=pragmas,
+            hash_workers=int(_env("HASH_WORKERS", defaults.hash_workers)),
+            hash_queue_depth=int(_env("HASH_QUEUE_DEPTH", defaults.hash_queue_depth)),
+            principal_cache_size=int(_env("PRINCIPAL_CACHE_SIZE", defaults.principal_cache_size)),
+            principal_cache_ttl=float(_env("PRINCIPAL_CACHE_TTL", defaults.principal_cache_ttl)),
+            admin_user_ids=frozenset(
+                int(user_id) for user_id in _env("ADMIN_USER_IDS", "").split(",") if user_id.strip()
+            ),
+            batch_max_items=int(_env("BATCH_MAX_ITEMS", defaults.batch_max_items)),
+            reputation_compact_interval=float(
+                _env("REPUTATION_COMPACT_INTERVAL", defaults.reputation_compact_interval)
+            ),
+            reputation_retention_days=int(
+                _env("REPUTATION_RETENTION_DAYS", defaults.reputation_retention_days)
+            ),
+            notification_queue_size=int(
+                _env("NOTIFICATION_QUEUE_SIZE", defaults.notification_queue_size)
+            ),
+            notification_keepalive=float(
+                _env("NOTIFICATION_KEEPALIVE", defaults.notification_keepalive)
+            ),
+            feed_history_size=int(_env("FEED_HISTORY_SIZE", defaults.feed_history_size)),
+            change_log_compact_interval=float(
+                _env("CHANGE_LOG_COMPACT_INTERVAL", defaults.change_log_compact_interval)
+            ),
+            change_log_retention_days=int(
+                _env("CHANGE_LOG_RETENTION_DAYS", defaults.change_log_retention_days)
+            ),
+            gzip_min_size=int(_env("GZIP_MIN_SIZE", defaults.gzip_min_size)),
+            gzip_level=int(_env("GZIP_LEVEL", defaults.gzip_level)),
+            compression_cache_size=int(
+                _env("COMPRESSION_CACHE_SIZE", defaults.compression_cache_size)
+            ),
+        )
+
+
+settings = Settings.from_env()
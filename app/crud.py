@@ -0,0 +1,342 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, delete, insert, or_, select, tuple_
+from sqlalchemy.orm import Session
+from .models import User, HelpRequest, HelpOffer
+from .fieldsets import HELP_REQUEST_FIELDS, USER_FIELDS, FieldSet
+from .pagination import as_naive_utc, encode_cursor, encode_int_cursor
+from .schemas import (
+    UserCreate, HelpRequestCreate, HelpRequestResponse, BatchItemResult,
+    HelpOfferResponse
+)
+from . import hashing, stats
+
+# Read paths that project plain columns instead of hydrating ORM objects.
+# Help requests are fetched together with their creator in a single joined
+# SELECT, so listing N requests costs one statement instead of N + 1. List
+# functions return plain dicts shaped like the response models, ready for the
+# fast JSON path in app.serialization.
+
+USER_COLUMNS = (User.id, User.username, User.email, User.reputation, User.created_at)
+
+HELP_REQUEST_COLUMNS = (
+    HelpRequest.id,
+    HelpRequest.title,
+    HelpRequest.description,
+    HelpRequest.created_by,
+    HelpRequest.created_at,
+    HelpRequest.status,
+    User.id.label("creator_id"),
+    User.username.label("creator_username"),
+    User.email.label("creator_email"),
+    User.reputation.label("creator_reputation"),
+    User.created_at.label("creator_created_at"),
+)
+
+
+def help_request_select(fieldset: Optional[FieldSet] = None):
+    """SELECT of help request columns joined with their creator's columns.
+
+    With a fieldset only its columns (plus id and created_at, which cursors
+    need) are selected, and users is joined only for creator fields.
+    """
+    if fieldset is None:
+        return select(*HELP_REQUEST_COLUMNS).join(User, HelpRequest.created_by == User.id)
+    wanted = set(fieldset.fields) | {"id", "created_at"}
+    columns = [getattr(HelpRequest, name) for name in HELP_REQUEST_FIELDS if name in wanted]
+    columns += [getattr(User, name).label(f"creator_{name}") for name in fieldset.creator]
+    stmt = select(*columns).select_from(HelpRequest)
+    if fieldset.creator:
+        stmt = stmt.join(User, HelpRequest.created_by == User.id)
+    return stmt
+
+
+def help_request_dict(row, fieldset: Optional[FieldSet] = None) -> dict:
+    """A HelpRequestResponse-shaped dict (or its fieldset) from a row of help_request_select()."""
+    if fieldset is not None:
+        item = {name: getattr(row, name) for name in fieldset.fields}
+        if fieldset.creator:
+            item["creator"] = {name: getattr(row, f"creator_{name}") for name in fieldset.creator}
+        return item
+    return {
+        "id": row.id,
+        "title": row.title,
+        "description": row.description,
+        "created_by": row.created_by,
+        "created_at": row.created_at,
+        "status": row.status,
+        "creator": {
+            "id": row.creator_id,
+            "username": row.creator_username,
+            "email": row.creator_email,
+            "reputation": row.creator_reputation,
+            "created_at": row.creator_created_at,
+        },
+    }
+
+
+def build_help_request(row) -> HelpRequestResponse:
+    """Build a HelpRequestResponse from a row of help_request_select()."""
+    return HelpRequestResponse.model_validate(help_request_dict(row))
+
+
+def user_columns(fieldset: Optional[FieldSet] = None, *required: str):
+    """USER_COLUMNS, or only the fieldset's columns plus the required ones."""
+    if fieldset is None:
+        return USER_COLUMNS
+    wanted = set(fieldset.fields) | set(required)
+    return tuple(getattr(User, name) for name in USER_FIELDS if name in wanted)
+
+
+def user_dict(row, fieldset: Optional[FieldSet] = None) -> dict:
+    """A UserResponse-shaped dict (or its fieldset) from a row of user_columns()."""
+    if fieldset is not None:
+        return {name: getattr(row, name) for name in fieldset.fields}
+    return {
+        "id": row.id,
+        "username": row.username,
+        "email": row.email,
+        "reputation": row.reputation,
+        "created_at": row.created_at,
+    }
+
+
+def get_help_request(db: Session, request_id: int) -> Optional[HelpRequestResponse]:
+    """Return one help request with its creator, or None."""
+    row = db.execute(help_request_select().where(HelpRequest.id == request_id)).first()
+    return build_help_request(row) if row else None
+
+
+def get_help_requests(db: Session, request_ids: List[int]) -> List[HelpRequestResponse]:
+    """Return the help requests with the given ids, in id order."""
+    if not request_ids:
+        return []
+    rows = db.execute(
+        help_request_select().where(HelpRequest.id.in_(request_ids)).order_by(HelpRequest.id)
+    ).all()
+    return [build_help_request(row) for row in rows]
+
+
+def list_help_requests(
+    db: Session,
+    limit: int,
+    after: Optional[Tuple[datetime, int]] = None,
+    created_by: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    descending: bool = False,
+    status: Optional[str] = None,
+    fieldset: Optional[FieldSet] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """Return one page of help requests (as dicts) and the cursor for the next page.
+
+    Pages run oldest first, or newest first when descending is set.
+    """
+    stmt = help_request_select(fieldset)
+    if created_by is not None:
+        stmt = stmt.where(HelpRequest.created_by == created_by)
+    if status is not None:
+        stmt = stmt.where(HelpRequest.status == status)
+    if created_after is not None:
+        stmt = stmt.where(HelpRequest.created_at >= as_naive_utc(created_after))
+    if created_before is not None:
+        stmt = stmt.where(HelpRequest.created_at < as_naive_utc(created_before))
+    key = tuple_(HelpRequest.created_at, HelpRequest.id)
+    if after is not None:
+        stmt = stmt.where(key < tuple_(*after) if descending else key > tuple_(*after))
+    if descending:
+        stmt = stmt.order_by(HelpRequest.created_at.desc(), HelpRequest.id.desc())
+    else:
+        stmt = stmt.order_by(HelpRequest.created_at, HelpRequest.id)
+    # Fetch one extra row to learn whether another page exists
+    stmt = stmt.limit(limit + 1)
+    rows = db.execute(stmt).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return [help_request_dict(row, fieldset) for row in rows], next_cursor
+
+
+# Number of values in a users cursor for each sort order
+USER_SORT_KEY_LENGTHS = {"id": 1, "reputation": 2}
+
+
+def list_users(
+    db: Session,
+    limit: int,
+    after: Optional[Tuple[int, ...]] = None,
+    sort: str = "id",
+    username_prefix: Optional[str] = None,
+    fieldset: Optional[FieldSet] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """Return one page of users (as dicts) and the cursor for the next page.
+
+    sort is "id" (oldest account first) or "reputation" (highest first, ties by id).
+    """
+    cursor_columns = ("id", "reputation") if sort == "reputation" else ("id",)
+    stmt = select(*user_columns(fieldset, *cursor_columns))
+    if username_prefix:
+        stmt = stmt.where(User.username.startswith(username_prefix, autoescape=True))
+    if sort == "reputation":
+        if after is not None:
+            reputation, user_id = after
+            stmt = stmt.where(
+                or_(User.reputation < reputation, and_(User.reputation == reputation, User.id > user_id))
+            )
+        stmt = stmt.order_by(User.reputation.desc(), User.id)
+    else:
+        if after is not None:
+            stmt = stmt.where(User.id > after[0])
+        stmt = stmt.order_by(User.id)
+    users = db.execute(stmt.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        last = users[-1]
+        if sort == "reputation":
+            next_cursor = encode_int_cursor(last.reputation, last.id)
+        else:
+            next_cursor = encode_int_cursor(last.id)
+    return [user_dict(row, fieldset) for row in users], next_cursor
+
+
+def get_user(db: Session, user_id: int, fieldset: Optional[FieldSet] = None) -> Optional[dict]:
+    """Return one user as a dict (or its fieldset), or None."""
+    row = db.execute(select(*user_columns(fieldset)).where(User.id == user_id)).first()
+    return user_dict(row, fieldset) if row else None
+
+
+# Bulk write paths: one multi-row INSERT (executemany) per batch instead of a
+# commit and refresh per row. Callers commit.
+
+def bulk_create_help_requests(
+    db: Session, creator_id: int, items: List[HelpRequestCreate]
+) -> List[BatchItemResult]:
+    """Insert all items for creator_id and return one result per item."""
+    if not items:
+        return []
+    rows = [
+        {"title": item.title, "description": item.description, "created_by": creator_id}
+        for item in items
+    ]
+    inserted = db.execute(
+        insert(HelpRequest).returning(
+            HelpRequest.id, HelpRequest.created_by, HelpRequest.created_at, HelpRequest.status,
+            sort_by_parameter_order=True,
+        ),
+        rows,
+    ).all()
+    stats.record_created(db, inserted)
+    return [
+        BatchItemResult(index=index, status="created", id=row.id)
+        for index, row in enumerate(inserted)
+    ]
+
+
+def delete_user_offers(db: Session, user_id: int):
+    """Delete offers made by user_id and offers made on user_id's requests."""
+    own_requests = select(HelpRequest.id).where(HelpRequest.created_by == user_id)
+    db.execute(
+        delete(HelpOffer).where(
+            or_(HelpOffer.helper_id == user_id, HelpOffer.request_id.in_(own_requests))
+        )
+    )
+
+
+def list_help_offers(db: Session, request_id: int) -> List[HelpOfferResponse]:
+    """Offers made on request_id, oldest first, with each helper's username."""
+    rows = db.execute(
+        select(
+            HelpOffer.id,
+            HelpOffer.request_id,
+            HelpOffer.helper_id,
+            User.username.label("helper_username"),
+            HelpOffer.message,
+            HelpOffer.created_at,
+        )
+        .join(User, HelpOffer.helper_id == User.id)
+        .where(HelpOffer.request_id == request_id)
+        .order_by(HelpOffer.id)
+    ).all()
+    return [HelpOfferResponse.model_validate(row, from_attributes=True) for row in rows]
+
+
+def delete_user_help_requests(db: Session, user_id: int) -> List[int]:
+    """Delete every help request created by user_id and uncount it. Returns the removed ids."""
+    rows = db.execute(
+        select(HelpRequest.id, HelpRequest.created_by, HelpRequest.created_at, HelpRequest.status)
+        .where(HelpRequest.created_by == user_id)
+    ).all()
+    if not rows:
+        return []
+    db.execute(delete(HelpRequest).where(HelpRequest.created_by == user_id))
+    stats.record_deleted(db, rows)
+    return [row.id for row in rows]
+
+
+def bulk_create_users(db: Session, items: List[UserCreate]) -> List[BatchItemResult]:
+    """Insert every item whose username and email are free; report the rest as errors.
+
+    Passwords of accepted items are hashed in parallel on the hashing pool.
+    """
+    results, accepted = check_new_users(db, items)
+    hashes = hashing.pool.hash_many(items[index].password for index in accepted)
+    return insert_new_users(db, items, results, accepted, hashes)
+
+
+def check_new_users(
+    db: Session, items: List[UserCreate]
+) -> Tuple[List[Optional[BatchItemResult]], List[int]]:
+    """Error results for items whose username or email is taken, and the indexes of the rest."""
+    usernames = {item.username for item in items}
+    emails = {item.email for item in items}
+    taken = db.execute(
+        select(User.username, User.email).where(
+            or_(User.username.in_(usernames), User.email.in_(emails))
+        )
+    ).all()
+    taken_usernames = {row.username for row in taken}
+    taken_emails = {row.email for row in taken}
+
+    results: List[Optional[BatchItemResult]] = [None] * len(items)
+    accepted = []
+    for index, item in enumerate(items):
+        if item.username in taken_usernames or item.email in taken_emails:
+            results[index] = BatchItemResult(
+                index=index, status="error", detail="Username or email already registered"
+            )
+            continue
+        # Later duplicates within the same batch lose to the first occurrence
+        taken_usernames.add(item.username)
+        taken_emails.add(item.email)
+        accepted.append(index)
+    return results, accepted
+
+
+def insert_new_users(
+    db: Session,
+    items: List[UserCreate],
+    results: List[Optional[BatchItemResult]],
+    accepted: List[int],
+    hashes: List[str],
+) -> List[BatchItemResult]:
+    """Insert the accepted items with their password hashes and fill in their results."""
+    if accepted:
+        rows = [
+            {
+                "username": items[index].username,
+                "email": items[index].email,
+                "password_hash": password_hash,
+                "reputation": 0,
+            }
+            for index, password_hash in zip(accepted, hashes)
+        ]
+        ids = db.scalars(
+            insert(User).returning(User.id, sort_by_parameter_order=True), rows
+        ).all()
+        for index, row_id in zip(accepted, ids):
+            results[index] = BatchItemResult(index=index, status="created", id=row_id)
+    return results
@@ -1,15 +1,66 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateColumn
+from .config import settings
 
 # Database configuration
-SQLALCHEMY_DATABASE_URL = "sqlite:///./trustloop.db"
+SQLALCHEMY_DATABASE_URL = settings.database_url
+
+
+def engine_options(url: str) -> dict:
+    """create_engine keyword arguments for url derived from settings."""
+    url = make_url(url)
+    options = {}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            # In-memory databases use a single-connection pool without overflow
+            return options
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_pre_ping=url.get_backend_name() != "sqlite",
+    )
+    return options
+
+
+def install_sqlite_pragmas(engine, pragmas: dict = None):
+    """Apply the configured pragma profile to every new SQLite connection."""
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = settings.sqlite_pragmas if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def describe_engine(engine) -> dict:
+    """Effective engine settings, with pragma values read back from the database."""
+    description = {
+        "url": engine.url.render_as_string(hide_password=True),
+        "pool": engine.pool.status(),
+    }
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as connection:
+            description["pragmas"] = {
+                name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+                for name in settings.sqlite_pragmas
+            }
+    return description
+
 
 # Create engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}  # Only needed for SQLite
-)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+install_sqlite_pragmas(engine)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -24,3 +75,29 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def ensure_indexes(bind):
+    """Create indexes declared on models that are missing from existing tables."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
+def ensure_columns(bind):
+    """Add columns declared on models that are missing from existing tables.
+
+    Added columns must be nullable or have a server default.
+    """
+    with bind.begin() as connection:
+        # Reflect on the same connection, so a pool of one is enough
+        inspector = inspect(connection)
+        existing_tables = set(inspector.get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                definition = CreateColumn(column).compile(dialect=bind.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {definition}"))
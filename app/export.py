@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+from datetime import datetime
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from .models import User, HelpRequest
+
+# Streaming exports for bulk consumers such as the nightly analytics job.
+# Rows are read from a server-side cursor in fixed-size partitions and written
+# out one chunk at a time, so memory stays flat regardless of table size.
+
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def user_export_select():
+    """Exported user columns; never includes password hashes."""
+    return select(
+        User.id, User.username, User.email, User.reputation, User.created_at
+    ).order_by(User.id)
+
+
+def help_request_export_select():
+    """Exported help request columns, flattened with the creator's username."""
+    return select(
+        HelpRequest.id,
+        HelpRequest.title,
+        HelpRequest.description,
+        HelpRequest.created_by,
+        User.username.label("creator_username"),
+        HelpRequest.created_at,
+        HelpRequest.status,
+    ).join(User, HelpRequest.created_by == User.id).order_by(HelpRequest.id)
+
+
+def _jsonable(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _iter_partitions(db: Session, stmt, chunk_size: int):
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+    try:
+        yield result.keys(), result.partitions()
+    finally:
+        result.close()
+
+
+def iter_ndjson(db: Session, stmt, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """Yield NDJSON text, one chunk per partition of chunk_size rows."""
+    for keys, partitions in _iter_partitions(db, stmt, chunk_size):
+        keys = list(keys)
+        for partition in partitions:
+            yield "".join(
+                json.dumps({key: _jsonable(value) for key, value in zip(keys, row)}) + "\n"
+                for row in partition
+            )
+
+
+def iter_csv(db: Session, stmt, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """Yield CSV text: a header line, then one chunk per partition of chunk_size rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for keys, partitions in _iter_partitions(db, stmt, chunk_size):
+        writer.writerow(list(keys))
+        yield buffer.getvalue()
+        for partition in partitions:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([[_jsonable(value) for value in row] for row in partition])
+            yield buffer.getvalue()
+
+
+def export_response(db: Session, stmt, fmt: str, filename: str) -> StreamingResponse:
+    """Stream the rows of stmt as NDJSON or CSV."""
+    chunks = iter_csv(db, stmt) if fmt == "csv" else iter_ndjson(db, stmt)
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import List, Optional, Set, Tuple
+from .config import settings
+from .notifications import NOTIFICATION_KEEPALIVE, NOTIFICATION_QUEUE_SIZE, Subscriber, subscriber_frames
+from .schemas import HelpRequestResponse
+
+# Live feed of help request changes, delivered over server-sent events or a
+# WebSocket. Write paths publish request_created, request_updated and
+# request_deleted events after they commit. Every event gets an increasing id
+# and the last FEED_HISTORY_SIZE events are kept, so a reconnecting client that
+# sends Last-Event-ID is replayed only the events it missed. A client too far
+# behind (or one whose id predates a restart) gets a reset event instead and
+# should refetch GET /requests.
+#
+# Like the notification hub, the feed is per process.
+
+FEED_HISTORY_SIZE = settings.feed_history_size
+
+REQUEST_CREATED = "request_created"
+REQUEST_UPDATED = "request_updated"
+REQUEST_DELETED = "request_deleted"
+RESET = "reset"
+
+
+class RequestFeed:
+    """Broadcasts request events to every open stream and remembers the most recent ones."""
+
+    def __init__(self, history: int = FEED_HISTORY_SIZE, max_queue: int = NOTIFICATION_QUEUE_SIZE):
+        self.max_queue = max_queue
+        self._history = deque(maxlen=history)
+        self._last_id = 0
+        self._subscribers: Set[Subscriber] = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, event_type: str, **payload) -> dict:
+        """Number, remember and broadcast one event. Returns the event."""
+        with self._lock:
+            self._last_id += 1
+            event = {"id": self._last_id, "type": event_type, **payload}
+            self._history.append(event)
+            self.published += 1
+            # Pushing under the lock keeps every stream in id order
+            self.dropped += sum(subscriber.push(event) for subscriber in self._subscribers)
+        return event
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Tuple[Subscriber, List[dict]]:
+        """Open a stream; returns it with the events after last_event_id to send first."""
+        subscriber = Subscriber(None, self.max_queue, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscriber)
+            backlog = self._backlog(last_event_id)
+        return subscriber, backlog
+
+    def _backlog(self, last_event_id: Optional[int]) -> List[dict]:
+        if last_event_id is None or last_event_id == self._last_id:
+            return []
+        oldest = self._history[0]["id"] if self._history else self._last_id + 1
+        if last_event_id > self._last_id or last_event_id < oldest - 1:
+            return [{"id": self._last_id, "type": RESET}]
+        return [event for event in self._history if event["id"] > last_event_id]
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def clear(self):
+        """Forget remembered events and restart numbering (for tests)."""
+        with self._lock:
+            self._history.clear()
+            self._last_id = 0
+
+    def metrics(self) -> dict:
+        """Snapshot of open streams, remembered events and delivery counters."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            return {
+                "subscribers": len(subscribers),
+                "history": len(self._history),
+                "last_event_id": self._last_id,
+                "published": self.published,
+                "dropped": self.dropped,
+                "pending": sum(s.pending() for s in subscribers),
+            }
+
+
+def publish_requests(event_type: str, requests: List[HelpRequestResponse]):
+    """Publish one created or updated event per request."""
+    for help_request in requests:
+        feed.publish(event_type, request=help_request.model_dump(mode="json"))
+
+
+def publish_deleted(request_ids: List[int]):
+    """Publish one deleted event per request id."""
+    for request_id in request_ids:
+        feed.publish(REQUEST_DELETED, request_id=request_id)
+
+
+async def event_stream(request, last_event_id: Optional[int], keepalive: float = NOTIFICATION_KEEPALIVE):
+    """Yield missed and then live request events as SSE frames until the client disconnects."""
+    subscriber, backlog = feed.subscribe(last_event_id)
+    try:
+        async for frame in subscriber_frames(request, subscriber, keepalive, backlog):
+            yield frame
+    finally:
+        feed.unsubscribe(subscriber)
+
+
+async def websocket_stream(websocket, last_event_id: Optional[int]):
+    """Send missed and then live request events as JSON text messages until the client disconnects."""
+    await websocket.accept()
+    subscriber, backlog = feed.subscribe(last_event_id)
+    receive = asyncio.ensure_future(websocket.receive())
+    try:
+        for event in backlog:
+            await websocket.send_text(json.dumps(event))
+        while True:
+            get = asyncio.ensure_future(subscriber.get())
+            await asyncio.wait({get, receive}, return_when=asyncio.FIRST_COMPLETED)
+            if get.done():
+                await websocket.send_text(json.dumps(get.result()))
+            else:
+                get.cancel()
+            if receive.done():
+                if receive.result()["type"] == "websocket.disconnect":
+                    break
+                # Messages from the client are ignored
+                receive = asyncio.ensure_future(websocket.receive())
+    finally:
+        receive.cancel()
+        feed.unsubscribe(subscriber)
+
+
+# Shared feed used by app.main
+feed = RequestFeed()
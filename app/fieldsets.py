@@ -0,0 +1,58 @@
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+# Sparse fieldsets for read endpoints.
+# fields=id,title,creator.username picks the response fields and expand=creator
+# adds the whole nested creator. Read paths select only the chosen columns and
+# skip the users join when no creator field is wanted, so a smaller payload is
+# also a smaller query.
+
+HELP_REQUEST_FIELDS = ("id", "title", "description", "created_by", "created_at", "status")
+USER_FIELDS = ("id", "username", "email", "reputation", "created_at")
+
+# Nested objects that can be expanded, with the fields each one offers
+EXPANSIONS = {"creator": USER_FIELDS}
+
+
+class FieldSet(NamedTuple):
+    fields: Tuple[str, ...]
+    # Fields of the nested creator; empty when the creator is left out
+    creator: Tuple[str, ...] = ()
+
+
+def _names(value: Optional[str]) -> list:
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+def parse_fieldset(
+    fields: Optional[str], allowed: Sequence[str], expand: Optional[str] = None, nested: bool = False
+) -> Optional[FieldSet]:
+    """Parse fields= and expand= values; None means the full representation.
+
+    nested allows creator, creator.<field> and expand=creator. Raises ValueError
+    for unknown names.
+    """
+    expansions = _names(expand)
+    for name in expansions:
+        if not nested or name not in EXPANSIONS:
+            raise ValueError(f"Cannot expand {name!r}")
+    if fields is None:
+        # expand=creator alone is the full representation, which includes the creator
+        return None
+    names = _names(fields)
+    if not names:
+        raise ValueError("fields must name at least one field")
+    chosen = set()
+    creator = set(EXPANSIONS["creator"]) if expansions else set()
+    for name in names:
+        if name in allowed:
+            chosen.add(name)
+        elif nested and name == "creator":
+            creator.update(EXPANSIONS["creator"])
+        elif nested and name.startswith("creator.") and name[len("creator."):] in EXPANSIONS["creator"]:
+            creator.add(name[len("creator."):])
+        else:
+            raise ValueError(f"Unknown field {name!r}")
+    return FieldSet(
+        fields=tuple(name for name in allowed if name in chosen),
+        creator=tuple(name for name in EXPANSIONS["creator"] if name in creator),
+    )
@@ -0,0 +1,211 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from .config import settings
+
+# Password hashing on a dedicated, bounded process pool.
+# bcrypt is deliberately slow; running it in worker processes keeps it off the
+# request threads and outside the GIL. At most HASH_WORKERS jobs run while up to
+# HASH_QUEUE_DEPTH more wait; anything beyond that is rejected immediately with
+# a 503 instead of piling up behind a login storm.
+
+HASH_WORKERS = settings.hash_workers
+HASH_QUEUE_DEPTH = settings.hash_queue_depth
+
+# Password hashing
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash(password: str):
+    started = time.time()
+    hashed = pwd_context.hash(password)
+    return hashed, started, time.time()
+
+
+def _verify(plain_password: str, hashed_password: str):
+    started = time.time()
+    valid = pwd_context.verify(plain_password, hashed_password)
+    return valid, started, time.time()
+
+
+class HashingPool:
+    """Bounded ProcessPoolExecutor for bcrypt with queue-wait and hash-time metrics.
+
+    With max_workers=0 hashing runs inline in the calling thread.
+    """
+
+    def __init__(self, max_workers: int = HASH_WORKERS, queue_depth: int = HASH_QUEUE_DEPTH):
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self._slots = threading.BoundedSemaphore(max(max_workers, 1) + queue_depth)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._completed = 0
+        self._rejected = 0
+        self._in_flight = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        self._hash_time_total = 0.0
+        self._hash_time_max = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn avoids forking a server process that already runs threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _record(self, submitted: float, started: float, finished: float):
+        with self._lock:
+            self._completed += 1
+            queue_wait = max(started - submitted, 0.0)
+            hash_time = finished - started
+            self._queue_wait_total += queue_wait
+            self._queue_wait_max = max(self._queue_wait_max, queue_wait)
+            self._hash_time_total += hash_time
+            self._hash_time_max = max(self._hash_time_max, hash_time)
+
+    def _done(self, future: Future, submitted: float):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+        if not future.cancelled() and future.exception() is None:
+            _, started, finished = future.result()
+            self._record(submitted, started, finished)
+
+    def _acquire_slot(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent password operations, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+    def submit(self, fn, *args) -> Future:
+        """Queue fn(*args) on the pool, or raise 503 if the queue is full."""
+        self._acquire_slot()
+        submitted = time.time()
+        with self._lock:
+            self._in_flight += 1
+        future = Future()
+        try:
+            if self.max_workers == 0:
+                future.set_result(fn(*args))
+            else:
+                future = self._get_executor().submit(fn, *args)
+        except BaseException as exc:
+            if not future.done():
+                future.set_exception(exc)
+        future.add_done_callback(lambda f: self._done(f, submitted))
+        return future
+
+    def hash(self, password: str) -> str:
+        """Hash a password on the pool, blocking the calling thread until done."""
+        return self.submit(_hash, password).result()[0]
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the pool, blocking the calling thread until done."""
+        return self.submit(_verify, plain_password, hashed_password).result()[0]
+
+    def hash_many(self, passwords) -> list:
+        """Hash a batch of passwords, at most batch_width at a time.
+
+        The executor runs jobs in submission order, so a batch queued all at
+        once would make every login behind it wait for the whole batch. With at
+        most max_workers - 1 batch jobs outstanding, a worker is always left for
+        interactive hashes. The batch takes a single queue slot.
+        """
+        passwords = list(passwords)
+        if not passwords:
+            return []
+        self._acquire_slot()
+        with self._lock:
+            self._in_flight += len(passwords)
+        try:
+            if self.max_workers == 0:
+                submitted = time.time()
+                results = [_hash(password) for password in passwords]
+                for _, started, finished in results:
+                    self._record(submitted, started, finished)
+            else:
+                results = self._hash_windowed(passwords)
+        finally:
+            with self._lock:
+                self._in_flight -= len(passwords)
+            self._slots.release()
+        return [hashed for hashed, _, _ in results]
+
+    @property
+    def batch_width(self) -> int:
+        """Most batch jobs hash_many keeps on the executor at once."""
+        return max(1, self.max_workers - 1)
+
+    def _hash_windowed(self, passwords: list) -> list:
+        executor = self._get_executor()
+        results = [None] * len(passwords)
+        pending = {}
+        for index, password in enumerate(passwords):
+            if len(pending) >= self.batch_width:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._collect(future, pending.pop(future), results)
+            pending[executor.submit(_hash, password)] = (index, time.time())
+        for future in wait(pending).done:
+            self._collect(future, pending[future], results)
+        return results
+
+    def _collect(self, future: Future, job: tuple, results: list):
+        index, submitted = job
+        results[index] = future.result()
+        _, started, finished = results[index]
+        self._record(submitted, started, finished)
+
+    async def hash_async(self, password: str) -> str:
+        """Hash a password on the pool without blocking the event loop."""
+        result = await asyncio.wrap_future(self.submit(_hash, password))
+        return result[0]
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the pool without blocking the event loop."""
+        result = await asyncio.wrap_future(self.submit(_verify, plain_password, hashed_password))
+        return result[0]
+
+    async def hash_many_async(self, passwords) -> list:
+        """hash_many without blocking the event loop while the batch is windowed."""
+        return await asyncio.to_thread(self.hash_many, list(passwords))
+
+    def metrics(self) -> dict:
+        """Snapshot of pool size, backlog and timing counters (times in milliseconds)."""
+        with self._lock:
+            completed = self._completed or 1
+            return {
+                "workers": self.max_workers,
+                "queue_depth": self.queue_depth,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "queue_wait_avg_ms": round(self._queue_wait_total / completed * 1000, 3),
+                "queue_wait_max_ms": round(self._queue_wait_max * 1000, 3),
+                "hash_time_avg_ms": round(self._hash_time_total / completed * 1000, 3),
+                "hash_time_max_ms": round(self._hash_time_max * 1000, 3),
+            }
+
+    def shutdown(self):
+        """Stop the worker processes; the pool restarts them on next use."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+# Shared pool used by app.auth
+pool = HashingPool()
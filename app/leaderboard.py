@@ -0,0 +1,144 @@
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from .models import User
+from .schemas import LeaderboardEntry, UserRank
+from .versioning import USERS, get_versions
+
+# Reputation leaderboard and rank lookups.
+# The top of the board is read straight from the (reputation DESC, id) index.
+# Ranks come from an in-process sorted list of (-reputation, id) keys, so a
+# lookup is two binary searches instead of a COUNT(*) over the users table.
+#
+# The list is tagged with the users table version it reflects. Writers apply
+# their change together with the version they committed; a reader that finds a
+# different version in the database (another process wrote, or an update was
+# missed) rebuilds the list with one SELECT before answering.
+
+LEADERBOARD_DEFAULT_SIZE = 10
+LEADERBOARD_MAX_SIZE = 100
+
+
+class RankIndex:
+    """Thread-safe sorted index of user reputations with O(log n) rank lookups.
+
+    Ranks use competition ranking: users with equal reputation share a rank,
+    which is one more than the number of users with a strictly higher one.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[int, int]] = []
+        self._reputation: Dict[int, int] = {}
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+        self.updates = 0
+
+    def _discard(self, user_id: int):
+        reputation = self._reputation.pop(user_id, None)
+        if reputation is not None:
+            key = (-reputation, user_id)
+            position = bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+
+    def _set(self, user_id: int, reputation: Optional[int]):
+        self._discard(user_id)
+        if reputation is not None:
+            self._reputation[user_id] = reputation
+            insort(self._keys, (-reputation, user_id))
+
+    def load(self, rows, version: int):
+        """Replace the contents with (id, reputation) rows taken at version."""
+        keys = sorted((-(reputation or 0), user_id) for user_id, reputation in rows)
+        with self._lock:
+            self._keys = keys
+            self._reputation = {user_id: -negated for negated, user_id in keys}
+            self._version = version
+            self.rebuilds += 1
+
+    def apply(self, changes: Dict[int, Optional[int]], version: int):
+        """Apply {user_id: reputation} committed as users table version; None deletes.
+
+        A change that does not directly follow the indexed version marks the
+        index stale so the next reader rebuilds it.
+        """
+        with self._lock:
+            if self._version is None or version != self._version + 1:
+                self._version = None
+                return
+            for user_id, reputation in changes.items():
+                self._set(user_id, reputation)
+            self._version = version
+            self.updates += 1
+
+    def ensure_current(self, db: Session):
+        """Rebuild from the database unless the index matches the users table version."""
+        version = get_versions(db, USERS)[USERS][0]
+        with self._lock:
+            if self._version == version:
+                return
+        # Read rows after the version: they are at least as new as the tag
+        rows = db.execute(select(User.id, User.reputation)).all()
+        self.load(rows, version)
+
+    def rank(self, user_id: int) -> Optional[UserRank]:
+        """Rank of user_id, or None if the user is not indexed."""
+        with self._lock:
+            reputation = self._reputation.get(user_id)
+            if reputation is None:
+                return None
+            higher = bisect_left(self._keys, (-reputation,))
+            return UserRank(
+                user_id=user_id,
+                reputation=reputation,
+                rank=higher + 1,
+                total_users=len(self._keys),
+            )
+
+    def clear(self):
+        """Drop all entries; the next reader rebuilds."""
+        with self._lock:
+            self._keys = []
+            self._reputation = {}
+            self._version = None
+
+    def metrics(self) -> dict:
+        """Snapshot of size, indexed version and maintenance counters."""
+        with self._lock:
+            return {
+                "size": len(self._keys),
+                "version": self._version,
+                "rebuilds": self.rebuilds,
+                "updates": self.updates,
+            }
+
+
+def top_users(db: Session, limit: int) -> List[LeaderboardEntry]:
+    """Highest-reputation users first, ties broken by id."""
+    rows = db.execute(
+        select(User.id, User.username, User.reputation)
+        .order_by(User.reputation.desc(), User.id)
+        .limit(limit)
+    ).all()
+    entries = []
+    for position, row in enumerate(rows, start=1):
+        rank = position
+        if entries and entries[-1].reputation == row.reputation:
+            rank = entries[-1].rank
+        entries.append(
+            LeaderboardEntry(rank=rank, id=row.id, username=row.username, reputation=row.reputation)
+        )
+    return entries
+
+
+def user_rank(db: Session, user_id: int) -> Optional[UserRank]:
+    """Rank of user_id from the shared index, refreshing it first if it is stale."""
+    rank_index.ensure_current(db)
+    return rank_index.rank(user_id)
+
+
+# Shared index used by app.main
+rank_index = RankIndex()
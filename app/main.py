@@ -1,22 +1,43 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Path
+import logging
+from dataclasses import astuple
+from fastapi import (
+    FastAPI, HTTPException, Depends, status, Path, Query, Header, Request, Response, WebSocket
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from datetime import timedelta
+from datetime import datetime, timedelta
 from typing import List, Optional
 
 
-from .database import get_db, engine
-from .models import Base, User, HelpRequest
+from .database import get_db, engine, ensure_columns, ensure_indexes, describe_engine, SessionLocal
+from .config import settings
+from .models import Base, User, HelpRequest, HelpOffer
 from .schemas import (
     UserCreate, UserResponse, LoginRequest, LoginResponse,
-    HelpRequestCreate, HelpRequestResponse
+    HelpRequestCreate, HelpRequestResponse, HelpRequestStatusUpdate,
+    HelpRequestBatchCreate, UserBatchCreate, BatchResponse, ReputationChange,
+    LeaderboardEntry, UserRank, StatsResponse, RequestSummary,
+    HelpOfferCreate, HelpOfferResponse, SyncResponse
 )
 from .auth import (
     get_password_hash, authenticate_user, create_access_token,
-    get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
+    get_current_user, require_admin, ACCESS_TOKEN_EXPIRE_MINUTES
+)
+from .pagination import decode_cursor, decode_int_cursor
+from . import (
+    changelog, compression, crud, export, feed, fieldsets, hashing, leaderboard, notifications,
+    principals, request_status, search, serialization, stats, versioning
+)
+from .versioning import USERS, HELP_REQUESTS
+from .reputation import (
+    apply_delta, record_adjustment, delete_user_events, ReputationCompactor
 )
 from sqlalchemy.exc import IntegrityError
 
 
+# Log through uvicorn's logger so startup messages appear alongside its own
+logger = logging.getLogger("uvicorn.error")
+
 # FastAPI app
 app = FastAPI(
     title="TrustLoop API",
@@ -26,6 +47,74 @@ app = FastAPI(
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+ensure_columns(engine)
+ensure_indexes(engine)
+search.ensure_search_index(engine)
+stats.ensure_stats(engine)
+changelog.ensure_change_log(engine)
+
+# Background job folding old reputation events
+reputation_compactor = ReputationCompactor(SessionLocal)
+
+# Background job dropping superseded change log entries and old tombstones
+change_log_compactor = changelog.ChangeLogCompactor(SessionLocal)
+
+# Page size limits for list endpoints
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def parse_fieldset(fields, allowed, expand=None, nested=False):
+    """fieldsets.parse_fieldset, answering 400 for unknown fields."""
+    try:
+        return fieldsets.parse_fieldset(fields, allowed, expand, nested=nested)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@app.on_event("startup")
+def log_database_settings():
+    """Report the effective database engine settings."""
+    description = describe_engine(engine)
+    logger.info(
+        "Database %s (pool size=%d, max overflow=%d, %s; SQLite profile %r, pragmas %s)",
+        description["url"],
+        settings.db_pool_size,
+        settings.db_max_overflow,
+        description["pool"],
+        settings.sqlite_profile,
+        description.get("pragmas", {}),
+    )
+
+
+@app.on_event("startup")
+def start_reputation_compactor():
+    """Start folding old reputation events in the background."""
+    reputation_compactor.start()
+
+
+@app.on_event("startup")
+def start_change_log_compactor():
+    """Start compacting the change log in the background."""
+    change_log_compactor.start()
+
+
+@app.on_event("shutdown")
+def shutdown_hashing_pool():
+    """Stop the password hashing worker processes."""
+    hashing.pool.shutdown()
+
+
+@app.on_event("shutdown")
+def stop_reputation_compactor():
+    """Stop the reputation compactor thread."""
+    reputation_compactor.stop()
+
+
+@app.on_event("shutdown")
+def stop_change_log_compactor():
+    """Stop the change log compactor thread."""
+    change_log_compactor.stop()
 
 
 @app.get("/")
@@ -33,6 +122,18 @@ def read_root():
     """Root endpoint - API health check."""
     return {"message": "Welcome to TrustLoop API", "status": "healthy"}
 
+@app.get("/metrics")
+def read_metrics():
+    """Runtime metrics for in-process subsystems."""
+    return {
+        "password_hashing": hashing.pool.metrics(),
+        "principal_cache": principals.cache.metrics(),
+        "rank_index": leaderboard.rank_index.metrics(),
+        "notifications": notifications.hub.metrics(),
+        "request_feed": feed.feed.metrics(),
+        "compression": compression.compressor.metrics(),
+    }
+
 @app.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def register_user(user: UserCreate, db: Session = Depends(get_db)):
     """Register a new user."""
@@ -55,8 +156,11 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
         reputation=0
     )
     db.add(db_user)
+    versions = versioning.bump_version(db, USERS)
+    changelog.record(db, changelog.USER, [db_user.id])
     db.commit()
     db.refresh(db_user)
+    leaderboard.rank_index.apply({db_user.id: db_user.reputation}, versions[USERS])
     
     return db_user
 
@@ -95,50 +199,472 @@ def create_help_request(
         created_by=current_user.id
     )
     db.add(db_request)
+    versioning.bump_version(db, HELP_REQUESTS)
+    stats.record_created(db, [db_request])
+    changelog.record(db, changelog.HELP_REQUEST, [db_request.id])
     db.commit()
     db.refresh(db_request)
+    created = HelpRequestResponse.model_validate(db_request)
+    feed.publish_requests(feed.REQUEST_CREATED, [created])
     
-    return db_request
+    return created
+
+@app.post("/requests/batch", response_model=BatchResponse)
+def create_help_requests_batch(
+    batch: HelpRequestBatchCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Create many help requests in one transaction (requires authentication)."""
+    results = crud.bulk_create_help_requests(db, current_user.id, batch.items)
+    if results:
+        versioning.bump_version(db, HELP_REQUESTS)
+        changelog.record(db, changelog.HELP_REQUEST, [result.id for result in results])
+    db.commit()
+    feed.publish_requests(
+        feed.REQUEST_CREATED, crud.get_help_requests(db, [result.id for result in results])
+    )
+    return BatchResponse(created=len(results), failed=0, results=results)
 
 @app.get("/requests", response_model=List[HelpRequestResponse])
-def get_help_requests(db: Session = Depends(get_db)):
-    """Get all help requests with user information."""
-    requests = db.query(HelpRequest).all()
-    return requests
+def get_help_requests(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    created_by: Optional[int] = Query(None, gt=0),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    status_filter: Optional[str] = Query(None, alias="status", pattern=request_status.STATUS_PATTERN),
+    fields: Optional[str] = Query(None, max_length=500),
+    expand: Optional[str] = Query(None, max_length=100),
+    db: Session = Depends(get_db)
+):
+    """Get a page of help requests ordered by (created_at, id), oldest first by default.
+
+    order=desc returns the newest first and status narrows the list to one
+    lifecycle status. fields=id,title,creator.username returns only those
+    fields and expand=creator adds the whole creator. The cursor for the
+    following page is returned in the X-Next-Cursor header.
+    """
+    fieldset = parse_fieldset(fields, fieldsets.HELP_REQUEST_FIELDS, expand, nested=True)
+    not_modified = versioning.conditional_response(
+        request, response, db, (HELP_REQUESTS, USERS), request.url.query
+    )
+    if not_modified:
+        return not_modified
+    cached = compression.compressor.cached(request, response)
+    if cached:
+        return cached
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    requests, next_cursor = crud.list_help_requests(
+        db,
+        limit=limit,
+        after=after,
+        created_by=created_by,
+        created_after=created_after,
+        created_before=created_before,
+        descending=order == "desc",
+        status=status_filter,
+        fieldset=fieldset,
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    body = serialization.dump(requests)
+    return compression.compressor.respond(request, response, body)
+
+@app.patch("/requests/{request_id}/status", response_model=HelpRequestResponse)
+def update_help_request_status(
+    update: HelpRequestStatusUpdate,
+    request_id: int = Path(..., gt=0),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Move a help request through its lifecycle (creator only).
+
+    open -> in_progress | helped | closed, in_progress -> open | helped | closed,
+    helped -> closed and closed -> open.
+    """
+    help_request = db.get(HelpRequest, request_id)
+    if not help_request:
+        raise HTTPException(status_code=404, detail="Help request not found")
+    if help_request.created_by != current_user.id:
+        raise HTTPException(status_code=403, detail="Only the creator can change a request's status")
+    try:
+        request_status.change_status(db, help_request, update.status)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    versioning.bump_version(db, HELP_REQUESTS)
+    changelog.record(db, changelog.HELP_REQUEST, [request_id])
+    db.commit()
+    updated = crud.get_help_request(db, request_id)
+    feed.publish_requests(feed.REQUEST_UPDATED, [updated])
+    return updated
+
+@app.get("/requests/search", response_model=List[HelpRequestResponse])
+def search_help_requests(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Full-text search over request titles and descriptions, best matches first.
+
+    The offset of the following page is returned in the X-Next-Offset header.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Search requires the SQLite FTS5 index")
+    requests, has_more = search.search_help_requests(db, q, limit=limit, offset=offset)
+    if has_more:
+        response.headers["X-Next-Offset"] = str(offset + limit)
+    body = serialization.dump(requests)
+    return compression.compressor.respond(request, response, body)
+
+def resume_from(last_event_id: Optional[int], last_event_id_header: Optional[str]) -> Optional[int]:
+    """The event id a feed client resumes after: the Last-Event-ID header, else the query value."""
+    if last_event_id_header is None:
+        return last_event_id
+    try:
+        return int(last_event_id_header)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+
+@app.get("/requests/stream")
+async def stream_help_requests(
+    request: Request,
+    last_event_id: Optional[int] = Query(None, ge=0),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """Server-sent events for created, updated and deleted help requests.
+
+    A reconnecting client (Last-Event-ID header or last_event_id query) is first
+    sent the events it missed, or a reset event when they are no longer kept.
+    """
+    return StreamingResponse(
+        feed.event_stream(request, resume_from(last_event_id, last_event_id_header)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.websocket("/requests/stream/ws")
+async def stream_help_requests_ws(websocket: WebSocket, last_event_id: Optional[int] = Query(None, ge=0)):
+    """The request feed as WebSocket JSON messages, resuming after last_event_id."""
+    await feed.websocket_stream(websocket, last_event_id)
+
+@app.post(
+    "/requests/{request_id}/offers",
+    response_model=HelpOfferResponse,
+    status_code=status.HTTP_201_CREATED
+)
+def create_help_offer(
+    offer: HelpOfferCreate,
+    request_id: int = Path(..., gt=0),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Offer to help with a request (requires authentication); its creator is notified."""
+    help_request = db.get(HelpRequest, request_id)
+    if not help_request:
+        raise HTTPException(status_code=404, detail="Help request not found")
+    if help_request.created_by == current_user.id:
+        raise HTTPException(status_code=400, detail="You cannot offer help on your own request")
+    db_offer = HelpOffer(request_id=request_id, helper_id=current_user.id, message=offer.message)
+    db.add(db_offer)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="You already offered help on this request")
+    db.refresh(db_offer)
+    created = HelpOfferResponse(
+        id=db_offer.id,
+        request_id=request_id,
+        helper_id=current_user.id,
+        helper_username=current_user.username,
+        message=db_offer.message,
+        created_at=db_offer.created_at,
+    )
+    notifications.hub.publish(
+        help_request.created_by,
+        {"type": "offer", "request_title": help_request.title, **created.model_dump(mode="json")},
+    )
+    return created
+
+@app.get("/requests/{request_id}/offers", response_model=List[HelpOfferResponse])
+def get_help_offers(request_id: int = Path(..., gt=0), db: Session = Depends(get_db)):
+    """Get the offers made on a help request, oldest first."""
+    if not db.get(HelpRequest, request_id):
+        raise HTTPException(status_code=404, detail="Help request not found")
+    return crud.list_help_offers(db, request_id)
+
+@app.get("/stats", response_model=StatsResponse)
+def get_stats(request: Request, response: Response, db: Session = Depends(get_db)):
+    """Help request counts per user, per status and per day, for charts."""
+    not_modified = versioning.conditional_response(
+        request, response, db, (HELP_REQUESTS, USERS), "stats"
+    )
+    if not_modified:
+        return not_modified
+    return stats.get_stats(db)
+
+@app.get("/sync", response_model=SyncResponse)
+def sync_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Changes to users and help requests after the since cursor, oldest first.
+
+    Pass next_since back as since to continue. reset=true means the local copy
+    can no longer be brought up to date: discard it and sync again from 0.
+    """
+    return changelog.get_changes(db, since, limit)
 
 @app.get("/users/me", response_model=UserResponse)
-def read_users_me(current_user: User = Depends(get_current_user)):
+def read_users_me(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user)
+):
     """Get current user information (requires authentication)."""
+    # The body is the principal, possibly cached, so the ETag covers its fields
+    not_modified = versioning.conditional_content(request, response, "me", *astuple(current_user))
+    if not_modified:
+        return not_modified
     return current_user
 
+@app.get("/users/me/requests", response_model=List[HelpRequestResponse])
+def read_my_requests(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get a page of the current user's help requests, newest first by default.
+
+    The cursor for the following page is returned in the X-Next-Cursor header.
+    """
+    not_modified = versioning.conditional_response(
+        request, response, db, (HELP_REQUESTS, USERS), "me", current_user.id, request.url.query
+    )
+    if not_modified:
+        return not_modified
+    cached = compression.compressor.cached(request, response)
+    if cached:
+        return cached
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    requests, next_cursor = crud.list_help_requests(
+        db,
+        limit=limit,
+        after=after,
+        created_by=current_user.id,
+        descending=order == "desc",
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    body = serialization.dump(requests)
+    return compression.compressor.respond(request, response, body)
+
+@app.get("/users/me/notifications/stream")
+async def stream_notifications(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Server-sent events for the current user, such as new offers on their requests."""
+    # get_db closes its session only once the response ends; a stream can stay
+    # open for hours, so hand the connection back to the pool now
+    db.close()
+    return StreamingResponse(
+        notifications.event_stream(request, current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/users/me/summary", response_model=RequestSummary)
+def read_my_summary(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the current user's request counts by status and the platform-wide total."""
+    not_modified = versioning.conditional_response(
+        request, response, db, (HELP_REQUESTS,), "me", current_user.id
+    )
+    if not_modified:
+        return not_modified
+    return stats.get_user_summary(db, current_user.id)
+
+
+
 
 
 
+# --- Export Endpoints ---
+@app.get("/export/users")
+def export_users(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    db: Session = Depends(get_db)
+):
+    """Stream all users as NDJSON or CSV."""
+    return export.export_response(db, export.user_export_select(), format, "users")
+
+@app.get("/export/requests")
+def export_help_requests(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    db: Session = Depends(get_db)
+):
+    """Stream all help requests as NDJSON or CSV."""
+    return export.export_response(db, export.help_request_export_select(), format, "requests")
 
 
 # --- User Management Endpoints ---
+@app.post("/users/batch", response_model=BatchResponse)
+def create_users_batch(
+    batch: UserBatchCreate,
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Register many users in one transaction (admin only).
+
+    Items whose username or email is taken get an error result; the rest are created.
+    """
+    results = crud.bulk_create_users(db, batch.items)
+    created = sum(1 for result in results if result.status == "created")
+    if created:
+        versions = versioning.bump_version(db, USERS)
+        changelog.record(
+            db, changelog.USER, [result.id for result in results if result.status == "created"]
+        )
+    db.commit()
+    if created:
+        leaderboard.rank_index.apply(
+            {result.id: 0 for result in results if result.status == "created"}, versions[USERS]
+        )
+    return BatchResponse(created=created, failed=len(results) - created, results=results)
+
 @app.get("/users", response_model=List[UserResponse])
-def get_all_users(db: Session = Depends(get_db)):
-    """Get all registered users."""
-    users = db.query(User).all()
-    return users
+def get_all_users(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: str = Query("id", pattern="^(id|reputation)$"),
+    q: Optional[str] = Query(None, max_length=100),
+    fields: Optional[str] = Query(None, max_length=500),
+    db: Session = Depends(get_db)
+):
+    """Get a page of registered users, optionally only those whose username starts with q.
+
+    sort=reputation lists the highest reputation first and fields=id,username
+    returns only those fields. The cursor for the following page is returned
+    in the X-Next-Cursor header.
+    """
+    fieldset = parse_fieldset(fields, fieldsets.USER_FIELDS)
+    not_modified = versioning.conditional_response(
+        request, response, db, (USERS,), request.url.query
+    )
+    if not_modified:
+        return not_modified
+    cached = compression.compressor.cached(request, response)
+    if cached:
+        return cached
+    after = None
+    if cursor:
+        try:
+            after = decode_int_cursor(cursor, crud.USER_SORT_KEY_LENGTHS[sort])
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    users, next_cursor = crud.list_users(
+        db, limit=limit, after=after, sort=sort, username_prefix=q, fieldset=fieldset
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    body = serialization.dump(users)
+    return compression.compressor.respond(request, response, body)
+
+@app.get("/users/leaderboard", response_model=List[LeaderboardEntry])
+def get_leaderboard(
+    request: Request,
+    response: Response,
+    limit: int = Query(leaderboard.LEADERBOARD_DEFAULT_SIZE, ge=1, le=leaderboard.LEADERBOARD_MAX_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Get the highest-reputation users, best first."""
+    not_modified = versioning.conditional_response(request, response, db, (USERS,), "leaderboard", limit)
+    if not_modified:
+        return not_modified
+    return leaderboard.top_users(db, limit)
 
 @app.get("/users/{user_id}", response_model=UserResponse)
-def get_user(user_id: int = Path(..., gt=0), db: Session = Depends(get_db)):
-    """Get a user by ID."""
+def get_user(
+    request: Request,
+    response: Response,
+    user_id: int = Path(..., gt=0),
+    fields: Optional[str] = Query(None, max_length=500),
+    db: Session = Depends(get_db)
+):
+    """Get a user by ID; fields=id,username returns only those fields."""
+    fieldset = parse_fieldset(fields, fieldsets.USER_FIELDS)
+    not_modified = versioning.conditional_response(
+        request, response, db, (USERS,), user_id, request.url.query
+    )
+    if not_modified:
+        return not_modified
+    if fieldset is not None:
+        user = crud.get_user(db, user_id, fieldset)
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return serialization.object_response(user, response)
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
+@app.get("/users/{user_id}/rank", response_model=UserRank)
+def get_user_rank(user_id: int = Path(..., gt=0), db: Session = Depends(get_db)):
+    """Get a user's leaderboard rank; users with equal reputation share a rank."""
+    rank = leaderboard.user_rank(db, user_id)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return rank
+
 @app.delete("/users/{user_id}", status_code=204)
 def delete_user(user_id: int = Path(..., gt=0), db: Session = Depends(get_db)):
     """Delete a user by ID."""
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    delete_user_events(db, user_id)
+    crud.delete_user_offers(db, user_id)
+    deleted_requests = crud.delete_user_help_requests(db, user_id)
+    if deleted_requests:
+        versioning.bump_version(db, HELP_REQUESTS)
+        changelog.record(db, changelog.HELP_REQUEST, deleted_requests, changelog.DELETE)
     db.delete(user)
+    versions = versioning.bump_version(db, USERS)
+    changelog.record(db, changelog.USER, [user_id], changelog.DELETE)
     db.commit()
+    feed.publish_deleted(deleted_requests)
+    leaderboard.rank_index.apply({user_id: None}, versions[USERS])
+    principals.cache.invalidate_user(user_id)
     return
 
 @app.put("/users/{user_id}", response_model=UserResponse)
@@ -158,15 +684,41 @@ def update_user(
     if email:
         user.email = email
     if reputation is not None:
-        user.reputation = reputation
+        record_adjustment(db, user_id, reputation)
     try:
+        versions = versioning.bump_version(db, USERS)
+        changelog.record(db, changelog.USER, [user_id])
         db.commit()
         db.refresh(user)
+        leaderboard.rank_index.apply({user_id: user.reputation}, versions[USERS])
+        principals.cache.invalidate_user(user_id)
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=400, detail="Username or email already exists.")
     return user
 
+@app.post("/users/{user_id}/reputation", response_model=UserResponse)
+def change_reputation(
+    change: ReputationChange,
+    user_id: int = Path(..., gt=0),
+    moderator: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Add a (possibly negative) delta to a user's reputation (admin only).
+
+    The change is appended to the reputation ledger and applied with an atomic
+    increment, so concurrent moderators never overwrite each other.
+    """
+    if not apply_delta(db, user_id, change.delta, change.reason, actor_id=moderator.id):
+        raise HTTPException(status_code=404, detail="User not found")
+    versions = versioning.bump_version(db, USERS)
+    changelog.record(db, changelog.USER, [user_id])
+    db.commit()
+    principals.cache.invalidate_user(user_id)
+    user = db.query(User).filter(User.id == user_id).first()
+    leaderboard.rank_index.apply({user_id: user.reputation}, versions[USERS])
+    return user
+
 
 
 
@@ -174,4 +726,4 @@ def update_user(
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from .database import Base
@@ -16,6 +16,11 @@ class User(Base):
     # Relationship to help requests
     help_requests = relationship("HelpRequest", back_populates="creator")
 
+    # Leaderboard order: highest reputation first, ties broken by id
+    __table_args__ = (
+        Index("ix_users_reputation_desc_id", reputation.desc(), "id"),
+    )
+
 class HelpRequest(Base):
     __tablename__ = "help_requests"
     
@@ -24,6 +29,82 @@ class HelpRequest(Base):
     description = Column(Text, nullable=False)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # open, in_progress, helped or closed; see app.request_status
+    status = Column(String, nullable=False, default="open", server_default="open")
     
     # Relationship to user
     creator = relationship("User", back_populates="help_requests")
+
+    # Composite indexes backing keyset pagination on (created_at, id),
+    # optionally narrowed to a single creator or status.
+    __table_args__ = (
+        Index("ix_help_requests_created_at_id", "created_at", "id"),
+        Index("ix_help_requests_created_by_created_at_id", "created_by", "created_at", "id"),
+        Index("ix_help_requests_status_created_at_id", "status", "created_at", "id"),
+    )
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+    
+    # One row per versioned table, bumped in the same transaction as each write
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+class ReputationEvent(Base):
+    __tablename__ = "reputation_events"
+    
+    # Append-only ledger of reputation changes; users.reputation is their running sum
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    delta = Column(Integer, nullable=False)
+    reason = Column(String, nullable=True)
+    actor_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index("ix_reputation_events_user_id_id", "user_id", "id"),
+        Index("ix_reputation_events_created_at", "created_at"),
+    )
+
+class StatCounter(Base):
+    __tablename__ = "stat_counters"
+    
+    # Pre-aggregated counts, e.g. ("requests_by_user", "42") -> 7, updated in the
+    # same transaction as the rows they count
+    dimension = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class HelpOffer(Base):
+    __tablename__ = "help_offers"
+    
+    # An offer by helper_id to help with request_id; one per helper and request
+    id = Column(Integer, primary_key=True, index=True)
+    request_id = Column(Integer, ForeignKey("help_requests.id"), nullable=False)
+    helper_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    message = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        UniqueConstraint("request_id", "helper_id", name="uq_help_offers_request_id_helper_id"),
+        Index("ix_help_offers_helper_id", "helper_id"),
+    )
+
+class ChangeLogEntry(Base):
+    __tablename__ = "change_log"
+    
+    # One row per write to users or help_requests, numbered by seq in commit
+    # order; op "delete" rows are tombstones for removed entities
+    seq = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)
+    changed_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index("ix_change_log_entity_entity_id_seq", "entity", "entity_id", "seq"),
+        Index("ix_change_log_changed_at", "changed_at"),
+        # Never reuse the seq of a compacted row
+        {"sqlite_autoincrement": True},
+    )
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import Dict, Optional, Set
+from .config import settings
+
+# In-process pub/sub for user notifications, delivered over server-sent events.
+# Publishers run on request threads; each subscriber is an SSE stream on the
+# event loop. Every subscriber gets a bounded queue: when a slow client falls
+# NOTIFICATION_QUEUE_SIZE events behind, the oldest events are dropped so one
+# stalled connection can never grow memory without bound or block publishers.
+#
+# Subscriptions are per process; with several workers a user only receives
+# events published by the worker holding their stream.
+
+NOTIFICATION_QUEUE_SIZE = settings.notification_queue_size
+NOTIFICATION_KEEPALIVE = settings.notification_keepalive
+
+
+class Subscriber:
+    """One open stream's bounded queue; push is thread-safe, get runs on the loop."""
+
+    def __init__(self, user_id: int, max_queue: int, loop: asyncio.AbstractEventLoop):
+        self.user_id = user_id
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._events = deque()
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+        self._loop = loop
+
+    def push(self, event: dict) -> bool:
+        """Queue event, dropping the oldest one if the queue is full. Returns True on a drop."""
+        dropped = False
+        with self._lock:
+            if len(self._events) >= self.max_queue:
+                self._events.popleft()
+                self.dropped += 1
+                dropped = True
+            self._events.append(event)
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # The stream's event loop is gone; it will be unsubscribed
+            pass
+        return dropped
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Next event, or None if none arrives within timeout seconds."""
+        while True:
+            with self._lock:
+                if self._events:
+                    return self._events.popleft()
+                self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._events)
+
+
+class NotificationHub:
+    """Fans events out to every open stream of the recipient."""
+
+    def __init__(self, max_queue: int = NOTIFICATION_QUEUE_SIZE):
+        self.max_queue = max_queue
+        self._subscribers: Dict[int, Set[Subscriber]] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, user_id: int) -> Subscriber:
+        """Open a queue for user_id; call from the event loop that will read it."""
+        subscriber = Subscriber(user_id, self.max_queue, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[subscriber.user_id]
+
+    def publish(self, user_id: int, event: dict) -> int:
+        """Queue event for every stream of user_id. Returns the number of streams reached."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+            self.published += 1
+            self.delivered += len(subscribers)
+        dropped = sum(subscriber.push(event) for subscriber in subscribers)
+        if dropped:
+            with self._lock:
+                self.dropped += dropped
+        return len(subscribers)
+
+    def metrics(self) -> dict:
+        """Snapshot of open streams, backlog and delivery counters."""
+        with self._lock:
+            subscribers = [s for group in self._subscribers.values() for s in group]
+            published, delivered, dropped = self.published, self.delivered, self.dropped
+        return {
+            "subscribers": len(subscribers),
+            "queue_size": self.max_queue,
+            "pending": sum(s.pending() for s in subscribers),
+            "published": published,
+            "delivered": delivered,
+            "dropped": dropped,
+        }
+
+
+def format_event(event: dict) -> str:
+    """Encode event as one server-sent event frame."""
+    lines = []
+    if event.get("id") is not None:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event.get('type', 'message')}")
+    lines.append(f"data: {json.dumps(event, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def subscriber_frames(request, subscriber: Subscriber, keepalive: float, backlog=()):
+    """Yield backlog and then subscriber's events as SSE frames until the client disconnects."""
+    yield ": connected\n\n"
+    for event in backlog:
+        yield format_event(event)
+    while not await request.is_disconnected():
+        event = await subscriber.get(timeout=keepalive)
+        if event is None:
+            # Comment frames keep proxies from closing an idle stream
+            yield ": keepalive\n\n"
+        else:
+            yield format_event(event)
+
+
+async def event_stream(request, user_id: int, keepalive: float = NOTIFICATION_KEEPALIVE):
+    """Subscribe to user_id's events and yield them as SSE frames until the client disconnects."""
+    subscriber = hub.subscribe(user_id)
+    try:
+        async for frame in subscriber_frames(request, subscriber, keepalive):
+            yield frame
+    finally:
+        hub.unsubscribe(subscriber)
+
+
+# Shared hub used by app.main
+hub = NotificationHub()
@@ -0,0 +1,53 @@
+import base64
+import binascii
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+# Keyset (cursor) pagination helpers.
+# A cursor is the sort key of the last row on a page, e.g. its (created_at, id)
+# pair, encoded so clients treat it as an opaque token.
+
+CURSOR_SEPARATOR = "|"
+
+
+def as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Normalize a datetime to the naive UTC form stored in the database."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor."""
+    raw = f"{as_naive_utc(created_at).isoformat()}{CURSOR_SEPARATOR}{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor. Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        created_at, row_id = raw.rsplit(CURSOR_SEPARATOR, 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def encode_int_cursor(*values: int) -> str:
+    """Encode an all-integer sort key, such as (reputation, id), as an opaque cursor."""
+    raw = CURSOR_SEPARATOR.join(str(value) for value in values)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_int_cursor(cursor: str, length: int) -> Tuple[int, ...]:
+    """Decode a cursor produced by encode_int_cursor. Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        values = tuple(int(value) for value in raw.split(CURSOR_SEPARATOR))
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if len(values) != length:
+        raise ValueError("Invalid cursor")
+    return values
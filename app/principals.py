@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Set
+from .config import settings
+
+# Cache of verified bearer tokens and the users they resolve to.
+# A hit skips both the JWT decode and the user lookup. Entries expire after
+# PRINCIPAL_CACHE_TTL seconds or when the token itself expires, whichever is
+# first, and are dropped as soon as the user is updated or deleted.
+#
+# A request that read the user before such an invalidation must not cache
+# what it read afterwards. Callers take generation() before the lookup and
+# pass it to put(), which skips the entry if the user was invalidated since.
+
+PRINCIPAL_CACHE_SIZE = settings.principal_cache_size
+PRINCIPAL_CACHE_TTL = settings.principal_cache_ttl
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Detached snapshot of the authenticated user's columns."""
+    id: int
+    username: str
+    email: str
+    reputation: int
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            reputation=user.reputation,
+            created_at=user.created_at,
+        )
+
+
+class PrincipalCache:
+    """Thread-safe LRU of token -> Principal with per-entry expiry."""
+
+    def __init__(self, max_entries: int = PRINCIPAL_CACHE_SIZE, ttl: float = PRINCIPAL_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        # Invalidation counter and the value it had when each user, or everyone, was last invalidated
+        self._generation = 0
+        self._invalidated_at: Dict[int, int] = {}
+        self._cleared_at = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+
+    def _remove(self, token: str):
+        principal, _ = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(principal.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[principal.id]
+
+    def get(self, token: str) -> Optional[Principal]:
+        """Return the cached principal for token, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return principal
+
+    def generation(self) -> int:
+        """Take before reading the user whose principal will be passed to put()."""
+        with self._lock:
+            return self._generation
+
+    def put(
+        self,
+        token: str,
+        principal: Principal,
+        token_expires_at: Optional[datetime] = None,
+        generation: Optional[int] = None,
+    ):
+        """Cache principal for token until the TTL or the token's own expiry.
+
+        Skipped if the user was invalidated after generation was taken.
+        """
+        ttl = self.ttl
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at.timestamp() - time.time())
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            if generation is not None and max(
+                self._cleared_at, self._invalidated_at.get(principal.id, 0)
+            ) > generation:
+                self.stale_puts += 1
+                return
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (principal, time.monotonic() + ttl)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int):
+        """Drop every cached token that resolves to user_id."""
+        with self._lock:
+            self._generation += 1
+            self._invalidated_at[user_id] = self._generation
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._generation += 1
+            self._cleared_at = self._generation
+            self._invalidated_at.clear()
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def metrics(self) -> dict:
+        """Snapshot of size and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale_puts": self.stale_puts,
+            }
+
+
+# Shared cache used by app.auth
+cache = PrincipalCache()
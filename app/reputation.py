@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import delete, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+from .compaction import PeriodicCompactor
+from .config import settings
+from .models import User, ReputationEvent
+
+# Reputation ledger.
+# Every change is appended to reputation_events and applied to users.reputation
+# with an atomic "reputation = reputation + delta" in the same transaction, so
+# users.reputation is always the materialized sum of the user's events: reads
+# stay O(1) and concurrent writers never lose each other's updates.
+#
+# A background compactor folds events older than the retention window into a
+# single "compacted" event per user. The per-user sum, and therefore the
+# materialized value, is unchanged while the ledger stays bounded.
+
+COMPACTED_REASON = "compacted"
+
+
+def apply_delta(
+    db: Session, user_id: int, delta: int, reason: Optional[str] = None, actor_id: Optional[int] = None
+) -> bool:
+    """Record a reputation change and apply it atomically. Returns False if the user is missing."""
+    result = db.execute(
+        update(User).where(User.id == user_id).values(reputation=User.reputation + delta)
+    )
+    if result.rowcount == 0:
+        return False
+    db.add(ReputationEvent(user_id=user_id, delta=delta, reason=reason, actor_id=actor_id))
+    db.flush()
+    return True
+
+
+def record_adjustment(db: Session, user_id: int, new_reputation: int, reason: str = "set"):
+    """Set a user's reputation to an absolute value, logging the difference as an event.
+
+    A no-op UPDATE first takes the write lock (the row lock on other
+    databases), so the value the difference is taken from cannot change
+    before the transaction commits. A value read earlier may already be stale.
+    """
+    db.execute(update(User).where(User.id == user_id).values(reputation=User.reputation))
+    current = db.scalar(select(User.reputation).where(User.id == user_id)) or 0
+    delta = new_reputation - current
+    if delta:
+        db.execute(update(User).where(User.id == user_id).values(reputation=new_reputation))
+        db.add(ReputationEvent(user_id=user_id, delta=delta, reason=reason))
+        db.flush()
+
+
+def delete_user_events(db: Session, user_id: int):
+    """Remove a deleted user's ledger."""
+    db.execute(delete(ReputationEvent).where(ReputationEvent.user_id == user_id))
+
+
+def compact_events(db: Session, retention: timedelta) -> int:
+    """Fold each user's events older than retention into one event. Returns rows removed."""
+    cutoff = (datetime.now(timezone.utc) - retention).replace(tzinfo=None)
+    # Only touch events that existed when compaction started
+    high_water = db.scalar(select(func.max(ReputationEvent.id)))
+    if high_water is None:
+        return 0
+    old_events = (ReputationEvent.id <= high_water) & (ReputationEvent.created_at < cutoff)
+    users_to_fold = (
+        select(ReputationEvent.user_id)
+        .where(old_events)
+        .group_by(ReputationEvent.user_id)
+        .having(func.count() > 1)
+    )
+    db.execute(
+        insert(ReputationEvent).from_select(
+            ["user_id", "delta", "reason", "created_at"],
+            select(
+                ReputationEvent.user_id,
+                func.sum(ReputationEvent.delta),
+                literal(COMPACTED_REASON),
+                func.max(ReputationEvent.created_at),
+            )
+            .where(old_events)
+            .group_by(ReputationEvent.user_id)
+            .having(func.count() > 1),
+        )
+    )
+    result = db.execute(
+        delete(ReputationEvent).where(old_events, ReputationEvent.user_id.in_(users_to_fold))
+    )
+    return result.rowcount
+
+
+class ReputationCompactor(PeriodicCompactor):
+    """Background thread that periodically runs compact_events in its own session."""
+
+    name = "reputation-compactor"
+    label = "reputation events"
+
+    def __init__(
+        self,
+        session_factory,
+        interval: float = settings.reputation_compact_interval,
+        retention: timedelta = timedelta(days=settings.reputation_retention_days),
+    ):
+        super().__init__(session_factory, interval, retention)
+
+    def compact(self, db: Session) -> int:
+        return compact_events(db, self.retention)
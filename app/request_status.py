@@ -0,0 +1,36 @@
+from typing import Dict, FrozenSet
+from sqlalchemy.orm import Session
+from .models import HelpRequest
+from . import stats
+
+# Help request lifecycle.
+# A request starts open, may be picked up (in_progress) and ends helped or
+# closed. Closed requests can be reopened; helped ones can only be closed.
+
+OPEN = "open"
+IN_PROGRESS = "in_progress"
+HELPED = "helped"
+CLOSED = "closed"
+
+STATUSES = (OPEN, IN_PROGRESS, HELPED, CLOSED)
+
+# Regex for validating a status query parameter
+STATUS_PATTERN = "^(" + "|".join(STATUSES) + ")$"
+
+TRANSITIONS: Dict[str, FrozenSet[str]] = {
+    OPEN: frozenset({IN_PROGRESS, HELPED, CLOSED}),
+    IN_PROGRESS: frozenset({OPEN, HELPED, CLOSED}),
+    HELPED: frozenset({CLOSED}),
+    CLOSED: frozenset({OPEN}),
+}
+
+
+def change_status(db: Session, help_request: HelpRequest, new_status: str):
+    """Move help_request and its counters to new_status. Raises ValueError if not allowed."""
+    current = help_request.status
+    if new_status == current:
+        return
+    if new_status not in TRANSITIONS.get(current, frozenset()):
+        raise ValueError(f"Cannot change status from {current} to {new_status}")
+    stats.record_status_change(db, help_request.created_by, current, new_status)
+    help_request.status = new_status
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
-from datetime import datetime
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
+from datetime import date, datetime
+from typing import Dict, List, Literal, Optional
+from .config import settings
 
 # User schemas
 class UserCreate(BaseModel):
@@ -35,18 +36,105 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     username: Optional[str] = None
 
+class ReputationChange(BaseModel):
+    delta: int
+    reason: Optional[str] = None
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    id: int
+    username: str
+    reputation: int
+
+class UserRank(BaseModel):
+    user_id: int
+    reputation: int
+    rank: int
+    total_users: int
+
 # Help Request schemas
 class HelpRequestCreate(BaseModel):
     title: str
     description: str
 
+class HelpRequestStatusUpdate(BaseModel):
+    status: Literal["open", "in_progress", "helped", "closed"]
+
 class HelpRequestResponse(BaseModel):
     id: int
     title: str
     description: str
     created_by: int
     created_at: datetime
+    status: str = "open"
     creator: UserResponse
     
     class Config:
         from_attributes = True
+
+# Batch import schemas; oversized batches are rejected while the items are validated
+class HelpRequestBatchCreate(BaseModel):
+    items: List[HelpRequestCreate] = Field(max_length=settings.batch_max_items)
+
+class UserBatchCreate(BaseModel):
+    items: List[UserCreate] = Field(max_length=settings.batch_max_items)
+
+class BatchItemResult(BaseModel):
+    index: int
+    status: str  # "created" or "error"
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BatchItemResult]
+
+# Statistics schemas
+class UserRequestCount(BaseModel):
+    user_id: int
+    username: str
+    count: int
+
+class DayCount(BaseModel):
+    day: date
+    count: int
+
+class StatsResponse(BaseModel):
+    total_requests: int
+    requests_by_user: List[UserRequestCount]
+    requests_by_status: Dict[str, int]
+    requests_by_day: List[DayCount]
+
+class RequestSummary(BaseModel):
+    user_id: int
+    total_requests: int
+    requests_by_status: Dict[str, int]
+    platform_requests: int
+
+# Help offer schemas
+class HelpOfferCreate(BaseModel):
+    message: Optional[str] = None
+
+class HelpOfferResponse(BaseModel):
+    id: int
+    request_id: int
+    helper_id: int
+    helper_username: str
+    message: Optional[str] = None
+    created_at: datetime
+
+# Delta sync schemas
+class ChangeEntry(BaseModel):
+    seq: int
+    entity: Literal["user", "help_request"]
+    id: int
+    op: Literal["upsert", "delete"]
+    user: Optional[UserResponse] = None
+    request: Optional[HelpRequestResponse] = None
+
+class SyncResponse(BaseModel):
+    changes: List[ChangeEntry]
+    next_since: int
+    has_more: bool
+    reset: bool = False
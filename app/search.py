@@ -0,0 +1,115 @@
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import event, literal_column, select, text
+from sqlalchemy.orm import Session
+from .models import HelpRequest
+from . import crud
+
+# Full-text search over help requests backed by an SQLite FTS5 index.
+# help_requests_fts is an external-content table over help_requests.title and
+# help_requests.description; triggers keep it in sync with every insert,
+# update and delete, including bulk Core statements that bypass the ORM.
+
+FTS_TABLE = "help_requests_fts"
+
+# Title matches weigh more than description matches in the bm25 ranking
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+CREATE_STATEMENTS = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='help_requests', content_rowid='id',
+        tokenize='porter unicode61'
+    )""",
+    f"""INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank)
+        VALUES ('rank', 'bm25({TITLE_WEIGHT}, {DESCRIPTION_WEIGHT})')""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON help_requests BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON help_requests BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description ON help_requests BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+
+def create_search_index(connection):
+    """Create the FTS5 table and its sync triggers on an SQLite connection."""
+    for statement in CREATE_STATEMENTS:
+        connection.execute(text(statement))
+
+
+@event.listens_for(HelpRequest.__table__, "after_create")
+def _after_create(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        create_search_index(connection)
+
+
+@event.listens_for(HelpRequest.__table__, "before_drop")
+def _before_drop(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+
+def ensure_search_index(engine):
+    """Create and populate the index for a help_requests table that predates it."""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE},
+        ).first()
+        if not exists:
+            create_search_index(connection)
+            connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def build_match_query(q: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every word must match, the last as a prefix.
+
+    Words are quoted so user input can never be parsed as FTS5 syntax.
+    """
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_help_requests(
+    db: Session, q: str, limit: int, offset: int = 0
+) -> Tuple[List[dict], bool]:
+    """Return one page of requests matching q, best bm25 rank first, and whether more exist."""
+    match = build_match_query(q)
+    if match is None:
+        return [], False
+    fts = literal_column(FTS_TABLE)
+    # Rank and page inside the FTS table so FTS5 can sort by rank with a bounded
+    # heap, then join only the matching page back to requests and creators.
+    ranked = (
+        select(literal_column("rowid").label("rowid"), literal_column("rank").label("rank"))
+        .select_from(text(FTS_TABLE))
+        .where(fts.op("MATCH")(match))
+        .order_by(literal_column("rank"))
+        .limit(limit + 1)
+        .offset(offset)
+        .subquery()
+    )
+    stmt = (
+        crud.help_request_select()
+        .join(ranked, ranked.c.rowid == HelpRequest.id)
+        .order_by(ranked.c.rank, HelpRequest.id)
+    )
+    rows = db.execute(stmt).all()
+    has_more = len(rows) > limit
+    return [crud.help_request_dict(row) for row in rows[:limit]], has_more
@@ -0,0 +1,40 @@
+from typing import Any
+from fastapi import Response
+from pydantic_core import to_json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+# Fast JSON path for list endpoints.
+# Returning models from a route makes FastAPI validate every item against the
+# response_model again, convert it with jsonable_encoder and encode the result
+# with the standard json module. List endpoints instead shape their row tuples
+# into plain dicts and encode them in one orjson call, and compression.py
+# sends the bytes as a ready Response. The route's response_model still
+# documents the schema.
+#
+# The dicts are not validated against the response models: they come from
+# column projections whose types already match, and validating them through a
+# prebuilt TypeAdapter costs about five times as much as encoding them
+# (python -m benchmarks.serialization). Without orjson, pydantic-core encodes
+# them to the same JSON.
+
+
+def dump(content: Any) -> bytes:
+    """Encode plain dicts, lists and scalars as JSON."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return to_json(content)
+
+
+def _with_headers(body: bytes, response: Response) -> Response:
+    fast = Response(body, media_type="application/json")
+    fast.headers.raw.extend(response.headers.raw)
+    return fast
+
+
+def object_response(content: dict, response: Response) -> Response:
+    """A JSON response for one dict carrying the headers already set on the route's response."""
+    return _with_headers(dump(content), response)
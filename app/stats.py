@@ -0,0 +1,163 @@
+from collections import Counter
+from datetime import date
+from typing import Dict, Iterable, Tuple
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+from .models import HelpRequest, StatCounter, User
+from .pagination import as_naive_utc
+from .schemas import DayCount, RequestSummary, StatsResponse, UserRequestCount
+
+# Incrementally maintained help request statistics.
+# stat_counters holds one row per (dimension, key). Every write that inserts or
+# deletes help requests adjusts the matching counters in its own transaction,
+# so GET /stats reads one row per group instead of scanning help_requests.
+
+BY_USER = "requests_by_user"
+BY_STATUS = "requests_by_status"
+BY_DAY = "requests_by_day"
+# Keyed "<user id>:<status>"
+BY_USER_STATUS = "requests_by_user_status"
+
+DIMENSIONS = (BY_USER, BY_STATUS, BY_DAY, BY_USER_STATUS)
+
+
+def _day(created_at) -> str:
+    return as_naive_utc(created_at).date().isoformat()
+
+
+def _user_status(user_id, status: str) -> str:
+    return f"{user_id}:{status}"
+
+
+def request_counts(rows: Iterable) -> Counter:
+    """Counter increments for help request rows with created_by, created_at and status."""
+    counts = Counter()
+    for row in rows:
+        counts[(BY_USER, str(row.created_by))] += 1
+        counts[(BY_STATUS, row.status)] += 1
+        counts[(BY_DAY, _day(row.created_at))] += 1
+        counts[(BY_USER_STATUS, _user_status(row.created_by, row.status))] += 1
+    return counts
+
+
+def apply_counts(db: Session, counts: Dict[Tuple[str, str], int]):
+    """Add each amount to its counter, creating missing counters and dropping empty ones."""
+    emptied = []
+    for (dimension, key), amount in counts.items():
+        if not amount:
+            continue
+        row = db.execute(
+            update(StatCounter)
+            .where(StatCounter.dimension == dimension, StatCounter.key == key)
+            .values(count=StatCounter.count + amount)
+            .returning(StatCounter.count)
+        ).first()
+        if row is None:
+            db.add(StatCounter(dimension=dimension, key=key, count=amount))
+        elif row.count <= 0:
+            emptied.append((dimension, key))
+    for dimension, key in emptied:
+        db.execute(
+            delete(StatCounter).where(
+                StatCounter.dimension == dimension, StatCounter.key == key, StatCounter.count <= 0
+            )
+        )
+    db.flush()
+
+
+def record_created(db: Session, rows: Iterable):
+    """Count newly inserted help requests."""
+    apply_counts(db, request_counts(rows))
+
+
+def record_deleted(db: Session, rows: Iterable):
+    """Uncount deleted help requests."""
+    apply_counts(db, {group: -amount for group, amount in request_counts(rows).items()})
+
+
+def record_status_change(db: Session, user_id: int, old_status: str, new_status: str):
+    """Move one of user_id's requests from old_status to new_status."""
+    apply_counts(db, {
+        (BY_STATUS, old_status): -1,
+        (BY_STATUS, new_status): 1,
+        (BY_USER_STATUS, _user_status(user_id, old_status)): -1,
+        (BY_USER_STATUS, _user_status(user_id, new_status)): 1,
+    })
+
+
+def get_stats(db: Session) -> StatsResponse:
+    """Read every counter and shape them for charts."""
+    rows = db.execute(
+        select(StatCounter.dimension, StatCounter.key, StatCounter.count).where(StatCounter.count > 0)
+    ).all()
+    by_user = {int(row.key): row.count for row in rows if row.dimension == BY_USER}
+    by_status = {row.key: row.count for row in rows if row.dimension == BY_STATUS}
+    by_day = sorted(
+        (date.fromisoformat(row.key), row.count) for row in rows if row.dimension == BY_DAY
+    )
+    usernames = {}
+    if by_user:
+        usernames = dict(db.execute(select(User.id, User.username).where(User.id.in_(by_user))).all())
+    return StatsResponse(
+        total_requests=sum(by_status.values()),
+        requests_by_user=[
+            UserRequestCount(user_id=user_id, username=usernames.get(user_id, ""), count=count)
+            for user_id, count in sorted(by_user.items(), key=lambda item: (-item[1], item[0]))
+        ],
+        requests_by_status=by_status,
+        requests_by_day=[DayCount(day=day, count=count) for day, count in by_day],
+    )
+
+
+def get_user_summary(db: Session, user_id: int) -> RequestSummary:
+    """One user's request counts by status next to the platform-wide total, in one query."""
+    rows = db.execute(
+        select(StatCounter.dimension, StatCounter.key, StatCounter.count).where(
+            ((StatCounter.dimension == BY_USER_STATUS)
+             & StatCounter.key.startswith(_user_status(user_id, "")))
+            | (StatCounter.dimension == BY_STATUS),
+            StatCounter.count > 0,
+        )
+    ).all()
+    by_status = {
+        row.key.split(":", 1)[1]: row.count for row in rows if row.dimension == BY_USER_STATUS
+    }
+    return RequestSummary(
+        user_id=user_id,
+        total_requests=sum(by_status.values()),
+        requests_by_status=by_status,
+        platform_requests=sum(row.count for row in rows if row.dimension == BY_STATUS),
+    )
+
+
+def rebuild_stats(db: Session):
+    """Recompute every counter from help_requests."""
+    db.execute(delete(StatCounter))
+    counts = Counter()
+    for created_by, status, count in db.execute(
+        select(HelpRequest.created_by, HelpRequest.status, func.count())
+        .group_by(HelpRequest.created_by, HelpRequest.status)
+    ):
+        counts[(BY_USER, str(created_by))] += count
+        counts[(BY_STATUS, status)] += count
+        counts[(BY_USER_STATUS, _user_status(created_by, status))] = count
+    day = func.date(HelpRequest.created_at)
+    for value, count in db.execute(select(day, func.count()).group_by(day)):
+        counts[(BY_DAY, str(value))] = count
+    db.add_all(
+        StatCounter(dimension=dimension, key=key, count=count)
+        for (dimension, key), count in counts.items()
+    )
+    db.flush()
+
+
+def ensure_stats(engine):
+    """Populate the counters for help requests that predate them or a newer dimension."""
+    with Session(engine) as db:
+        if db.scalar(select(HelpRequest.id).limit(1)) is None:
+            return
+        present = set(db.scalars(select(StatCounter.dimension).distinct()))
+        if present.issuperset(DIMENSIONS):
+            return
+        rebuild_stats(db)
+        db.commit()
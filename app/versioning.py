@@ -0,0 +1,123 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from fastapi import Request, Response
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from .models import TableVersion
+
+# Cheap per-table version counters for conditional GETs.
+# Every write bumps the version of the tables it touches inside its own
+# transaction. Read endpoints derive a strong ETag from those versions and
+# answer If-None-Match / If-Modified-Since with 304 before running their query.
+
+USERS = "users"
+HELP_REQUESTS = "help_requests"
+
+
+def bump_version(db: Session, *tables: str) -> Dict[str, int]:
+    """Increment the version of each table; call before committing a write.
+
+    Returns the new version of each table.
+    """
+    now = datetime.now(timezone.utc)
+    versions = {}
+    for name in tables:
+        row = db.execute(
+            update(TableVersion)
+            .where(TableVersion.name == name)
+            .values(version=TableVersion.version + 1, updated_at=now)
+            .returning(TableVersion.version)
+        ).first()
+        if row is None:
+            db.add(TableVersion(name=name, version=1, updated_at=now))
+            versions[name] = 1
+        else:
+            versions[name] = row.version
+    db.flush()
+    return versions
+
+
+def get_versions(db: Session, *tables: str) -> Dict[str, Tuple[int, Optional[datetime]]]:
+    """Return {table: (version, updated_at)}; tables never written report version 0."""
+    rows = db.query(TableVersion.name, TableVersion.version, TableVersion.updated_at).filter(
+        TableVersion.name.in_(tables)
+    ).all()
+    versions = {name: (0, None) for name in tables}
+    versions.update({row.name: (row.version, row.updated_at) for row in rows})
+    return versions
+
+
+def make_etag(versions: Dict[str, Tuple[int, Optional[datetime]]], *parts) -> str:
+    """Strong ETag over table versions plus anything else that shapes the body."""
+    key = ";".join(f"{name}={version}" for name, (version, _) in sorted(versions.items()))
+    key += "|" + "|".join(str(part) for part in parts)
+    return '"' + hashlib.sha1(key.encode("utf-8")).hexdigest() + '"'
+
+
+def _last_modified(versions) -> Optional[datetime]:
+    """The last change rounded down to HTTP-date precision, or None while that second is still open.
+
+    A later write in the same second would carry the same Last-Modified, so a
+    client revalidating with it would get a 304 for a stale copy. Until the
+    second has passed only the ETag is offered.
+    """
+    stamps = [updated_at for _, updated_at in versions.values() if updated_at is not None]
+    if not stamps:
+        return None
+    latest = max(stamps)
+    if latest.tzinfo is None:
+        latest = latest.replace(tzinfo=timezone.utc)
+    latest = latest.replace(microsecond=0)
+    if datetime.now(timezone.utc) < latest + timedelta(seconds=1):
+        return None
+    return latest
+
+
+def _is_fresh(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match uses weak comparison and takes precedence over If-Modified-Since
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified <= since
+    return False
+
+
+def conditional_response(
+    request: Request, response: Response, db: Session, tables, *parts
+) -> Optional[Response]:
+    """Set ETag/Last-Modified on response, or return a 304 if the client copy is current."""
+    versions = get_versions(db, *tables)
+    return _respond(request, response, make_etag(versions, *parts), _last_modified(versions))
+
+
+def conditional_content(request: Request, response: Response, *parts) -> Optional[Response]:
+    """Set an ETag over parts alone, or return a 304 if the client copy is current.
+
+    For bodies not read from the database on this request, such as a cached
+    principal: a table version says nothing about how old they are, so the
+    ETag is derived from the body's own fields and no Last-Modified is sent.
+    """
+    return _respond(request, response, make_etag({}, *parts), None)
+
+
+def _respond(
+    request: Request, response: Response, etag: str, last_modified: Optional[datetime]
+) -> Optional[Response]:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    if _is_fresh(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
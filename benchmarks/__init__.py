@@ -0,0 +1 @@
+# TrustLoop Benchmarks Package
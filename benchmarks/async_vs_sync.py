@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from .server import run_server
+
+# Compare requests per second of the sync app (app.main) and the opt-in async
+# app (app.async_main) under the same concurrent load.
+#
+#   python -m benchmarks.async_vs_sync --concurrency 64 --duration 10
+
+APPS = {
+    "sync": "app.main:app",
+    "async": "app.async_main:app",
+}
+
+
+def seed(base_url: str, requests: int) -> str:
+    """Create a user and some help requests; return the user's bearer token."""
+    with httpx.Client(base_url=base_url, timeout=30.0) as client:
+        client.post(
+            "/register",
+            json={"username": "bench", "email": "bench@example.com", "password": "benchpassword"},
+        )
+        token = client.post(
+            "/login", json={"username": "bench", "password": "benchpassword"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        for i in range(requests):
+            client.post(
+                "/requests",
+                json={"title": f"Seed request {i}", "description": "Benchmark seed data"},
+                headers=headers,
+            )
+    return token
+
+
+def scenarios(token: str):
+    headers = {"Authorization": f"Bearer {token}"}
+    return {
+        "GET /requests": lambda client: client.get("/requests", params={"limit": 20}),
+        "GET /users/me": lambda client: client.get("/users/me", headers=headers),
+        "POST /requests": lambda client: client.post(
+            "/requests", json={"title": "Bench", "description": "Benchmark write"}, headers=headers
+        ),
+    }
+
+
+async def measure(base_url: str, call, concurrency: int, duration: float) -> dict:
+    """Run call from concurrency workers for duration seconds; return throughput."""
+    completed = 0
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        async def worker():
+            nonlocal completed, errors
+            while time.perf_counter() < deadline:
+                try:
+                    response = await call(client)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                completed += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {"requests": completed, "errors": errors, "rps": round(completed / elapsed, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sync and async app throughput.")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--seed-requests", type=int, default=200)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for mode, app_path in APPS.items():
+        with run_server(app_path) as base_url:
+            token = seed(base_url, args.seed_requests)
+            results[mode] = {
+                name: asyncio.run(measure(base_url, call, args.concurrency, args.duration))
+                for name, call in scenarios(token).items()
+            }
+
+    print(f"{'scenario':<18}{'sync rps':>12}{'async rps':>12}{'speedup':>10}")
+    for name in results["sync"]:
+        sync_rps = results["sync"][name]["rps"]
+        async_rps = results["async"][name]["rps"]
+        speedup = async_rps / sync_rps if sync_rps else float("nan")
+        print(f"{name:<18}{sync_rps:>12}{async_rps:>12}{speedup:>9.2f}x")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import create_engine, insert
+
+from app.database import Base
+from app.hashing import pwd_context
+from app.models import HelpRequest, User
+from app.request_status import STATUSES
+
+from .server import run_server
+
+# Per-route latency and throughput against a seeded database, with a
+# regression check against a stored baseline.
+#
+# The database is seeded with plain INSERTs before the server starts; the
+# server's startup backfills then build the search index, stats counters and
+# change log as they would for any existing database. Every route is called
+# --iterations times after --warmup calls that are not measured. Streaming
+# routes (SSE, WebSocket, exports) are left out: they have no per-call latency.
+# The server runs with the compressed list body cache turned off. Otherwise
+# the list routes, called with the same query and no writes in between, would
+# be answered from that cache and never run their page query.
+#
+#   python -m benchmarks.endpoints --scale 1k
+#   python -m benchmarks.endpoints --scale 100k --update-baseline
+#
+# A route fails the check when its p50 or p95 is more than --tolerance above
+# the baseline for the same scale and also more than --min-delta-ms slower,
+# so sub-millisecond noise on fast routes does not trip it. The exit status
+# is 1 on any regression.
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "endpoints_baseline.json")
+
+# Seeded user 1 is the benchmark user and an admin; every seeded user shares the password
+BENCH_USER = "bench"
+SEED_PASSWORD = "benchpassword"
+INSERT_CHUNK = 10_000
+
+# Latency metrics compared against the baseline; p99 is reported but too noisy to gate on
+GATED_METRICS = ("p50_ms", "p95_ms")
+
+
+def seed_users(requests: int) -> int:
+    return max(100, requests // 20)
+
+
+def seed_database(path: str, requests: int, users: int, spare_users: int):
+    """Create the schema and insert users plus requests spread evenly over them.
+
+    The spare users own no requests and are consumed by DELETE /users/{id}.
+    """
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    password_hash = pwd_context.hash(SEED_PASSWORD)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        for offset in range(1, users + spare_users + 1, INSERT_CHUNK):
+            connection.execute(insert(User), [
+                {
+                    "id": i,
+                    "username": BENCH_USER if i == 1 else f"user{i}",
+                    "email": f"user{i}@example.com",
+                    "password_hash": password_hash,
+                    "reputation": i % 100,
+                    "created_at": start,
+                }
+                for i in range(offset, min(offset + INSERT_CHUNK, users + spare_users + 1))
+            ])
+        for offset in range(0, requests, INSERT_CHUNK):
+            connection.execute(insert(HelpRequest), [
+                {
+                    "id": i + 1,
+                    "title": f"Help request {i}",
+                    "description": "Need a hand moving some boxes on Saturday morning.",
+                    "created_by": i % users + 1,
+                    "created_at": start + timedelta(seconds=i),
+                    "status": STATUSES[i % len(STATUSES)],
+                }
+                for i in range(offset, min(offset + INSERT_CHUNK, requests))
+            ])
+    engine.dispose()
+
+
+def routes(token: str, requests: int, users: int) -> Dict[str, object]:
+    """Name -> async call(client) for every measured route."""
+    auth = {"Authorization": f"Bearer {token}"}
+    names = itertools.count()
+    batch_names = itertools.count()
+    # Requests owned by someone other than the benchmark user, for offers
+    others = (i + 1 for i in itertools.count() if i % users != 0)
+    spare_ids = itertools.count(users + 1)
+    # Request 1 belongs to the benchmark user and starts open
+    statuses = itertools.cycle(["in_progress", "open"])
+    reputations = itertools.count()
+
+    def register(client):
+        name = f"bench-new-{next(names)}"
+        return client.post(
+            "/register", json={"username": name, "email": f"{name}@example.com", "password": SEED_PASSWORD}
+        )
+
+    def register_batch(client):
+        # Every new user costs a bcrypt hash, so keep the batch small
+        items = []
+        for _ in range(2):
+            name = f"bench-batch-{next(batch_names)}"
+            items.append({"username": name, "email": f"{name}@example.com", "password": SEED_PASSWORD})
+        return client.post("/users/batch", json={"items": items}, headers=auth)
+
+    return {
+        "GET /": lambda client: client.get("/"),
+        "GET /metrics": lambda client: client.get("/metrics"),
+        "GET /requests": lambda client: client.get("/requests", params={"limit": 20}),
+        "GET /requests?status": lambda client: client.get(
+            "/requests", params={"limit": 20, "status": "open", "order": "desc"}
+        ),
+        "GET /requests/search": lambda client: client.get("/requests/search", params={"q": "boxes"}),
+        "GET /requests/{id}/offers": lambda client: client.get(f"/requests/{requests // 2}/offers"),
+        "GET /stats": lambda client: client.get("/stats"),
+        "GET /sync": lambda client: client.get("/sync", params={"since": 0, "limit": 100}),
+        "GET /users": lambda client: client.get("/users", params={"limit": 20}),
+        "GET /users/{id}": lambda client: client.get(f"/users/{users // 2}"),
+        "GET /users/{id}/rank": lambda client: client.get(f"/users/{users // 2}/rank"),
+        "GET /users/leaderboard": lambda client: client.get("/users/leaderboard"),
+        "GET /users/me": lambda client: client.get("/users/me", headers=auth),
+        "GET /users/me/requests": lambda client: client.get(
+            "/users/me/requests", params={"limit": 20}, headers=auth
+        ),
+        "GET /users/me/summary": lambda client: client.get("/users/me/summary", headers=auth),
+        "POST /login": lambda client: client.post(
+            "/login", json={"username": BENCH_USER, "password": SEED_PASSWORD}
+        ),
+        "POST /register": register,
+        "POST /users/batch": register_batch,
+        "POST /requests": lambda client: client.post(
+            "/requests", json={"title": "Bench", "description": "Benchmark write"}, headers=auth
+        ),
+        "POST /requests/batch": lambda client: client.post(
+            "/requests/batch",
+            json={"items": [{"title": "Bench", "description": "Batch write"}] * 10},
+            headers=auth,
+        ),
+        "PATCH /requests/{id}/status": lambda client: client.patch(
+            "/requests/1/status", json={"status": next(statuses)}, headers=auth
+        ),
+        "POST /requests/{id}/offers": lambda client: client.post(
+            f"/requests/{next(others)}/offers", json={"message": "Happy to help"}, headers=auth
+        ),
+        "PUT /users/{id}": lambda client: client.put(
+            f"/users/{users // 2}", params={"reputation": next(reputations)}
+        ),
+        "POST /users/{id}/reputation": lambda client: client.post(
+            f"/users/{users // 2}/reputation", json={"delta": 1, "reason": "bench"}, headers=auth
+        ),
+        "DELETE /users/{id}": lambda client: client.delete(f"/users/{next(spare_ids)}"),
+    }
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    index = math.ceil(fraction * len(sorted_values)) - 1
+    return sorted_values[max(0, min(index, len(sorted_values) - 1))]
+
+
+async def measure(base_url: str, call, iterations: int, warmup: int, concurrency: int) -> dict:
+    """Make iterations calls from concurrency workers; return latency percentiles and throughput."""
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        for _ in range(warmup):
+            await call(client)
+        remaining = iter(range(iterations))
+
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    response = await call(client)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    """Describe every route that is slower than baseline or fails more often."""
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        for metric in GATED_METRICS:
+            limit = max(expected[metric] * (1 + tolerance), expected[metric] + min_delta_ms)
+            if result[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {result[metric]} ms exceeds {limit:.3f} ms "
+                    f"(baseline {expected[metric]} ms)"
+                )
+        if result["errors"] > expected["errors"]:
+            regressions.append(f"{name}: {result['errors']} errors (baseline {expected['errors']})")
+    return regressions
+
+
+def load_baselines(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-route latency against a seeded database.")
+    parser.add_argument("--scale", choices=SCALES, default="1k", help="number of seeded help requests")
+    parser.add_argument("--iterations", type=int, default=200, help="measured calls per route")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured calls per route first")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--app", default="app.main:app", help="ASGI app to serve, e.g. app.async_main:app")
+    parser.add_argument("--routes", help="only measure routes whose name contains this text")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="allowed absolute slowdown")
+    args = parser.parse_args()
+
+    requests = SCALES[args.scale]
+    users = seed_users(requests)
+    spare_users = args.iterations + args.warmup
+    with tempfile.TemporaryDirectory(prefix="trustloop-seed-") as seed_dir:
+        path = os.path.join(seed_dir, "trustloop.db")
+        started = time.perf_counter()
+        seed_database(path, requests, users, spare_users)
+        print(f"Seeded {requests} requests and {users} users in {time.perf_counter() - started:.1f}s")
+        env = {
+            "TRUSTLOOP_DATABASE_URL": f"sqlite:///{path}",
+            "TRUSTLOOP_ADMIN_USER_IDS": "1",
+            "TRUSTLOOP_COMPRESSION_CACHE_SIZE": "0",
+        }
+        with run_server(args.app, env=env, ready_timeout=30 + requests / 10_000) as base_url:
+            token = httpx.post(
+                f"{base_url}/login", json={"username": BENCH_USER, "password": SEED_PASSWORD}, timeout=60.0
+            ).json()["access_token"]
+            results = {}
+            for name, call in routes(token, requests, users).items():
+                if args.routes and args.routes not in name:
+                    continue
+                results[name] = asyncio.run(
+                    measure(base_url, call, args.iterations, args.warmup, args.concurrency)
+                )
+
+    print(f"{'route':<30}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>10}{'errors':>8}")
+    for name, result in results.items():
+        print(
+            f"{name:<30}{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}"
+            f"{result['rps']:>10}{result['errors']:>8}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"scale": args.scale, "routes": results}, f, indent=2)
+
+    baselines = load_baselines(args.baseline)
+    if args.update_baseline:
+        baselines[args.scale] = {**baselines.get(args.scale, {}), **results}
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline for {args.scale} written to {args.baseline}")
+        return
+    if args.scale not in baselines:
+        print(f"No {args.scale} baseline in {args.baseline}; run with --update-baseline to store one")
+        return
+    regressions = compare(results, baselines[args.scale], args.tolerance, args.min_delta_ms)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against the {args.scale} baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"\nNo regressions against the {args.scale} baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import httpx
+
+from .server import run_server
+
+# Mixed-workload load generator for finding a deployment's saturation point.
+#
+# A scenario is a weighted mix of operations. Closed loop runs --concurrency
+# workers that each send the next request when the previous one returns,
+# optionally paced to --rate in total. Open loop sends requests at --rate per
+# second on a fixed or Poisson schedule no matter how far behind the server
+# is, which is how real clients arrive.
+#
+# Latencies are recorded twice. "service" is send to response. "corrected"
+# also counts the time a request waited behind a slow one, so a stalled
+# server cannot hide its backlog (coordinated omission): in open loop it is
+# measured from the request's scheduled send time, and in paced closed loop
+# each slow response also records the requests its worker could not send
+# on schedule, as HdrHistogram's recordValueWithExpectedInterval does.
+#
+# --sweep runs one step per rate (open loop) or concurrency (closed loop) and
+# reports the highest throughput that still met the latency SLO and error budget.
+#
+#   python -m benchmarks.load --scenario mixed --concurrency 32 --duration 30
+#   python -m benchmarks.load --mode open --sweep 50,100,200,400 --slo-ms 500
+#   python -m benchmarks.load --env TRUSTLOOP_SQLITE_PROFILE=default --mode open --rate 100
+
+SEED_PASSWORD = "loadpassword"
+
+SCENARIOS = {
+    "mixed": {"list_requests": 70, "read_me": 10, "create_request": 10, "login": 5, "register": 5},
+    "read_heavy": {"list_requests": 90, "read_me": 10},
+    "write_heavy": {"list_requests": 40, "create_request": 50, "read_me": 10},
+    "auth": {"login": 50, "register": 50},
+}
+
+
+def ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+class Histogram:
+    """Log-bucketed latency histogram with about 1% relative precision."""
+
+    GROWTH = 1.01
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float, count: int = 1):
+        micros = max(seconds * 1e6, 1.0)
+        self.counts[int(math.log(micros) / math.log(self.GROWTH))] += count
+        self.count += count
+        self.total += seconds * count
+        self.max = max(self.max, seconds)
+
+    def record_corrected(self, seconds: float, expected_interval: float):
+        """Record seconds plus the samples a request sent every expected_interval would have seen."""
+        self.record(seconds)
+        if expected_interval <= 0:
+            return
+        missing = seconds - expected_interval
+        while missing >= expected_interval:
+            self.record(missing)
+            missing -= expected_interval
+
+    def merge(self, other: "Histogram"):
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound in seconds of the bucket holding the given fraction of samples."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return min(self.GROWTH ** (bucket + 1) / 1e6, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        """Count plus mean, percentiles and max in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.total / self.count) if self.count else 0.0,
+            "p50_ms": ms(self.percentile(0.50)),
+            "p90_ms": ms(self.percentile(0.90)),
+            "p99_ms": ms(self.percentile(0.99)),
+            "p999_ms": ms(self.percentile(0.999)),
+            "max_ms": ms(self.max),
+        }
+
+
+class Recorder:
+    """Latency histograms, outcomes and errors per operation for one step."""
+
+    def __init__(self):
+        self.service: Dict[str, Histogram] = defaultdict(Histogram)
+        self.corrected: Dict[str, Histogram] = defaultdict(Histogram)
+        self.ok: Counter = Counter()
+        self.errors: Counter = Counter()
+
+    def outcome(self, operation: str, response: Optional[httpx.Response], exc: Optional[Exception]):
+        if exc is not None:
+            self.errors[f"{operation}: {type(exc).__name__}"] += 1
+        elif response.status_code >= 400:
+            self.errors[f"{operation}: HTTP {response.status_code}"] += 1
+        else:
+            self.ok[operation] += 1
+
+    def overall(self, histograms: Dict[str, Histogram]) -> Histogram:
+        merged = Histogram()
+        for histogram in histograms.values():
+            merged.merge(histogram)
+        return merged
+
+
+class LoadState:
+    """Accounts created during setup and helpers shared by the operations."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.run_id = uuid.uuid4().hex[:8]
+        self.usernames = itertools.count()
+        self.accounts: List[tuple] = []
+
+    def new_username(self) -> str:
+        return f"load-{self.run_id}-{next(self.usernames)}"
+
+    def account(self) -> tuple:
+        return self.rng.choice(self.accounts)
+
+    def auth(self) -> dict:
+        return {"Authorization": f"Bearer {self.account()[1]}"}
+
+
+async def list_requests(client: httpx.AsyncClient, state: LoadState):
+    return await client.get("/requests", params={"limit": 20, "order": "desc"})
+
+
+async def read_me(client: httpx.AsyncClient, state: LoadState):
+    return await client.get("/users/me", headers=state.auth())
+
+
+async def create_request(client: httpx.AsyncClient, state: LoadState):
+    return await client.post(
+        "/requests", json={"title": "Load test", "description": "Created by the load generator"},
+        headers=state.auth(),
+    )
+
+
+async def login(client: httpx.AsyncClient, state: LoadState):
+    return await client.post("/login", json={"username": state.account()[0], "password": SEED_PASSWORD})
+
+
+async def register(client: httpx.AsyncClient, state: LoadState):
+    name = state.new_username()
+    return await client.post(
+        "/register", json={"username": name, "email": f"{name}@example.com", "password": SEED_PASSWORD}
+    )
+
+
+OPERATIONS = {
+    "list_requests": list_requests,
+    "read_me": read_me,
+    "create_request": create_request,
+    "login": login,
+    "register": register,
+}
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Parse name=weight,name=weight into a mix, e.g. list_requests=80,read_me=20."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(
+                f"unknown operation {name!r}; choose from {', '.join(OPERATIONS)}"
+            )
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight for {name!r}")
+    if not mix or sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("the mix needs a positive weight")
+    return mix
+
+
+def parse_env(value: str) -> tuple:
+    name, sep, setting = value.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError("expected NAME=VALUE")
+    return name, setting
+
+
+class Picker:
+    """Draws operation names according to the mix weights."""
+
+    def __init__(self, mix: Dict[str, float], rng: random.Random):
+        self.names = list(mix)
+        self.weights = list(itertools.accumulate(mix.values()))
+        self.rng = rng
+
+    def __call__(self) -> str:
+        return self.rng.choices(self.names, cum_weights=self.weights)[0]
+
+
+async def setup(client: httpx.AsyncClient, state: LoadState, users: int, seed_requests: int):
+    """Register and log in users, then give the request list some rows."""
+    names = [state.new_username() for _ in range(users)]
+    await asyncio.gather(*(
+        client.post(
+            "/register", json={"username": name, "email": f"{name}@example.com", "password": SEED_PASSWORD}
+        )
+        for name in names
+    ))
+    logins = await asyncio.gather(*(
+        client.post("/login", json={"username": name, "password": SEED_PASSWORD}) for name in names
+    ))
+    for name, response in zip(names, logins):
+        response.raise_for_status()
+        state.accounts.append((name, response.json()["access_token"]))
+    for offset in range(0, seed_requests, 100):
+        items = [
+            {"title": f"Seed request {i}", "description": "Seeded by the load generator"}
+            for i in range(offset, min(offset + 100, seed_requests))
+        ]
+        response = await client.post("/requests/batch", json={"items": items}, headers=state.auth())
+        response.raise_for_status()
+
+
+async def call(client: httpx.AsyncClient, state: LoadState, operation: str, recorder: Recorder) -> float:
+    """Send one operation, record its outcome and return its service time."""
+    response = exc = None
+    sent = time.perf_counter()
+    try:
+        response = await OPERATIONS[operation](client, state)
+    except httpx.HTTPError as error:
+        exc = error
+    service = time.perf_counter() - sent
+    recorder.service[operation].record(service)
+    recorder.outcome(operation, response, exc)
+    return service
+
+
+async def closed_loop(
+    client, state, pick: Picker, concurrency: int, duration: float, rate: Optional[float], recorder: Recorder
+):
+    """concurrency workers send back to back, or every concurrency / rate seconds when paced."""
+    interval = concurrency / rate if rate else 0.0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        next_send = time.perf_counter()
+        while next_send < deadline:
+            operation = pick()
+            service = await call(client, state, operation, recorder)
+            recorder.corrected[operation].record_corrected(service, interval)
+            next_send += interval
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                # Sends missed while waiting were already recorded by the correction
+                next_send = time.perf_counter()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def open_loop(
+    client, state, pick: Picker, rate: float, duration: float, poisson: bool, rng: random.Random,
+    recorder: Recorder,
+):
+    """Send at rate per second on schedule; latency counts from the scheduled send time."""
+    start = time.perf_counter()
+    tasks = set()
+
+    async def scheduled(operation: str, intended: float):
+        await call(client, state, operation, recorder)
+        recorder.corrected[operation].record(time.perf_counter() - intended)
+
+    intended = start
+    while intended < start + duration:
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(scheduled(pick(), intended))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        intended += rng.expovariate(rate) if poisson else 1.0 / rate
+    await asyncio.gather(*list(tasks))
+
+
+def step_result(recorder: Recorder, elapsed: float, target: dict) -> dict:
+    ok = sum(recorder.ok.values())
+    errors = sum(recorder.errors.values())
+    total = ok + errors
+    return {
+        **target,
+        "elapsed_seconds": round(elapsed, 2),
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "service": recorder.overall(recorder.service).summary(),
+        "corrected": recorder.overall(recorder.corrected).summary(),
+        "operations": {
+            operation: {
+                "ok": recorder.ok[operation],
+                "service": recorder.service[operation].summary(),
+                "corrected": recorder.corrected[operation].summary(),
+            }
+            for operation in sorted(recorder.service)
+        },
+        "error_breakdown": dict(recorder.errors.most_common()),
+    }
+
+
+async def run_step(base_url: str, state: LoadState, args, pick: Picker, value: float) -> dict:
+    recorder = Recorder()
+    limits = httpx.Limits(
+        max_connections=args.max_connections, max_keepalive_connections=args.max_connections
+    )
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        started = time.perf_counter()
+        if args.mode == "open":
+            target = {"rate": value}
+            poisson = args.arrival == "poisson"
+            await open_loop(client, state, pick, value, args.duration, poisson, state.rng, recorder)
+        else:
+            target = {"concurrency": int(value), "rate": args.rate}
+            await closed_loop(client, state, pick, int(value), args.duration, args.rate, recorder)
+        elapsed = time.perf_counter() - started
+    result = step_result(recorder, elapsed, target)
+    result["meets_slo"] = (
+        result["corrected"]["p99_ms"] <= args.slo_ms
+        and result["error_rate"] <= args.max_error_rate
+        and (args.mode != "open" or result["throughput_rps"] >= 0.95 * value)
+    )
+    return result
+
+
+def print_step(result: dict):
+    if "concurrency" in result:
+        target = f"concurrency {result['concurrency']}"
+    else:
+        target = f"rate {result['rate']:g}"
+    corrected = result["corrected"]
+    print(
+        f"{target:<18}{result['throughput_rps']:>10}{result['error_rate']:>9.2%}"
+        f"{corrected['p50_ms']:>10}{corrected['p99_ms']:>10}{corrected['p999_ms']:>11}"
+        f"{result['service']['p99_ms']:>12}{'ok' if result['meets_slo'] else 'FAIL':>6}"
+    )
+
+
+def print_operations(result: dict):
+    print(f"\n{'operation':<16}{'ok':>8}{'p50 ms':>10}{'p99 ms':>10}{'svc p99':>10}")
+    for operation, stats in result["operations"].items():
+        print(
+            f"{operation:<16}{stats['ok']:>8}{stats['corrected']['p50_ms']:>10}"
+            f"{stats['corrected']['p99_ms']:>10}{stats['service']['p99_ms']:>10}"
+        )
+    if result["error_breakdown"]:
+        print("\nerrors:")
+        for error, count in result["error_breakdown"].items():
+            print(f"  {error}: {count}")
+
+
+@contextmanager
+def target_server(args):
+    """Yield the base URL of --url, or of a local uvicorn started for this run."""
+    if args.url:
+        yield args.url.rstrip("/")
+        return
+    with run_server(args.app, env=dict(args.env), workers=args.workers) as base_url:
+        yield base_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive a mixed workload and find the saturation point.")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="mixed")
+    parser.add_argument("--mix", type=parse_mix, help="custom weights, e.g. list_requests=80,read_me=20")
+    parser.add_argument("--mode", choices=("closed", "open"), default="closed")
+    parser.add_argument("--concurrency", type=int, default=32, help="closed-loop workers")
+    parser.add_argument("--rate", type=float, help="requests per second (open loop; paces closed loop)")
+    parser.add_argument(
+        "--arrival", choices=("constant", "poisson"), default="poisson", help="open-loop arrival schedule"
+    )
+    parser.add_argument("--sweep", help="comma-separated rates (open) or concurrencies (closed), one step each")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per step")
+    parser.add_argument("--slo-ms", type=float, default=1000.0, help="corrected p99 a step must stay under")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--users", type=int, default=20, help="accounts registered during setup")
+    parser.add_argument("--seed-requests", type=int, default=500)
+    parser.add_argument("--max-connections", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the operation mix")
+    parser.add_argument("--url", help="target an already running server instead of starting one")
+    parser.add_argument("--app", default="app.main:app", help="ASGI app for the local server")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local server")
+    parser.add_argument(
+        "--env", type=parse_env, action="append", default=[], metavar="NAME=VALUE",
+        help="environment for the local server, e.g. TRUSTLOOP_SQLITE_PROFILE=default",
+    )
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    if args.mode == "open" and not (args.rate or args.sweep):
+        parser.error("open loop needs --rate or --sweep")
+    if args.sweep:
+        steps = [float(value) for value in args.sweep.split(",")]
+    else:
+        steps = [args.rate if args.mode == "open" else args.concurrency]
+    mix = args.mix or SCENARIOS[args.scenario]
+    rng = random.Random(args.seed)
+    state = LoadState(rng)
+    pick = Picker(mix, rng)
+
+    results = []
+    with target_server(args) as base_url:
+        async def prepare():
+            async with httpx.AsyncClient(base_url=base_url, timeout=120.0) as client:
+                await setup(client, state, args.users, args.seed_requests)
+
+        asyncio.run(prepare())
+        print(f"mix: {', '.join(f'{name}={weight:g}' for name, weight in mix.items())}")
+        print(
+            f"{'step':<18}{'rps':>10}{'errors':>9}{'p50 ms':>10}{'p99 ms':>10}{'p99.9 ms':>11}"
+            f"{'svc p99 ms':>12}{'slo':>6}"
+        )
+        for value in steps:
+            result = asyncio.run(run_step(base_url, state, args, pick, value))
+            results.append(result)
+            print_step(result)
+
+    if len(results) == 1:
+        print_operations(results[0])
+    else:
+        passing = [result for result in results if result["meets_slo"]]
+        if passing:
+            best = max(passing, key=lambda result: result["throughput_rps"])
+            print(f"\nSaturation: {best['throughput_rps']} req/s within the SLO")
+        else:
+            print("\nNo step met the SLO")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"mode": args.mode, "mix": mix, "slo_ms": args.slo_ms, "steps": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
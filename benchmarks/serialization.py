@@ -0,0 +1,132 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+
+from app import crud, serialization
+from app.schemas import HelpRequestResponse, UserResponse
+
+# Per-row cost of serializing a GET /requests page.
+#
+# "models" is the default FastAPI path the list endpoints used before: build a
+# HelpRequestResponse per row, let FastAPI validate and encode it against the
+# response_model, then render with the json module. "orjson" is the fast path:
+# rows shaped into dicts and encoded in one orjson call. "adapter" validates
+# and encodes the same dicts with a prebuilt TypeAdapter, the validation the
+# fast path leaves out.
+#
+#   python -m benchmarks.serialization --rows 10000
+
+Row = namedtuple("Row", [column.key for column in crud.HELP_REQUEST_COLUMNS])
+
+
+def make_rows(count: int) -> List[Row]:
+    start = datetime(2024, 1, 1, 12, 0, 0, 123456)
+    return [
+        Row(
+            id=i,
+            title=f"Help request {i}",
+            description="Need a hand moving some boxes on Saturday morning. " * 3,
+            created_by=i % 50 + 1,
+            created_at=start + timedelta(seconds=i),
+            status="open",
+            creator_id=i % 50 + 1,
+            creator_username=f"user{i % 50 + 1}",
+            creator_email=f"user{i % 50 + 1}@example.com",
+            creator_reputation=i % 97,
+            creator_created_at=start,
+        )
+        for i in range(count)
+    ]
+
+
+def build_model(row: Row) -> HelpRequestResponse:
+    """How list endpoints built each item before the fast path."""
+    return HelpRequestResponse(
+        id=row.id,
+        title=row.title,
+        description=row.description,
+        created_by=row.created_by,
+        created_at=row.created_at,
+        status=row.status,
+        creator=UserResponse(
+            id=row.creator_id,
+            username=row.creator_username,
+            email=row.creator_email,
+            reputation=row.creator_reputation,
+            created_at=row.creator_created_at,
+        ),
+    )
+
+
+response_field = create_response_field(name="Response", type_=List[HelpRequestResponse])
+
+
+def models_path(rows: List[Row]) -> bytes:
+    models = [build_model(row) for row in rows]
+    content = asyncio.run(serialize_response(field=response_field, response_content=models))
+    return JSONResponse(content).body
+
+
+help_request_list = TypeAdapter(List[HelpRequestResponse])
+
+
+def orjson_path(rows: List[Row]) -> bytes:
+    return serialization.dump([crud.help_request_dict(row) for row in rows])
+
+
+def adapter_path(rows: List[Row]) -> bytes:
+    adapter = help_request_list
+    return adapter.dump_json(adapter.validate_python([crud.help_request_dict(row) for row in rows]))
+
+
+PATHS = {"models": models_path, "orjson": orjson_path, "adapter": adapter_path}
+
+
+def best_time(path, rows: List[Row], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        path(rows)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-row JSON serialization cost.")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per path; the best is kept")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    if serialization.orjson is None:
+        print("orjson is not installed; the orjson path falls back to pydantic-core")
+    rows = make_rows(args.rows)
+    expected = json.loads(models_path(rows))
+    results = {}
+    for name, path in PATHS.items():
+        assert json.loads(path(rows)) == expected, f"{name} output differs"
+        seconds = best_time(path, rows, args.repeat)
+        results[name] = {"seconds": round(seconds, 4), "us_per_row": round(seconds / args.rows * 1e6, 3)}
+
+    baseline = results["models"]["seconds"]
+    print(f"{'path':<10}{'total s':>10}{'us/row':>10}{'speedup':>10}")
+    for name, result in results.items():
+        speedup = baseline / result["seconds"] if result["seconds"] else float("nan")
+        print(f"{name:<10}{result['seconds']:>10}{result['us_per_row']:>10}{speedup:>9.2f}x")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
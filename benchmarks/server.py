@@ -0,0 +1,74 @@
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import httpx
+
+# Helpers for running the API under uvicorn in a subprocess for benchmarks.
+# Each server runs in its own temporary working directory, so it gets a fresh
+# ./trustloop.db and never touches the developer's database.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    """Return a TCP port that is currently free on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(base_url: str, timeout: float = 30.0):
+    """Poll the health check until the server answers or timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/", timeout=1.0).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout}s")
+
+
+@contextmanager
+def run_server(
+    app_path: str = "app.main:app",
+    port: int = None,
+    env: dict = None,
+    workers: int = 1,
+    ready_timeout: float = 30.0,
+):
+    """Run uvicorn on app_path in a temporary directory and yield its base URL.
+
+    Raise ready_timeout when the database is large enough that startup
+    backfills (search index, stats, change log) take a while.
+    """
+    port = port or free_port()
+    with tempfile.TemporaryDirectory(prefix="trustloop-bench-") as workdir:
+        server_env = dict(os.environ)
+        server_env["PYTHONPATH"] = REPO_ROOT + os.pathsep + server_env.get("PYTHONPATH", "")
+        server_env.update(env or {})
+        process = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", app_path,
+                "--host", "127.0.0.1", "--port", str(port),
+                "--workers", str(workers), "--log-level", "warning",
+            ],
+            cwd=workdir,
+            env=server_env,
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            wait_until_ready(base_url, ready_timeout)
+            yield base_url
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
@@ -5,10 +5,20 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.main import app
 from app.database import get_db, Base
+from app import compression, feed, leaderboard, principals
 
 # Test database setup
 TEST_DATABASE_URL = "sqlite:///./test_trustloop.db"
 
+@pytest.fixture(autouse=True)
+def reset_in_process_caches():
+    """Tests recreate the database, so in-process caches must not outlive a test."""
+    principals.cache.clear()
+    leaderboard.rank_index.clear()
+    feed.feed.clear()
+    compression.compressor.clear()
+    yield
+
 @pytest.fixture(scope="session")
 def test_engine():
     """Create test database engine."""
@@ -0,0 +1,219 @@
+import os
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.async_main import SYNC_ROUTES, app
+from app import async_database, auth
+from app.async_database import get_async_db
+from app.database import Base
+
+# Test database setup
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_async.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# TestClient runs each request on a fresh event loop, so connections must not be pooled
+async_engine = create_async_engine("sqlite+aiosqlite:///./test_async.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autocommit=False, autoflush=False
+)
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+app.dependency_overrides[get_async_db] = override_get_async_db
+
+# Create test client
+client = TestClient(app)
+
+@pytest.fixture(scope="module", autouse=True)
+def remove_test_database():
+    """Remove the test database file after the module's tests."""
+    yield
+    engine.dispose()
+    if os.path.exists("./test_async.db"):
+        os.remove("./test_async.db")
+
+@pytest.fixture(scope="function")
+def setup_database():
+    """Create and clean up test database for each test."""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def auth_token(setup_database):
+    """Create a user and return auth token."""
+    client.post(
+        "/register",
+        json={
+            "username": "testuser",
+            "email": "test@example.com",
+            "password": "testpassword123"
+        }
+    )
+    login_response = client.post(
+        "/login",
+        json={
+            "username": "testuser",
+            "password": "testpassword123"
+        }
+    )
+    return login_response.json()["access_token"]
+
+def test_async_register_and_login(auth_token):
+    """Test registration and login through the async app."""
+    assert auth_token
+
+    response = client.get("/users/me", headers={"Authorization": f"Bearer {auth_token}"})
+    assert response.status_code == 200
+    assert response.json()["username"] == "testuser"
+
+    response = client.post(
+        "/login", json={"username": "testuser", "password": "wrongpassword"}
+    )
+    assert response.status_code == 401
+
+def test_async_create_and_list_requests(auth_token):
+    """Test creating and paging help requests through the async app."""
+    for i in range(3):
+        response = client.post(
+            "/requests",
+            json={"title": f"Request {i}", "description": "Async"},
+            headers={"Authorization": f"Bearer {auth_token}"}
+        )
+        assert response.status_code == 201
+        assert response.json()["creator"]["username"] == "testuser"
+
+    response = client.get("/requests", params={"limit": 2})
+    assert [r["title"] for r in response.json()] == ["Request 0", "Request 1"]
+    response = client.get("/requests", params={"cursor": response.headers["X-Next-Cursor"]})
+    assert [r["title"] for r in response.json()] == ["Request 2"]
+
+    etag = response.headers["ETag"]
+    response = client.get(
+        "/requests",
+        params={"cursor": response.request.url.params["cursor"]},
+        headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+def test_async_update_and_delete_user(setup_database):
+    """Test user management through the async app."""
+    client.post(
+        "/register",
+        json={"username": "testuser", "email": "test@example.com", "password": "testpassword123"}
+    )
+
+    response = client.put("/users/1", params={"reputation": 7})
+    assert response.status_code == 200
+    assert response.json()["reputation"] == 7
+
+    response = client.delete("/users/1")
+    assert response.status_code == 204
+    assert client.get("/users/1").status_code == 404
+    assert client.get("/users").json() == []
+
+def test_sync_fallback_routes_are_listed():
+    """Test every route served by the sync implementation is listed in SYNC_ROUTES."""
+    served_sync = {
+        (method, route.path)
+        for route in app.router.routes
+        if route.endpoint.__module__ == "app.main"
+        for method in getattr(route, "methods", None) or {"WEBSOCKET"}
+    }
+    assert served_sync == SYNC_ROUTES
+
+def test_shutdown_disposes_async_engine():
+    """Test app shutdown closes the pooled async connections."""
+    async def use_connection():
+        async with async_database.get_async_engine().connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        return async_database.get_async_engine().sync_engine.pool
+
+    with TestClient(app) as lifespan_client:
+        pool = lifespan_client.portal.call(use_connection)
+        assert pool.checkedin() == 1
+    assert pool.checkedin() == 0
+    assert async_database._async_engine is None
+
+def test_async_request_workflow_routes(auth_token):
+    """Test batch creation, status changes, offers, stats and sync on the async app."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    items = [{"title": f"Request {i}", "description": "Async"} for i in range(3)]
+    response = client.post("/requests/batch", json={"items": items}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["created"] == 3
+
+    response = client.patch("/requests/1/status", json={"status": "in_progress"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "in_progress"
+    response = client.patch("/requests/1/status", json={"status": "in_progress"}, headers=headers)
+    assert response.status_code == 200
+    assert client.patch("/requests/2/status", json={"status": "helped"}, headers=headers).status_code == 200
+    response = client.patch("/requests/2/status", json={"status": "in_progress"}, headers=headers)
+    assert response.status_code == 409
+
+    client.post(
+        "/register",
+        json={"username": "helper", "email": "helper@example.com", "password": "helperpassword"}
+    )
+    helper_token = client.post(
+        "/login", json={"username": "helper", "password": "helperpassword"}
+    ).json()["access_token"]
+    helper = {"Authorization": f"Bearer {helper_token}"}
+    response = client.post("/requests/1/offers", json={"message": "On my way"}, headers=helper)
+    assert response.status_code == 201
+    assert response.json()["helper_username"] == "helper"
+    assert client.post("/requests/1/offers", json={}, headers=helper).status_code == 409
+    assert client.post("/requests/1/offers", json={}, headers=headers).status_code == 400
+    assert [offer["message"] for offer in client.get("/requests/1/offers").json()] == ["On my way"]
+    assert client.get("/requests/99/offers").status_code == 404
+
+    stats = client.get("/stats").json()
+    assert stats["total_requests"] == 3
+    assert stats["requests_by_status"] == {"open": 1, "in_progress": 1, "helped": 1}
+    assert client.get("/users/me/summary", headers=headers).json() == {
+        "user_id": 1,
+        "total_requests": 3,
+        "requests_by_status": {"open": 1, "in_progress": 1, "helped": 1},
+        "platform_requests": 3,
+    }
+    mine = client.get("/users/me/requests", params={"limit": 2}, headers=headers)
+    assert [r["id"] for r in mine.json()] == [3, 2]
+    rest = client.get(
+        "/users/me/requests", params={"cursor": mine.headers["X-Next-Cursor"]}, headers=headers
+    )
+    assert [r["id"] for r in rest.json()] == [1]
+
+    changes = client.get("/sync").json()["changes"]
+    assert {(change["entity"], change["id"]) for change in changes} == {
+        ("user", 1), ("user", 2), ("help_request", 1), ("help_request", 2), ("help_request", 3)
+    }
+
+def test_async_admin_and_leaderboard_routes(auth_token, monkeypatch):
+    """Test admin batch registration, reputation changes and ranks on the async app."""
+    monkeypatch.setattr(auth, "ADMIN_USER_IDS", frozenset({1}))
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    items = [
+        {"username": "alice", "email": "alice@example.com", "password": "alicepassword"},
+        {"username": "testuser", "email": "taken@example.com", "password": "takenpassword"},
+    ]
+    response = client.post("/users/batch", json={"items": items}, headers=headers)
+    assert response.status_code == 200
+    assert (response.json()["created"], response.json()["failed"]) == (1, 1)
+    assert client.post("/login", json={"username": "alice", "password": "alicepassword"}).status_code == 200
+
+    response = client.post("/users/2/reputation", json={"delta": 5, "reason": "helpful"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["reputation"] == 5
+    assert client.post("/users/99/reputation", json={"delta": 1}, headers=headers).status_code == 404
+
+    leaders = client.get("/users/leaderboard").json()
+    assert [(entry["username"], entry["rank"]) for entry in leaders] == [("alice", 1), ("testuser", 2)]
+    assert client.get("/users/2/rank").json()["rank"] == 1
+    assert client.get("/users/99/rank").status_code == 404
+
+    monkeypatch.setattr(auth, "ADMIN_USER_IDS", frozenset())
+    assert client.post("/users/batch", json={"items": []}, headers=headers).status_code == 403
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import create_engine
+from app.config import Settings
+from app.database import describe_engine, engine_options, ensure_columns, install_sqlite_pragmas
+
+def test_settings_from_env(monkeypatch):
+    """Test settings and pragma overrides are read from the environment."""
+    monkeypatch.setenv("TRUSTLOOP_DATABASE_URL", "sqlite:///./other.db")
+    monkeypatch.setenv("TRUSTLOOP_DB_POOL_SIZE", "12")
+    monkeypatch.setenv("TRUSTLOOP_SQLITE_BUSY_TIMEOUT", "250")
+    settings = Settings.from_env()
+    assert settings.database_url == "sqlite:///./other.db"
+    assert settings.db_pool_size == 12
+    assert settings.sqlite_pragmas["busy_timeout"] == "250"
+    assert settings.sqlite_pragmas["journal_mode"] == "WAL"
+
+    monkeypatch.setenv("TRUSTLOOP_SQLITE_PROFILE", "default")
+    assert Settings.from_env().sqlite_pragmas == {"busy_timeout": "250"}
+
+    monkeypatch.setenv("TRUSTLOOP_SQLITE_PROFILE", "turbo")
+    with pytest.raises(ValueError):
+        Settings.from_env()
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    """Test every new connection gets the production pragma profile."""
+    url = f"sqlite:///{tmp_path / 'pragmas.db'}"
+    engine = create_engine(url, **engine_options(url))
+    install_sqlite_pragmas(engine)
+
+    pragmas = describe_engine(engine)["pragmas"]
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["synchronous"] == 1  # NORMAL
+    assert pragmas["busy_timeout"] == 5000
+    assert pragmas["temp_store"] == 2  # MEMORY
+    engine.dispose()
+
+def test_in_memory_engine_options():
+    """Test in-memory SQLite URLs skip pool sizing arguments."""
+    assert "pool_size" not in engine_options("sqlite://")
+    assert engine_options("sqlite:///./trustloop.db")["pool_size"] > 0
+
+def test_ensure_columns_adds_missing_columns(tmp_path):
+    """Test tables created before a column existed gain it with its default."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE help_requests (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, "
+            "description TEXT NOT NULL, created_by INTEGER NOT NULL, created_at DATETIME)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO help_requests (title, description, created_by) VALUES ('t', 'd', 1)"
+        )
+    ensure_columns(engine)
+    ensure_columns(engine)  # idempotent
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT status FROM help_requests").scalar() == "open"
+    engine.dispose()
+
+def test_ensure_columns_uses_one_connection(tmp_path):
+    """Test ensure_columns works when the pool holds a single connection."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'small.db'}", pool_size=1, max_overflow=0, pool_timeout=1
+    )
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE help_requests (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, "
+            "description TEXT NOT NULL, created_by INTEGER NOT NULL, created_at DATETIME)"
+        )
+    ensure_columns(engine)
+    assert engine.pool.checkedout() == 0
+    engine.dispose()
@@ -0,0 +1,79 @@
+import threading
+import time
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.main import app
+from app.hashing import HashingPool
+
+# Create test client
+client = TestClient(app)
+
+@pytest.fixture
+def pool():
+    """Create a single-worker hashing pool and shut it down after the test."""
+    hashing_pool = HashingPool(max_workers=1, queue_depth=1)
+    yield hashing_pool
+    hashing_pool.shutdown()
+
+def test_hash_and_verify_on_process_pool(pool):
+    """Test hashes computed in a worker process verify correctly."""
+    hashed = pool.hash("testpassword123")
+    assert hashed != "testpassword123"
+    assert pool.verify("testpassword123", hashed)
+    assert not pool.verify("wrongpassword", hashed)
+
+    metrics = pool.metrics()
+    assert metrics["completed"] == 3
+    assert metrics["in_flight"] == 0
+    assert metrics["hash_time_avg_ms"] > 0
+
+def test_full_queue_rejects_with_503(pool):
+    """Test callers get a fast 503 once workers and queue are all occupied."""
+    # One running job plus one queued job fill a pool with queue_depth=1
+    pool._slots.acquire()
+    pool._slots.acquire()
+    try:
+        with pytest.raises(HTTPException) as exc_info:
+            pool.hash("testpassword123")
+    finally:
+        pool._slots.release()
+        pool._slots.release()
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "1"
+    assert pool.metrics()["rejected"] == 1
+
+def test_inline_pool():
+    """Test a pool with no workers hashes in the calling thread."""
+    inline_pool = HashingPool(max_workers=0, queue_depth=0)
+    assert inline_pool.verify("secret", inline_pool.hash("secret"))
+    assert inline_pool._executor is None
+
+def test_metrics_endpoint():
+    """Test hashing metrics are exposed over the API."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert {"workers", "queue_depth", "rejected", "queue_wait_avg_ms", "hash_time_avg_ms"} <= set(
+        response.json()["password_hashing"]
+    )
+
+def test_batch_leaves_a_worker_for_single_hashes():
+    """Test a single hash completes while a large batch is still running."""
+    two_workers = HashingPool(max_workers=2, queue_depth=4)
+    try:
+        two_workers.hash("warm up")
+        batch_done = threading.Event()
+
+        def run_batch():
+            two_workers.hash_many(f"password{i}" for i in range(8))
+            batch_done.set()
+
+        batch = threading.Thread(target=run_batch)
+        batch.start()
+        time.sleep(0.2)
+        assert two_workers.verify("warm up", two_workers.hash("warm up"))
+        assert not batch_done.is_set()
+        batch.join()
+        assert two_workers.metrics()["completed"] == 1 + 8 + 2
+    finally:
+        two_workers.shutdown()
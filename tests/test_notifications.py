@@ -0,0 +1,226 @@
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import get_db, Base
+from app import feed, notifications, principals
+from app.feed import RequestFeed
+from app.notifications import NotificationHub, format_event
+
+# Test database setup
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+# Create test client
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def setup_database():
+    """Create and clean up test database for each test."""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+def register_and_login(username):
+    client.post(
+        "/register",
+        json={"username": username, "email": f"{username}@example.com", "password": "password123"}
+    )
+    token = client.post(
+        "/login", json={"username": username, "password": "password123"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+def test_hub_drops_oldest_when_queue_is_full():
+    """Test a slow subscriber keeps only the newest events."""
+    async def scenario():
+        hub = NotificationHub(max_queue=3)
+        subscriber = hub.subscribe(1)
+        for i in range(5):
+            assert hub.publish(1, {"id": i}) == 1
+        assert hub.publish(2, {"id": 99}) == 0
+        received = [await subscriber.get(timeout=1) for _ in range(3)]
+        assert await subscriber.get(timeout=0.01) is None
+        metrics = hub.metrics()
+        hub.unsubscribe(subscriber)
+        return received, metrics, hub.metrics()
+
+    received, metrics, after = asyncio.run(scenario())
+    assert [event["id"] for event in received] == [2, 3, 4]
+    assert metrics["dropped"] == 2
+    assert metrics["subscribers"] == 1
+    assert after["subscribers"] == 0
+
+def test_event_stream_frames():
+    """Test the SSE stream sends a greeting, events and keepalives until disconnect."""
+    class FakeRequest:
+        def __init__(self, checks):
+            self.checks = checks
+
+        async def is_disconnected(self):
+            self.checks -= 1
+            return self.checks < 0
+
+    async def scenario():
+        stream = notifications.event_stream(FakeRequest(2), user_id=7, keepalive=0.01)
+        frames = [await stream.__anext__()]
+        notifications.hub.publish(7, {"id": 1, "type": "offer", "message": "hi"})
+        frames.append(await stream.__anext__())
+        frames.append(await stream.__anext__())
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+        return frames
+
+    frames = asyncio.run(scenario())
+    assert frames[0] == ": connected\n\n"
+    assert frames[1] == format_event({"id": 1, "type": "offer", "message": "hi"})
+    assert frames[1].startswith("id: 1\nevent: offer\ndata: ")
+    assert frames[2] == ": keepalive\n\n"
+    assert notifications.hub.metrics()["subscribers"] == 0
+
+def test_offer_is_persisted_and_pushed_to_requester(setup_database):
+    """Test an offer is stored, listed and delivered to the request creator's stream."""
+    requester = register_and_login("requester")
+    helper = register_and_login("helper")
+    request_id = client.post(
+        "/requests", json={"title": "Move a sofa", "description": "Saturday"}, headers=requester
+    ).json()["id"]
+
+    async def scenario():
+        subscriber = notifications.hub.subscribe(1)
+        try:
+            response = await asyncio.get_running_loop().run_in_executor(
+                None,
+                lambda: client.post(
+                    f"/requests/{request_id}/offers", json={"message": "I have a van"}, headers=helper
+                ),
+            )
+            return response, await subscriber.get(timeout=5)
+        finally:
+            notifications.hub.unsubscribe(subscriber)
+
+    response, event = asyncio.run(scenario())
+    assert response.status_code == 201
+    assert response.json()["helper_username"] == "helper"
+    assert event["type"] == "offer"
+    assert event["request_title"] == "Move a sofa"
+    assert event["message"] == "I have a van"
+    assert json.loads(json.dumps(event)) == event
+
+    offers = client.get(f"/requests/{request_id}/offers").json()
+    assert [(o["helper_username"], o["message"]) for o in offers] == [("helper", "I have a van")]
+
+    duplicate = client.post(f"/requests/{request_id}/offers", json={}, headers=helper)
+    assert duplicate.status_code == 409
+    own = client.post(f"/requests/{request_id}/offers", json={}, headers=requester)
+    assert own.status_code == 400
+    missing = client.post("/requests/999/offers", json={}, headers=helper)
+    assert missing.status_code == 404
+
+    # Deleting the helper removes their offers
+    assert client.delete("/users/2").status_code == 204
+    assert client.get(f"/requests/{request_id}/offers").json() == []
+
+def test_feed_replays_missed_events():
+    """Test a resuming subscriber gets only missed events, or a reset once they are forgotten."""
+    async def scenario():
+        request_feed = RequestFeed(history=3, max_queue=10)
+        for i in range(5):
+            request_feed.publish(feed.REQUEST_DELETED, request_id=i)
+        results = {}
+        for last_event_id in (None, 5, 3, 1, 9):
+            subscriber, backlog = request_feed.subscribe(last_event_id)
+            results[last_event_id] = [(event["id"], event["type"]) for event in backlog]
+            request_feed.unsubscribe(subscriber)
+        subscriber, _ = request_feed.subscribe(5)
+        request_feed.publish(feed.REQUEST_DELETED, request_id=5)
+        live = await subscriber.get(timeout=1)
+        request_feed.unsubscribe(subscriber)
+        return results, live, request_feed.metrics()
+
+    results, live, metrics = asyncio.run(scenario())
+    assert results[None] == []
+    assert results[5] == []
+    assert results[3] == [(4, "request_deleted"), (5, "request_deleted")]
+    # Event 2 was forgotten, and 9 predates a restart of the numbering
+    assert results[1] == [(5, "reset")]
+    assert results[9] == [(5, "reset")]
+    assert live == {"id": 6, "type": "request_deleted", "request_id": 5}
+    assert metrics["history"] == 3
+    assert metrics["subscribers"] == 0
+
+def test_request_feed_follows_writes(setup_database):
+    """Test every request write path publishes to the feed and WebSocket clients can resume."""
+    headers = register_and_login("requester")
+    created = client.post("/requests", json={"title": "One", "description": "x"}, headers=headers)
+    client.post(
+        "/requests/batch",
+        json={"items": [{"title": "Two", "description": "x"}, {"title": "Three", "description": "x"}]},
+        headers=headers,
+    )
+    client.patch(f"/requests/{created.json()['id']}/status", json={"status": "helped"}, headers=headers)
+
+    with client.websocket_connect("/requests/stream/ws?last_event_id=1") as websocket:
+        missed = [websocket.receive_json() for _ in range(3)]
+        assert client.delete("/users/1").status_code == 204
+        live = [websocket.receive_json() for _ in range(3)]
+
+    assert [(e["id"], e["type"]) for e in missed] == [
+        (2, "request_created"), (3, "request_created"), (4, "request_updated")
+    ]
+    assert [e["request"]["title"] for e in missed] == ["Two", "Three", "One"]
+    assert missed[2]["request"]["status"] == "helped"
+    assert [(e["type"], e["request_id"]) for e in live] == [
+        ("request_deleted", 1), ("request_deleted", 2), ("request_deleted", 3)
+    ]
+    assert client.get("/metrics").json()["request_feed"]["subscribers"] == 0
+    assert client.get("/requests/stream", headers={"Last-Event-ID": "abc"}).status_code == 400
+
+def test_notification_stream_releases_its_connection(setup_database, monkeypatch):
+    """Test an open notification stream does not keep a pooled database connection."""
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    token = register_and_login("listener")["Authorization"].encode()
+    # Make authentication read the user from the database
+    principals.cache.clear()
+
+    async def scenario():
+        first_frame = asyncio.Event()
+        disconnect = asyncio.Event()
+
+        async def receive():
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                first_frame.set()
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/users/me/notifications/stream",
+            "raw_path": b"/users/me/notifications/stream", "query_string": b"", "root_path": "",
+            "headers": [(b"host", b"testserver"), (b"authorization", token)],
+            "client": ("testclient", 50000), "server": ("testserver", 80),
+        }
+        stream = asyncio.create_task(app(scope, receive, send))
+        await asyncio.wait_for(first_frame.wait(), timeout=5)
+        checked_out = engine.pool.checkedout()
+        disconnect.set()
+        await asyncio.wait_for(stream, timeout=5)
+        return checked_out
+
+    assert asyncio.run(scenario()) == 0
+    assert principals.cache.metrics()["size"] == 1
@@ -1,9 +1,17 @@
+import csv
+import io
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.main import app
+from app import crud, serialization
+from app.config import settings
 from app.database import get_db, Base
+from app.models import HelpRequest, StatCounter
+from app.schemas import HelpRequestResponse
+from app.stats import get_stats, rebuild_stats
+from tests.utils import assert_num_queries, count_queries
 
 # Test database setup
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -219,3 +227,471 @@ def test_help_request_validation(auth_token):
         headers={"Authorization": f"Bearer {auth_token}"}
     )
     assert response.status_code == 422  # Validation error
+
+def test_get_help_requests_cursor_pagination(auth_token):
+    """Test keyset pagination walks every request exactly once in order."""
+    for i in range(5):
+        client.post(
+            "/requests",
+            json={"title": f"Request {i}", "description": "Paginated"},
+            headers={"Authorization": f"Bearer {auth_token}"}
+        )
+
+    titles = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/requests", params=params)
+        assert response.status_code == 200
+        assert len(response.json()) <= 2
+        titles.extend(r["title"] for r in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert titles == [f"Request {i}" for i in range(5)]
+
+def test_get_help_requests_newest_first(auth_token):
+    """Test order=desc pages from the newest request back to the oldest."""
+    for i in range(5):
+        client.post(
+            "/requests",
+            json={"title": f"Request {i}", "description": "Paginated"},
+            headers={"Authorization": f"Bearer {auth_token}"}
+        )
+
+    first = client.get("/requests", params={"limit": 3, "order": "desc"})
+    second = client.get(
+        "/requests",
+        params={"limit": 3, "order": "desc", "cursor": first.headers["X-Next-Cursor"]}
+    )
+    titles = [r["title"] for r in first.json() + second.json()]
+    assert titles == [f"Request {i}" for i in reversed(range(5))]
+    assert "X-Next-Cursor" not in second.headers
+
+    response = client.get("/requests", params={"order": "random"})
+    assert response.status_code == 422
+
+def test_get_help_requests_filter_by_creator(auth_token):
+    """Test filtering help requests by creator and time range."""
+    client.post(
+        "/requests",
+        json={"title": "Mine", "description": "Created by testuser"},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+
+    response = client.get("/requests", params={"created_by": 1})
+    assert response.status_code == 200
+    assert [r["title"] for r in response.json()] == ["Mine"]
+
+    response = client.get("/requests", params={"created_by": 2})
+    assert response.json() == []
+
+    response = client.get("/requests", params={"created_after": "2999-01-01T00:00:00Z"})
+    assert response.json() == []
+
+def test_get_help_requests_invalid_cursor(setup_database):
+    """Test a malformed cursor is rejected."""
+    response = client.get("/requests", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+def test_get_help_requests_query_count(setup_database):
+    """Test listing requests from several users issues a version check plus a single SELECT."""
+    for name in ("alice", "bob", "carol"):
+        client.post(
+            "/register",
+            json={"username": name, "email": f"{name}@example.com", "password": "password123"}
+        )
+        token = client.post(
+            "/login", json={"username": name, "password": "password123"}
+        ).json()["access_token"]
+        for i in range(2):
+            client.post(
+                "/requests",
+                json={"title": f"{name} {i}", "description": "Query count"},
+                headers={"Authorization": f"Bearer {token}"}
+            )
+
+    with assert_num_queries(2):
+        response = client.get("/requests")
+    assert response.status_code == 200
+    assert len(response.json()) == 6
+    assert {r["creator"]["username"] for r in response.json()} == {"alice", "bob", "carol"}
+
+def test_export_help_requests_csv(auth_token):
+    """Test help requests stream out as CSV with the creator's username."""
+    client.post(
+        "/requests",
+        json={"title": "Need help, urgently", "description": "Line one\nLine two"},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+
+    response = client.get("/export/requests", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == [
+        "id", "title", "description", "created_by", "creator_username", "created_at", "status"
+    ]
+    assert rows[1][1:5] == ["Need help, urgently", "Line one\nLine two", "1", "testuser"]
+
+def test_search_help_requests(auth_token):
+    """Test full-text search ranks title matches first and supports prefixes."""
+    for title, description in [
+        ("Garden fence repair", "The wind knocked over a panel of my fence"),
+        ("Python decorators", "Confused about decorators and closures"),
+        ("Moving boxes", "Need a hand carrying boxes; also my garden needs weeding"),
+    ]:
+        client.post(
+            "/requests",
+            json={"title": title, "description": description},
+            headers={"Authorization": f"Bearer {auth_token}"}
+        )
+
+    response = client.get("/requests/search", params={"q": "garden"})
+    assert response.status_code == 200
+    assert [r["title"] for r in response.json()] == ["Garden fence repair", "Moving boxes"]
+    assert response.json()[0]["creator"]["username"] == "testuser"
+
+    response = client.get("/requests/search", params={"q": "decor"})
+    assert [r["title"] for r in response.json()] == ["Python decorators"]
+
+    response = client.get("/requests/search", params={"q": "garden", "limit": 1})
+    assert len(response.json()) == 1
+    assert response.headers["X-Next-Offset"] == "1"
+
+    response = client.get("/requests/search", params={"q": "\"AND OR*"})
+    assert response.status_code == 200
+    assert response.json() == []
+
+def test_search_index_tracks_deletes(auth_token):
+    """Test the search index drops requests deleted from the table."""
+    client.post(
+        "/requests",
+        json={"title": "Bicycle tune-up", "description": "Gears slipping"},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    db = TestingSessionLocal()
+    try:
+        db.query(HelpRequest).delete()
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.get("/requests/search", params={"q": "bicycle"})
+    assert response.json() == []
+
+def test_get_help_requests_etag(auth_token):
+    """Test conditional GET on the request list until a new request is created."""
+    response = client.get("/requests")
+    etag = response.headers["ETag"]
+
+    with assert_num_queries(1):
+        response = client.get("/requests", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    # Different query parameters produce a different representation
+    response = client.get("/requests", params={"limit": 5}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+    client.post(
+        "/requests",
+        json={"title": "New", "description": "Changes the list"},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    response = client.get("/requests", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json()) == 1
+
+def test_create_help_requests_batch(auth_token):
+    """Test many help requests are created in one call, in order."""
+    items = [{"title": f"Batch {i}", "description": "Bulk import"} for i in range(3)]
+    response = client.post(
+        "/requests/batch",
+        json={"items": items},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 3
+    assert data["failed"] == 0
+    assert [r["index"] for r in data["results"]] == [0, 1, 2]
+
+    listed = client.get("/requests").json()
+    assert [r["id"] for r in listed] == [r["id"] for r in data["results"]]
+    assert [r["title"] for r in listed] == ["Batch 0", "Batch 1", "Batch 2"]
+    assert client.get("/requests/search", params={"q": "batch"}).json() != []
+
+    response = client.post(
+        "/requests/batch",
+        json={"items": items[:1] * (settings.batch_max_items + 1)},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "too_long"
+
+    # One invalid item rejects the whole batch before anything is written
+    response = client.post(
+        "/requests/batch",
+        json={"items": [{"title": "Valid", "description": "ok"}, {"title": "No description"}]},
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert response.status_code == 422
+    assert len(client.get("/requests").json()) == 3
+
+def test_stats_counters(auth_token):
+    """Test /stats counts are maintained on create, batch create and user delete."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.post("/requests", json={"title": "One", "description": "first"}, headers=headers)
+    client.post(
+        "/requests/batch",
+        json={"items": [{"title": "Two", "description": "second"}, {"title": "Three", "description": "third"}]},
+        headers=headers
+    )
+    client.post(
+        "/register",
+        json={"username": "other", "email": "other@example.com", "password": "password123"}
+    )
+    other_token = client.post(
+        "/login", json={"username": "other", "password": "password123"}
+    ).json()["access_token"]
+    client.post(
+        "/requests",
+        json={"title": "Four", "description": "fourth"},
+        headers={"Authorization": f"Bearer {other_token}"}
+    )
+
+    with assert_num_queries(3):  # versions, counters, usernames
+        data = client.get("/stats").json()
+    assert data["total_requests"] == 4
+    assert [(u["username"], u["count"]) for u in data["requests_by_user"]] == [
+        ("testuser", 3), ("other", 1)
+    ]
+    assert data["requests_by_status"] == {"open": 4}
+    assert sum(day["count"] for day in data["requests_by_day"]) == 4
+
+    # Deleting a user removes their requests and their counts
+    assert client.delete("/users/1").status_code == 204
+    data = client.get("/stats").json()
+    assert data["total_requests"] == 1
+    assert [u["username"] for u in data["requests_by_user"]] == ["other"]
+    assert len(client.get("/requests").json()) == 1
+
+    # Incremental counters agree with a full recount
+    db = TestingSessionLocal()
+    try:
+        incremental = get_stats(db)
+        rebuild_stats(db)
+        assert get_stats(db) == incremental
+        assert db.query(StatCounter).filter(StatCounter.count <= 0).count() == 0
+    finally:
+        db.close()
+
+def test_my_requests_and_summary(auth_token):
+    """Test /users/me/requests pages only the caller's requests and /users/me/summary counts them."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i in range(3):
+        client.post("/requests", json={"title": f"Mine {i}", "description": "x"}, headers=headers)
+    client.post(
+        "/register",
+        json={"username": "other", "email": "other@example.com", "password": "password123"}
+    )
+    other_token = client.post(
+        "/login", json={"username": "other", "password": "password123"}
+    ).json()["access_token"]
+    client.post(
+        "/requests",
+        json={"title": "Theirs", "description": "x"},
+        headers={"Authorization": f"Bearer {other_token}"}
+    )
+
+    first = client.get("/users/me/requests", params={"limit": 2}, headers=headers)
+    assert first.status_code == 200
+    second = client.get(
+        "/users/me/requests",
+        params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]},
+        headers=headers
+    )
+    assert [r["title"] for r in first.json() + second.json()] == ["Mine 2", "Mine 1", "Mine 0"]
+    assert client.get("/users/me/requests").status_code == 403
+
+    with assert_num_queries(2):  # versions, counters
+        response = client.get("/users/me/summary", headers=headers)
+    assert response.json() == {
+        "user_id": 1,
+        "total_requests": 3,
+        "requests_by_status": {"open": 3},
+        "platform_requests": 4,
+    }
+
+def test_help_request_status_transitions(auth_token):
+    """Test the creator moves a request through its lifecycle and /stats follows."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i in range(3):
+        client.post("/requests", json={"title": f"Request {i}", "description": "x"}, headers=headers)
+
+    response = client.patch("/requests/1/status", json={"status": "in_progress"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "in_progress"
+    assert client.patch(
+        "/requests/1/status", json={"status": "helped"}, headers=headers
+    ).json()["status"] == "helped"
+    # helped requests can only be closed
+    assert client.patch(
+        "/requests/1/status", json={"status": "open"}, headers=headers
+    ).status_code == 409
+    assert client.patch(
+        "/requests/2/status", json={"status": "closed"}, headers=headers
+    ).status_code == 200
+    assert client.patch(
+        "/requests/2/status", json={"status": "unknown"}, headers=headers
+    ).status_code == 422
+    assert client.patch("/requests/99/status", json={"status": "closed"}, headers=headers).status_code == 404
+    assert client.patch("/requests/3/status", json={"status": "closed"}).status_code == 403
+
+    client.post(
+        "/register",
+        json={"username": "other", "email": "other@example.com", "password": "password123"}
+    )
+    other_token = client.post(
+        "/login", json={"username": "other", "password": "password123"}
+    ).json()["access_token"]
+    assert client.patch(
+        "/requests/3/status",
+        json={"status": "closed"},
+        headers={"Authorization": f"Bearer {other_token}"}
+    ).status_code == 403
+
+    assert [r["title"] for r in client.get("/requests", params={"status": "open"}).json()] == ["Request 2"]
+    assert [r["id"] for r in client.get("/requests", params={"status": "helped"}).json()] == [1]
+    assert client.get("/requests", params={"status": "pending"}).status_code == 422
+    assert client.get("/stats").json()["requests_by_status"] == {"open": 1, "helped": 1, "closed": 1}
+    assert client.get("/users/me/summary", headers=headers).json()["requests_by_status"] == {
+        "open": 1, "helped": 1, "closed": 1
+    }
+
+    db = TestingSessionLocal()
+    try:
+        incremental = get_stats(db)
+        rebuild_stats(db)
+        assert get_stats(db) == incremental
+    finally:
+        db.close()
+
+def test_status_filter_uses_index(setup_database):
+    """Test filtering by status is served by the (status, created_at, id) index."""
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT id FROM help_requests WHERE status = 'open' "
+            "ORDER BY created_at, id LIMIT 20"
+        ).all()
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_help_requests_status_created_at_id" in details
+    assert "TEMP B-TREE" not in details
+
+def test_list_json_matches_response_models(auth_token, monkeypatch):
+    """Test the orjson list path and its pydantic-core fallback emit what the models would."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i in range(3):
+        client.post("/requests", json={"title": f"Request {i}", "description": "x"}, headers=headers)
+
+    response = client.get("/requests", params={"limit": 2})
+    assert response.headers["content-type"] == "application/json"
+    assert "X-Next-Cursor" in response.headers and "ETag" in response.headers
+    db = TestingSessionLocal()
+    try:
+        rows, _ = crud.list_help_requests(db, limit=2)
+        expected = [HelpRequestResponse.model_validate(row).model_dump(mode="json") for row in rows]
+        assert response.json() == expected
+
+        fast = serialization.dump(rows)
+        monkeypatch.setattr(serialization, "orjson", None)
+        assert serialization.dump(rows) == fast
+    finally:
+        db.close()
+
+def test_sparse_fieldsets(auth_token):
+    """Test fields= and expand= shape /requests items and only select what they need."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i in range(3):
+        client.post("/requests", json={"title": f"Request {i}", "description": "x" * 500}, headers=headers)
+
+    with count_queries() as statements:
+        response = client.get("/requests", params={"fields": "id,title", "limit": 2})
+    assert response.json() == [{"id": 1, "title": "Request 0"}, {"id": 2, "title": "Request 1"}]
+    page_query = statements[-1]
+    assert "description" not in page_query and "JOIN users" not in page_query
+    # The cursor still works without created_at in the output
+    rest = client.get(
+        "/requests",
+        params={"fields": "id,title", "cursor": response.headers["X-Next-Cursor"]},
+    )
+    assert rest.json() == [{"id": 3, "title": "Request 2"}]
+
+    with count_queries() as statements:
+        items = client.get("/requests", params={"fields": "title,id,creator.username"}).json()
+    assert items[0] == {"id": 1, "title": "Request 0", "creator": {"username": "testuser"}}
+    assert "JOIN users" in statements[-1] and "email" not in statements[-1]
+
+    expanded = client.get("/requests", params={"fields": "id", "expand": "creator"}).json()[0]
+    assert set(expanded) == {"id", "creator"}
+    assert set(expanded["creator"]) == {"id", "username", "email", "reputation", "created_at"}
+    assert client.get("/requests", params={"expand": "creator"}).json() == client.get("/requests").json()
+
+    assert client.get("/requests", params={"fields": "id,secret"}).status_code == 400
+    assert client.get("/requests", params={"fields": ","}).status_code == 400
+    assert client.get("/requests", params={"expand": "offers"}).status_code == 400
+
+def test_list_compression_and_cache(auth_token):
+    """Test gzip is negotiated for large lists and unchanged pages are served from the cache."""
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i in range(5):
+        client.post("/requests", json={"title": f"Request {i}", "description": "x" * 500}, headers=headers)
+    before = client.get("/metrics").json()["compression"]
+
+    with count_queries() as statements:
+        response = client.get("/requests", headers={"Accept-Encoding": "gzip"})
+    assert len(statements) == 2  # versions, page
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["ETag"].startswith('W/"')
+    assert int(response.headers["Content-Length"]) < len(response.content)
+    assert len(response.json()) == 5
+    weak_etag = response.headers["ETag"]
+
+    # The same page again only checks the versions
+    with assert_num_queries(1):
+        again = client.get("/requests", headers={"Accept-Encoding": "gzip"})
+    assert again.content == response.content
+    with assert_num_queries(1):
+        identity = client.get("/requests", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "Content-Encoding" not in identity.headers
+    assert identity.json() == response.json()
+    assert identity.headers["ETag"] == weak_etag.removeprefix("W/")
+    assert client.get("/requests", headers={"If-None-Match": weak_etag}).status_code == 304
+
+    # Small bodies are not worth compressing
+    small = client.get(
+        "/requests", params={"fields": "id", "limit": 1}, headers={"Accept-Encoding": "gzip"}
+    )
+    assert "Content-Encoding" not in small.headers
+    assert "X-Next-Cursor" in small.headers
+    with assert_num_queries(1):
+        small_again = client.get("/requests", params={"fields": "id", "limit": 1})
+    assert small_again.headers["X-Next-Cursor"] == small.headers["X-Next-Cursor"]
+
+    # A write changes the version, so the next list is built again
+    client.post("/requests", json={"title": "New", "description": "y" * 500}, headers=headers)
+    with count_queries() as statements:
+        response = client.get("/requests", headers={"Accept-Encoding": "gzip"})
+    assert len(statements) == 2
+    assert len(response.json()) == 6
+
+    metrics = client.get("/metrics").json()["compression"]
+    assert metrics["hits"] - before["hits"] == 3
+    assert metrics["compressions"] - before["compressions"] == 2
+    assert metrics["bytes_saved"] > before["bytes_saved"]
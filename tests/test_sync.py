@@ -0,0 +1,148 @@
+from datetime import timedelta
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.database import get_db, Base
+from app.changelog import compact_changes, ensure_change_log, get_horizon
+from app.compaction import PeriodicCompactor
+from app.models import ChangeLogEntry, HelpRequest, User
+
+# Test database setup
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+# Create test client
+client = TestClient(app)
+
+@pytest.fixture(scope="function")
+def setup_database():
+    """Create and clean up test database for each test."""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+def register_and_login(username):
+    client.post(
+        "/register",
+        json={"username": username, "email": f"{username}@example.com", "password": "password123"}
+    )
+    token = client.post(
+        "/login", json={"username": username, "password": "password123"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+def summarize(changes):
+    return [(c["entity"], c["id"], c["op"]) for c in changes]
+
+def test_sync_returns_only_new_changes(setup_database):
+    """Test /sync pages through the change log and reports deletes as tombstones."""
+    alice = register_and_login("alice")
+    bob = register_and_login("bob")
+    client.post("/requests", json={"title": "A1", "description": "x"}, headers=alice)
+    client.post(
+        "/requests/batch",
+        json={"items": [{"title": "B1", "description": "x"}, {"title": "B2", "description": "x"}]},
+        headers=bob,
+    )
+
+    first = client.get("/sync", params={"limit": 3}).json()
+    assert summarize(first["changes"]) == [
+        ("user", 1, "upsert"), ("user", 2, "upsert"), ("help_request", 1, "upsert")
+    ]
+    assert first["changes"][0]["user"]["username"] == "alice"
+    assert first["changes"][2]["request"]["title"] == "A1"
+    assert first["has_more"] and not first["reset"]
+    rest = client.get("/sync", params={"since": first["next_since"]}).json()
+    assert summarize(rest["changes"]) == [("help_request", 2, "upsert"), ("help_request", 3, "upsert")]
+    assert not rest["has_more"]
+
+    cursor = rest["next_since"]
+    assert client.get("/sync", params={"since": cursor}).json() == {
+        "changes": [], "next_since": cursor, "has_more": False, "reset": False
+    }
+
+    client.patch("/requests/1/status", json={"status": "helped"}, headers=alice)
+    client.patch("/requests/1/status", json={"status": "closed"}, headers=alice)
+    assert client.delete("/users/2").status_code == 204
+    delta = client.get("/sync", params={"since": cursor}).json()
+    # Only the latest entry per entity is sent, carrying its current state
+    assert summarize(delta["changes"]) == [
+        ("help_request", 1, "upsert"),
+        ("help_request", 2, "delete"),
+        ("help_request", 3, "delete"),
+        ("user", 2, "delete"),
+    ]
+    assert delta["changes"][0]["request"]["status"] == "closed"
+    assert delta["changes"][1]["request"] is None
+
+    # A cursor from another database is told to start over
+    assert client.get("/sync", params={"since": 10_000}).json()["reset"] is True
+
+def test_compaction_keeps_latest_entries_and_resets_stale_clients(setup_database):
+    """Test compaction drops superseded entries, and stale clients reset once tombstones go."""
+    alice = register_and_login("alice")
+    register_and_login("bob")
+    client.post("/requests", json={"title": "A1", "description": "x"}, headers=alice)
+    client.patch("/requests/1/status", json={"status": "closed"}, headers=alice)
+    stale_cursor = client.get("/sync", params={"limit": 1}).json()["next_since"]
+    assert client.delete("/users/2").status_code == 204
+
+    db = TestingSessionLocal()
+    try:
+        # The request's first upsert and bob's upsert are superseded
+        assert compact_changes(db, timedelta(days=7)) == 2
+        db.commit()
+        assert get_horizon(db) == 0
+        assert client.get("/sync", params={"since": stale_cursor}).json()["reset"] is False
+
+        assert compact_changes(db, timedelta(0)) == 1  # bob's tombstone
+        db.commit()
+        assert get_horizon(db) > stale_cursor
+        assert db.query(ChangeLogEntry).count() == 2
+    finally:
+        db.close()
+
+    assert client.get("/sync", params={"since": stale_cursor}).json() == {
+        "changes": [], "next_since": 0, "has_more": False, "reset": True
+    }
+    # Starting over from 0 still yields every live entity
+    assert summarize(client.get("/sync").json()["changes"]) == [
+        ("user", 1, "upsert"), ("help_request", 1, "upsert")
+    ]
+
+def test_ensure_change_log_backfills_existing_rows(setup_database):
+    """Test databases that predate the change log get one entry per existing row."""
+    db = TestingSessionLocal()
+    try:
+        db.add(User(username="old", email="old@example.com", password_hash="x", reputation=0))
+        db.flush()
+        db.add(HelpRequest(title="Old", description="x", created_by=1))
+        db.commit()
+    finally:
+        db.close()
+
+    ensure_change_log(engine)
+    ensure_change_log(engine)  # idempotent
+    assert summarize(client.get("/sync").json()["changes"]) == [
+        ("user", 1, "upsert"), ("help_request", 1, "upsert")
+    ]
+
+def test_compactor_without_compact_cannot_be_built():
+    """Test a compactor subclass missing compact fails when built, not in its thread."""
+    class IncompleteCompactor(PeriodicCompactor):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        IncompleteCompactor(TestingSessionLocal, interval=1, retention=timedelta(days=1))
@@ -1,10 +1,19 @@
+import csv
+import io
+import json
 import pytest
+from datetime import datetime, timedelta, timezone
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import create_engine, event, update
 from sqlalchemy.orm import sessionmaker
 from app.main import app
 from app.database import get_db, Base
-from app.models import User
+from app.models import User, ReputationEvent, TableVersion
+from app.reputation import apply_delta, compact_events, record_adjustment
+from app import auth, export, leaderboard, principals, versioning
+from app.principals import Principal, PrincipalCache
+from tests.utils import assert_num_queries
 
 # Test database setup
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -197,3 +206,502 @@ def test_get_current_user_invalid_token(setup_database):
         headers={"Authorization": "Bearer invalid_token"}
     )
     assert response.status_code == 401
+
+def test_get_users_query_count(setup_database):
+    """Test user list and detail endpoints issue a version check plus a single SELECT each."""
+    for name in ("alice", "bob"):
+        client.post(
+            "/register",
+            json={"username": name, "email": f"{name}@example.com", "password": "password123"}
+        )
+
+    with assert_num_queries(2):
+        response = client.get("/users")
+    assert len(response.json()) == 2
+
+    with assert_num_queries(2):
+        response = client.get("/users/1")
+    assert response.json()["username"] == "alice"
+
+def test_export_users_ndjson(setup_database):
+    """Test users stream out as NDJSON without password hashes."""
+    for name in ("alice", "bob"):
+        client.post(
+            "/register",
+            json={"username": name, "email": f"{name}@example.com", "password": "password123"}
+        )
+
+    response = client.get("/export/users")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["username"] for r in rows] == ["alice", "bob"]
+    assert all("password_hash" not in r for r in rows)
+
+def test_export_users_csv(setup_database):
+    """Test users stream out as CSV with a header row."""
+    client.post(
+        "/register",
+        json={"username": "alice", "email": "alice@example.com", "password": "password123"}
+    )
+
+    response = client.get("/export/users", params={"format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "username", "email", "reputation", "created_at"]
+    assert rows[1][1] == "alice"
+
+    response = client.get("/export/users", params={"format": "xml"})
+    assert response.status_code == 422
+
+def test_export_chunks_by_partition(setup_database):
+    """Test exports yield one chunk per fixed-size partition of rows."""
+    for i in range(5):
+        client.post(
+            "/register",
+            json={"username": f"user{i}", "email": f"user{i}@example.com", "password": "password123"}
+        )
+
+    db = TestingSessionLocal()
+    try:
+        chunks = list(export.iter_ndjson(db, export.user_export_select(), chunk_size=2))
+    finally:
+        db.close()
+    assert [chunk.count("\n") for chunk in chunks] == [2, 2, 1]
+
+def test_users_etag_changes_on_write(setup_database):
+    """Test user endpoints answer 304 until a user is updated."""
+    client.post(
+        "/register",
+        json={"username": "testuser", "email": "test@example.com", "password": "testpassword123"}
+    )
+    token = client.post(
+        "/login", json={"username": "testuser", "password": "testpassword123"}
+    ).json()["access_token"]
+    auth = {"Authorization": f"Bearer {token}"}
+
+    etags = {}
+    for path, headers in (("/users", {}), ("/users/1", {}), ("/users/me", auth)):
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200
+        etags[path] = response.headers["ETag"]
+        response = client.get(path, headers={**headers, "If-None-Match": etags[path]})
+        assert response.status_code == 304
+
+    response = client.put("/users/1", params={"reputation": 5})
+    assert response.status_code == 200
+
+    for path, headers in (("/users", {}), ("/users/1", {}), ("/users/me", auth)):
+        response = client.get(path, headers={**headers, "If-None-Match": etags[path]})
+        assert response.status_code == 200
+        assert response.json() != []
+
+def test_current_user_etag_follows_the_returned_fields(setup_database):
+    """Test a stale cached principal is never stored by clients under a fresh ETag."""
+    client.post(
+        "/register",
+        json={"username": "testuser", "email": "test@example.com", "password": "testpassword123"}
+    )
+    token = client.post(
+        "/login", json={"username": "testuser", "password": "testpassword123"}
+    ).json()["access_token"]
+    auth = {"Authorization": f"Bearer {token}"}
+    etag = client.get("/users/me", headers=auth).headers["ETag"]
+
+    # Another worker changes the email; this worker's principal cache is not invalidated
+    db = TestingSessionLocal()
+    try:
+        db.execute(update(User).where(User.id == 1).values(email="new@example.com"))
+        versioning.bump_version(db, versioning.USERS)
+        db.commit()
+    finally:
+        db.close()
+    response = client.get("/users/me", headers={**auth, "If-None-Match": etag})
+    assert response.status_code == 304
+    etag = response.headers["ETag"]
+
+    # Once the cached principal expires the new email is served under a new ETag
+    principals.cache.clear()
+    response = client.get("/users/me", headers={**auth, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["email"] == "new@example.com"
+    assert response.headers["ETag"] != etag
+
+def test_last_modified_only_once_its_second_has_passed(setup_database):
+    """Test If-Modified-Since never hides a write made later in the same second."""
+    def register(name):
+        client.post(
+            "/register",
+            json={"username": name, "email": f"{name}@example.com", "password": "password123"}
+        )
+
+    def set_users_updated_at(when):
+        db = TestingSessionLocal()
+        try:
+            db.execute(
+                update(TableVersion).where(TableVersion.name == versioning.USERS).values(updated_at=when)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    register("alice")
+    # The last change is in the current second, so only the ETag is offered
+    set_users_updated_at(datetime.now(timezone.utc))
+    response = client.get("/users")
+    assert "ETag" in response.headers and "Last-Modified" not in response.headers
+
+    set_users_updated_at(datetime.now(timezone.utc) - timedelta(seconds=5))
+    response = client.get("/users")
+    last_modified = response.headers["Last-Modified"]
+    response = client.get("/users", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    register("bob")
+    response = client.get("/users", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+def test_current_user_served_from_principal_cache(setup_database):
+    """Test repeat authenticated calls skip the user lookup until the user changes."""
+    client.post(
+        "/register",
+        json={"username": "testuser", "email": "test@example.com", "password": "testpassword123"}
+    )
+    token = client.post(
+        "/login", json={"username": "testuser", "password": "testpassword123"}
+    ).json()["access_token"]
+    auth = {"Authorization": f"Bearer {token}"}
+
+    # First call resolves the user; later calls are answered without queries
+    with assert_num_queries(1):
+        client.get("/users/me", headers=auth)
+    with assert_num_queries(0):
+        response = client.get("/users/me", headers=auth)
+    assert response.json()["reputation"] == 0
+
+    client.put("/users/1", params={"reputation": 3})
+    response = client.get("/users/me", headers=auth)
+    assert response.json()["reputation"] == 3
+
+    client.delete("/users/1")
+    response = client.get("/users/me", headers=auth)
+    assert response.status_code == 401
+
+    metrics = client.get("/metrics").json()["principal_cache"]
+    assert metrics["hits"] >= 1
+    assert metrics["invalidations"] >= 1
+
+def test_principal_cache_eviction_and_expiry():
+    """Test the principal cache evicts least recently used and expired tokens."""
+    cache = PrincipalCache(max_entries=2, ttl=60)
+    principals = [Principal(i, f"user{i}", f"user{i}@example.com", 0, datetime.now()) for i in range(3)]
+    cache.put("a", principals[0])
+    cache.put("b", principals[1])
+    assert cache.get("a") == principals[0]  # "b" is now least recently used
+    cache.put("c", principals[2])
+    assert cache.get("b") is None
+    assert cache.get("c") == principals[2]
+    assert cache.evictions == 1
+
+    # Entries never outlive the token they were issued for
+    cache.put("expired", principals[0], datetime.now(timezone.utc) - timedelta(seconds=1))
+    assert cache.get("expired") is None
+
+def test_principal_cache_skips_entries_invalidated_during_lookup(setup_database):
+    """Test a user invalidated while their lookup runs is not cached afterwards."""
+    client.post(
+        "/register",
+        json={"username": "testuser", "email": "test@example.com", "password": "testpassword123"}
+    )
+    token = client.post(
+        "/login", json={"username": "testuser", "password": "testpassword123"}
+    ).json()["access_token"]
+    principals.cache.clear()
+
+    db = TestingSessionLocal()
+
+    def delete_commits_during_read(orm_execute_state):
+        # Stands in for DELETE /users/1 committing between the read and cache.put
+        principals.cache.invalidate_user(1)
+
+    event.listen(db, "do_orm_execute", delete_commits_during_read)
+    try:
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        assert auth.get_current_user(credentials, db).username == "testuser"
+    finally:
+        event.remove(db, "do_orm_execute", delete_commits_during_read)
+        db.close()
+    assert principals.cache.get(token) is None
+    assert principals.cache.metrics()["stale_puts"] == 1
+
+    # Without an invalidation in between the principal is cached as usual
+    db = TestingSessionLocal()
+    try:
+        auth.get_current_user(credentials, db)
+    finally:
+        db.close()
+    assert principals.cache.get(token).username == "testuser"
+
+def test_create_users_batch(setup_database, monkeypatch):
+    """Test admins can register many users at once with per-item results."""
+    monkeypatch.setattr(auth, "ADMIN_USER_IDS", frozenset({1}))
+    client.post(
+        "/register",
+        json={"username": "admin", "email": "admin@example.com", "password": "adminpassword"}
+    )
+    token = client.post(
+        "/login", json={"username": "admin", "password": "adminpassword"}
+    ).json()["access_token"]
+
+    items = [
+        {"username": "alice", "email": "alice@example.com", "password": "password123"},
+        {"username": "admin", "email": "other@example.com", "password": "password123"},
+        {"username": "bob", "email": "bob@example.com", "password": "password456"},
+        {"username": "alice", "email": "alice2@example.com", "password": "password123"},
+    ]
+    response = client.post(
+        "/users/batch", json={"items": items}, headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 2
+    assert [r["status"] for r in data["results"]] == ["created", "error", "created", "error"]
+
+    response = client.post("/login", json={"username": "bob", "password": "password456"})
+    assert response.status_code == 200
+    assert response.json()["user"]["id"] == data["results"][2]["id"]
+
+def test_create_users_batch_requires_admin(setup_database):
+    """Test non-admin users cannot bulk register accounts."""
+    client.post(
+        "/register",
+        json={"username": "testuser", "email": "test@example.com", "password": "testpassword123"}
+    )
+    token = client.post(
+        "/login", json={"username": "testuser", "password": "testpassword123"}
+    ).json()["access_token"]
+
+    response = client.post(
+        "/users/batch",
+        json={"items": [{"username": "x", "email": "x@example.com", "password": "password"}]},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 403
+
+def test_admin_rights_do_not_follow_a_username(setup_database, monkeypatch):
+    """Test taking over the admin's username does not grant admin rights."""
+    monkeypatch.setattr(auth, "ADMIN_USER_IDS", frozenset({1}))
+    for name in ("admin", "mallory"):
+        client.post(
+            "/register",
+            json={"username": name, "email": f"{name}@example.com", "password": "password123"}
+        )
+    client.put("/users/1", params={"username": "former-admin"})
+    client.put("/users/2", params={"username": "admin"})
+    token = client.post(
+        "/login", json={"username": "admin", "password": "password123"}
+    ).json()["access_token"]
+    response = client.post(
+        "/users/1/reputation", json={"delta": 100}, headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 403
+
+    # The renamed admin keeps their rights
+    token = client.post(
+        "/login", json={"username": "former-admin", "password": "password123"}
+    ).json()["access_token"]
+    response = client.post(
+        "/users/2/reputation", json={"delta": -1}, headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+
+def test_reputation_delta_ledger(setup_database, monkeypatch):
+    """Test reputation deltas are applied atomically and recorded in the ledger."""
+    monkeypatch.setattr(auth, "ADMIN_USER_IDS", frozenset({1}))
+    for name in ("admin", "helper"):
+        client.post(
+            "/register",
+            json={"username": name, "email": f"{name}@example.com", "password": "password123"}
+        )
+    token = client.post(
+        "/login", json={"username": "admin", "password": "password123"}
+    ).json()["access_token"]
+    auth_header = {"Authorization": f"Bearer {token}"}
+
+    for delta in (5, 3, -2):
+        response = client.post(
+            "/users/2/reputation", json={"delta": delta, "reason": "helped"}, headers=auth_header
+        )
+        assert response.status_code == 200
+    assert response.json()["reputation"] == 6
+
+    # Absolute updates are logged as the difference
+    client.put("/users/2", params={"reputation": 10})
+
+    db = TestingSessionLocal()
+    try:
+        events = db.query(ReputationEvent).filter(ReputationEvent.user_id == 2).all()
+        assert [e.delta for e in events] == [5, 3, -2, 4]
+        assert events[0].actor_id == 1
+        assert sum(e.delta for e in events) == db.get(User, 2).reputation
+    finally:
+        db.close()
+
+    response = client.post("/users/99/reputation", json={"delta": 1}, headers=auth_header)
+    assert response.status_code == 404
+
+def test_absolute_reputation_set_sees_concurrent_delta(setup_database):
+    """Test PUT reputation logs its difference from the value at write time, not a stale read."""
+    client.post(
+        "/register",
+        json={"username": "helper", "email": "helper@example.com", "password": "password123"}
+    )
+    put_session = TestingSessionLocal()
+    delta_session = TestingSessionLocal()
+    try:
+        # PUT /users/1 has loaded the user...
+        user = put_session.get(User, 1)
+        assert user.reputation == 0
+        # ...when POST /users/1/reputation commits a delta
+        assert apply_delta(delta_session, 1, 5, "helped")
+        delta_session.commit()
+
+        record_adjustment(put_session, 1, 10)
+        put_session.commit()
+
+        events = put_session.query(ReputationEvent).filter(ReputationEvent.user_id == 1).all()
+        assert [e.delta for e in events] == [5, 5]
+        assert put_session.get(User, 1).reputation == 10
+    finally:
+        put_session.close()
+        delta_session.close()
+
+def test_reputation_compaction_preserves_sums(setup_database):
+    """Test compaction folds old events per user without changing their sums."""
+    db = TestingSessionLocal()
+    try:
+        db.add_all([
+            User(username="alice", email="alice@example.com", password_hash="x"),
+            User(username="bob", email="bob@example.com", password_hash="x"),
+        ])
+        db.flush()
+        old = datetime.now(timezone.utc) - timedelta(days=60)
+        for user_id, deltas in ((1, [1, 2, 3]), (2, [7])):
+            for delta in deltas:
+                db.add(ReputationEvent(user_id=user_id, delta=delta, created_at=old))
+        db.add(ReputationEvent(user_id=1, delta=10))  # recent, kept as is
+        db.commit()
+
+        removed = compact_events(db, timedelta(days=30))
+        db.commit()
+
+        assert removed == 3
+        events = db.query(ReputationEvent).order_by(ReputationEvent.user_id, ReputationEvent.id).all()
+        assert [(e.user_id, e.delta, e.reason) for e in events] == [
+            (1, 10, None), (1, 6, "compacted"), (2, 7, None)
+        ]
+    finally:
+        db.close()
+
+def test_leaderboard_and_rank(setup_database):
+    """Test the leaderboard order and ranks, with ties sharing a rank."""
+    for name in ("alice", "bob", "carol", "dave"):
+        client.post(
+            "/register",
+            json={"username": name, "email": f"{name}@example.com", "password": "password123"}
+        )
+    # The first lookup loads the index; later writes keep it current
+    assert client.get("/users/1/rank").json()["rank"] == 1
+    for user_id, reputation in ((1, 5), (2, 9), (3, 5)):
+        client.put(f"/users/{user_id}", params={"reputation": reputation})
+
+    response = client.get("/users/leaderboard", params={"limit": 3})
+    assert response.status_code == 200
+    assert [(e["username"], e["rank"]) for e in response.json()] == [
+        ("bob", 1), ("alice", 2), ("carol", 2)
+    ]
+
+    # No rebuild needed: a lookup only reads the version
+    with assert_num_queries(1):
+        response = client.get("/users/3/rank")
+    assert response.json() == {"user_id": 3, "reputation": 5, "rank": 2, "total_users": 4}
+    assert client.get("/users/4/rank").json()["rank"] == 4
+
+    client.delete("/users/2")
+    assert client.get("/users/1/rank").json() == {
+        "user_id": 1, "reputation": 5, "rank": 1, "total_users": 3
+    }
+    assert client.get("/users/2/rank").status_code == 404
+
+def test_rank_index_rebuilds_after_external_write(setup_database):
+    """Test a write the index never saw, e.g. from another worker, triggers a rebuild."""
+    for name in ("alice", "bob"):
+        client.post(
+            "/register",
+            json={"username": name, "email": f"{name}@example.com", "password": "password123"}
+        )
+    assert client.get("/users/2/rank").json()["rank"] == 1
+
+    db = TestingSessionLocal()
+    try:
+        db.get(User, 2).reputation = 3
+        versioning.bump_version(db, versioning.USERS)
+        db.commit()
+    finally:
+        db.close()
+
+    rebuilds = leaderboard.rank_index.rebuilds
+    assert client.get("/users/2/rank").json()["rank"] == 1
+    assert client.get("/users/1/rank").json()["rank"] == 2
+    assert leaderboard.rank_index.rebuilds == rebuilds + 1
+
+def test_get_users_pages_sorts_and_filters(setup_database):
+    """Test /users pages by id or reputation and filters by username prefix."""
+    for name in ("ann", "andy", "bob", "anna_b"):
+        client.post(
+            "/register",
+            json={"username": name, "email": f"{name}@example.com", "password": "password123"}
+        )
+    for user_id, reputation in ((1, 3), (2, 7), (3, 7), (4, 1)):
+        client.put(f"/users/{user_id}", params={"reputation": reputation})
+
+    def walk(**params):
+        names, cursor = [], None
+        while True:
+            page_params = dict(params, limit=2)
+            if cursor:
+                page_params["cursor"] = cursor
+            response = client.get("/users", params=page_params)
+            assert response.status_code == 200
+            names.extend(u["username"] for u in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return names
+
+    assert walk() == ["ann", "andy", "bob", "anna_b"]
+    assert walk(sort="reputation") == ["andy", "bob", "ann", "anna_b"]
+    assert walk(q="an", sort="reputation") == ["andy", "ann", "anna_b"]
+    # The prefix is matched literally, so "_" is not a wildcard
+    assert walk(q="anna_") == ["anna_b"]
+    # Sparse fieldsets still page correctly by reputation
+    assert walk(sort="reputation", fields="username") == ["andy", "bob", "ann", "anna_b"]
+
+    response = client.get("/users", params={"sort": "reputation", "cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+def test_user_fieldsets(setup_database):
+    """Test fields= on /users and /users/{user_id} returns only the chosen fields."""
+    client.post(
+        "/register",
+        json={"username": "ann", "email": "ann@example.com", "password": "password123"}
+    )
+    assert client.get("/users", params={"fields": "username,id"}).json() == [{"id": 1, "username": "ann"}]
+    response = client.get("/users/1", params={"fields": "reputation"})
+    assert response.json() == {"reputation": 0}
+    assert response.headers["ETag"] != client.get("/users/1").headers["ETag"]
+    assert client.get("/users/1", params={"fields": "email"}).json() == {"email": "ann@example.com"}
+    assert client.get("/users/2", params={"fields": "email"}).status_code == 404
+    assert client.get("/users/1", params={"fields": "password_hash"}).status_code == 400
+    assert client.get("/users", params={"fields": "creator.username"}).status_code == 400
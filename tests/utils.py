@@ -0,0 +1,33 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Helpers for asserting how many SQL statements an endpoint issues, so N+1
+# query regressions fail the test suite.
+
+@contextmanager
+def count_queries(engine=Engine):
+    """Collect every SQL statement executed inside the block.
+
+    Listens on all engines by default, since test modules override get_db
+    with their own engine.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+@contextmanager
+def assert_num_queries(expected, engine=Engine):
+    """Fail if the block executes a number of statements other than expected."""
+    with count_queries(engine) as statements:
+        yield statements
+    assert len(statements) == expected, (
+        f"Expected {expected} SQL statements, got {len(statements)}:\n" + "\n".join(statements)
+    )
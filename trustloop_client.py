@@ -0,0 +1,114 @@
+import time
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Shared HTTP client for the Streamlit front end.
+# All calls go through one keep-alive requests.Session, so reruns reuse open
+# connections instead of opening a new one per call. GET responses are cached
+# per browser session (and therefore per user) for CACHE_TTL seconds; after
+# that they are revalidated with If-None-Match, and a 304 reuses the cached
+# body. Writes drop the cached paths they affect.
+
+API_URL = "http://localhost:8000"
+
+# Seconds a cached GET is served without asking the API
+CACHE_TTL = 30
+
+# Cached GETs kept per browser session; the least recently fetched go first
+CACHE_MAX_ENTRIES = 64
+
+# Connections kept open to the API
+POOL_SIZE = 10
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Keep-alive session shared by every script run and browser session."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class CachedResponse:
+    """The parts of a requests.Response the pages use, served from the cache."""
+
+    def __init__(self, status_code, data, headers):
+        self.status_code = status_code
+        self.headers = headers
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+def auth_headers() -> dict:
+    token = st.session_state.get("access_token")
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+
+def _cache() -> dict:
+    return st.session_state.setdefault("_api_cache", {})
+
+
+def get(path, params=None, auth=False, ttl=CACHE_TTL):
+    """GET path, answering from the cache while fresh and revalidating once stale."""
+    headers = auth_headers() if auth else {}
+    key = (path, tuple(sorted((params or {}).items())), headers.get("Authorization"))
+    cache = _cache()
+    entry = cache.get(key)
+    if entry is not None and time.monotonic() - entry["fetched_at"] < ttl:
+        return entry["response"]
+    if entry is not None and entry["etag"]:
+        headers = {**headers, "If-None-Match": entry["etag"]}
+    resp = get_session().get(f"{API_URL}{path}", params=params, headers=headers)
+    if resp.status_code == 304 and entry is not None:
+        entry["fetched_at"] = time.monotonic()
+        return entry["response"]
+    if resp.status_code != 200:
+        cache.pop(key, None)
+        return resp
+    cached = CachedResponse(resp.status_code, resp.json(), CaseInsensitiveDict(resp.headers))
+    cache[key] = {"response": cached, "etag": resp.headers.get("ETag"), "fetched_at": time.monotonic()}
+    while len(cache) > CACHE_MAX_ENTRIES:
+        del cache[min(cache, key=lambda k: cache[k]["fetched_at"])]
+    return cached
+
+
+def invalidate(*prefixes):
+    """Drop cached GETs whose path starts with any prefix; no prefixes drops everything."""
+    cache = _cache()
+    for key in list(cache):
+        if not prefixes or key[0].startswith(prefixes):
+            del cache[key]
+
+
+def _write(method, path, invalidates, auth, **kwargs):
+    headers = auth_headers() if auth else {}
+    resp = get_session().request(method, f"{API_URL}{path}", headers=headers, **kwargs)
+    if resp.status_code < 400 and invalidates:
+        invalidate(*invalidates)
+    return resp
+
+
+def post(path, invalidates=(), auth=False, **kwargs):
+    """POST path and drop the cached paths it changes."""
+    return _write("POST", path, invalidates, auth, **kwargs)
+
+
+def put(path, invalidates=(), auth=False, **kwargs):
+    """PUT path and drop the cached paths it changes."""
+    return _write("PUT", path, invalidates, auth, **kwargs)
+
+
+def patch(path, invalidates=(), auth=False, **kwargs):
+    """PATCH path and drop the cached paths it changes."""
+    return _write("PATCH", path, invalidates, auth, **kwargs)
+
+
+def delete(path, invalidates=(), auth=False, **kwargs):
+    """DELETE path and drop the cached paths it changes."""
+    return _write("DELETE", path, invalidates, auth, **kwargs)
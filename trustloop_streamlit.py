@@ -1,19 +1,33 @@
 import streamlit as st
-import requests
+import trustloop_client as api
 import pandas as pd
 import plotly.express as px
 from datetime import datetime
 
-API_URL = "http://localhost:8000"
+# Cached paths that change when a user is updated or deleted
+USER_PATHS = ("/users", "/requests", "/stats")
+
+# Rows fetched per table window
+PAGE_SIZE = 25
+
+# Newest requests shown on Home and the Dashboard
+RECENT_REQUESTS = 100
+
+# Help request statuses, in lifecycle order (see app/request_status.py)
+REQUEST_STATUSES = ["open", "in_progress", "helped", "closed"]
+
+# Next windows to fetch once the page has rendered, filled in by windowed_table
+_prefetch = []
 
 # --- Session State for Auth ---
 def is_logged_in():
     return "access_token" in st.session_state and st.session_state.get("access_token")
 
 def login(username, password):
-    resp = requests.post(f"{API_URL}/login", json={"username": username, "password": password})
+    resp = api.post("/login", json={"username": username, "password": password})
     if resp.status_code == 200:
         data = resp.json()
+        api.invalidate()
         st.session_state["access_token"] = data["access_token"]
         st.session_state["user"] = data["user"]
         return True, "Login successful!"
@@ -21,7 +35,11 @@ def login(username, password):
         return False, resp.json().get("detail", "Login failed.")
 
 def register(username, email, password):
-    resp = requests.post(f"{API_URL}/register", json={"username": username, "email": email, "password": password})
+    resp = api.post(
+        "/register",
+        json={"username": username, "email": email, "password": password},
+        invalidates=("/users", "/stats"),
+    )
     if resp.status_code == 201:
         return True, "Registration successful! Please log in."
     else:
@@ -29,9 +47,8 @@ def register(username, email, password):
 def get_profile():
     if not is_logged_in():
         return None
-    headers = {"Authorization": f"Bearer {st.session_state['access_token']}"}
     try:
-        resp = requests.get(f"{API_URL}/users/me", headers=headers)
+        resp = api.get("/users/me", auth=True)
         if resp.status_code == 200:
             return resp.json()
         elif resp.status_code == 401:
@@ -41,25 +58,134 @@ def get_profile():
         return None
     return None
 
+def get_summary():
+    try:
+        resp = api.get("/users/me/summary", auth=True)
+        if resp.status_code == 200:
+            return resp.json()
+    except Exception as e:
+        st.error(f"Error fetching your summary: {e}")
+    return None
+
 def get_help_requests():
+    """The newest help requests, newest first."""
     try:
-        resp = requests.get(f"{API_URL}/requests")
+        resp = api.get("/requests", params={"order": "desc", "limit": RECENT_REQUESTS})
         if resp.status_code == 200:
             return resp.json()
     except Exception as e:
         st.error(f"Error fetching help requests: {e}")
     return []
 
+def get_stats():
+    try:
+        resp = api.get("/stats")
+        if resp.status_code == 200:
+            return resp.json()
+    except Exception as e:
+        st.error(f"Error fetching statistics: {e}")
+    return None
+
+def requests_by_user_df(stats):
+    return pd.DataFrame(
+        [{"User": u["username"], "Requests": u["count"]} for u in stats["requests_by_user"]]
+    )
+
+def requests_by_status_df(stats):
+    return pd.DataFrame(
+        [{"Status": name, "Count": count} for name, count in stats["requests_by_status"].items()]
+    )
+
+def windowed_table(key, path, params, to_row, next_param="cursor", next_header="X-Next-Cursor", auth=False):
+    """Show one window of a paged endpoint with Previous/Next controls.
+
+    Only the visible window is fetched; the next one is prefetched after the
+    page has rendered. Returns the items in the visible window.
+    """
+    state = st.session_state.setdefault(f"_window_{key}", {"query": None, "tokens": [None]})
+    query = (path, tuple(sorted(params.items())))
+    if state["query"] != query:
+        # A new search or sort starts again from the first window
+        state["query"] = query
+        state["tokens"] = [None]
+    page_params = dict(params, limit=PAGE_SIZE)
+    if state["tokens"][-1] is not None:
+        page_params[next_param] = state["tokens"][-1]
+    try:
+        resp = api.get(path, params=page_params, auth=auth)
+    except Exception as e:
+        st.error(f"Error fetching {path}: {e}")
+        return []
+    if resp.status_code != 200:
+        st.error(resp.json().get("detail", f"Failed to load {path}."))
+        return []
+    items = resp.json()
+    next_token = resp.headers.get(next_header)
+    if items:
+        st.dataframe(pd.DataFrame([to_row(item) for item in items]), use_container_width=True, hide_index=True)
+    else:
+        st.info("Nothing to show.")
+    previous_col, page_col, next_col = st.columns([1, 2, 1])
+    if previous_col.button("Previous", key=f"{key}_previous", disabled=len(state["tokens"]) == 1):
+        state["tokens"].pop()
+        st.rerun()
+    page_col.caption(f"Page {len(state['tokens'])}")
+    if next_col.button("Next", key=f"{key}_next", disabled=next_token is None):
+        state["tokens"].append(next_token)
+        st.rerun()
+    if next_token is not None:
+        _prefetch.append((path, dict(params, limit=PAGE_SIZE, **{next_param: next_token}), auth))
+    return items
+
+def help_request_window(key, to_row, status=None, fields=None):
+    """Searchable, sortable window over help requests, optionally only those with status.
+
+    fields limits the listed columns (see the API's fields= parameter); search
+    results always come in full.
+    """
+    search_col, sort_col = st.columns([3, 1])
+    q = search_col.text_input("Search", key=f"{key}_search").strip()
+    if q:
+        # Search results come best match first, paged by offset
+        items = windowed_table(
+            key, "/requests/search", {"q": q}, to_row,
+            next_param="offset", next_header="X-Next-Offset",
+        )
+        return [r for r in items if status is None or r["status"] == status]
+    order = sort_col.selectbox("Sort", ["Newest first", "Oldest first"], key=f"{key}_sort")
+    params = {"order": "desc" if order == "Newest first" else "asc"}
+    if status is not None:
+        params["status"] = status
+    if fields is not None:
+        params["fields"] = fields
+    return windowed_table(key, "/requests", params, to_row)
+
 def create_help_request(title, description):
     if not is_logged_in():
         return None
-    headers = {"Authorization": f"Bearer {st.session_state['access_token']}"}
     try:
-        resp = requests.post(f"{API_URL}/requests", json={"title": title, "description": description}, headers=headers)
+        resp = api.post(
+            "/requests",
+            json={"title": title, "description": description},
+            auth=True,
+            invalidates=("/requests", "/stats", "/users/me"),
+        )
         return resp
     except Exception as e:
         st.error(f"Error creating help request: {e}")
         return None
+
+def update_request_status(request_id, new_status):
+    try:
+        return api.patch(
+            f"/requests/{request_id}/status",
+            json={"status": new_status},
+            auth=True,
+            invalidates=("/requests", "/stats", "/users/me"),
+        )
+    except Exception as e:
+        st.error(f"Error updating status: {e}")
+        return None
 # --- Streamlit UI ---
 
 st.set_page_config(
@@ -83,51 +209,56 @@ choice = st.sidebar.selectbox("Navigation", menu)
 # --- Help Someone Section ---
 if choice == "Help Someone":
     st.header(":handshake: Help Someone")
-    help_requests = get_help_requests()
-    if not help_requests:
-        st.info("No help requests available.")
-    else:
-        # Only show requests not created by current user (if logged in)
-        current_user = st.session_state.get("user", {})
-        filtered_requests = [r for r in help_requests if not current_user or r["creator"]["username"] != current_user.get("username")]
-        if not filtered_requests:
-            st.info("No help requests from other users.")
-        else:
-            df = pd.DataFrame([
-                {
-                    "ID": r["id"],
-                    "Title": r["title"],
-                    "Description": r["description"],
-                    "User": r["creator"]["username"],
-                    "Created At": r["created_at"]
-                }
-                for r in filtered_requests
-            ])
-            st.dataframe(df)
-            selected_id = st.selectbox("Select a request to help", df["ID"])
-            selected_request = next((r for r in filtered_requests if r["id"] == selected_id), None)
-            if selected_request:
-                st.write(f"**Title:** {selected_request['title']}")
-                st.write(f"**Description:** {selected_request['description']}")
-                st.write(f"**Requested by:** {selected_request['creator']['username']}")
+    # Only offer requests not created by current user (if logged in)
+    current_user = st.session_state.get("user", {})
+    help_requests = help_request_window("help_someone", lambda r: {
+        "ID": r["id"],
+        "Title": r["title"],
+        "Description": r["description"],
+        "User": r["creator"]["username"],
+        "Created At": r["created_at"]
+    }, status="open", fields="id,title,description,created_at,status,creator.username")
+    filtered_requests = [r for r in help_requests if not current_user or r["creator"]["username"] != current_user.get("username")]
+    if help_requests and not filtered_requests:
+        st.info("No help requests from other users on this page.")
+    elif filtered_requests:
+        selected_id = st.selectbox("Select a request to help", [r["id"] for r in filtered_requests])
+        selected_request = next((r for r in filtered_requests if r["id"] == selected_id), None)
+        if selected_request:
+            st.write(f"**Title:** {selected_request['title']}")
+            st.write(f"**Description:** {selected_request['description']}")
+            st.write(f"**Requested by:** {selected_request['creator']['username']}")
+            if not is_logged_in():
+                st.info("Login to offer help.")
+            else:
+                message = st.text_input("Message (optional)", key=f"offer_message_{selected_id}")
                 if st.button("Help this user!"):
-                    # Simulate sending a message (in real app, would trigger notification)
-                    st.success(f"You have offered to help {selected_request['creator']['username']}! They have been notified.")
+                    try:
+                        resp = api.post(
+                            f"/requests/{selected_id}/offers",
+                            json={"message": message or None},
+                            auth=True,
+                            invalidates=(f"/requests/{selected_id}/offers",),
+                        )
+                        if resp.status_code == 201:
+                            st.success(f"You have offered to help {selected_request['creator']['username']}! They have been notified.")
+                        else:
+                            st.error(resp.json().get("detail", "Failed to send your offer."))
+                    except Exception as e:
+                        st.error(f"Error sending offer: {e}")
 
 # ...existing UI code...
 
 if choice == "User Management":
     st.header(":busts_in_silhouette: User Management")
-    users = []
-    try:
-        resp = requests.get(f"{API_URL}/users")
-        if resp.status_code == 200:
-            users = resp.json()
-    except Exception as e:
-        st.error(f"Error fetching users: {e}")
+    search_col, sort_col = st.columns([3, 1])
+    username_prefix = search_col.text_input("Username starts with", key="users_search").strip()
+    sort = sort_col.selectbox("Sort", ["id", "reputation"], key="users_sort")
+    params = {"sort": sort}
+    if username_prefix:
+        params["q"] = username_prefix
+    users = windowed_table("users", "/users", params, lambda u: u)
     if users:
-        df = pd.DataFrame(users)
-        st.dataframe(df)
         st.subheader("Edit or Delete User")
         user_ids = [u['id'] for u in users]
         selected_id = st.selectbox("Select User ID", user_ids)
@@ -148,7 +279,9 @@ if choice == "User Management":
                         params['reputation'] = int(new_reputation)
                     if params:
                         try:
-                            resp = requests.put(f"{API_URL}/users/{selected_id}", params=params)
+                            resp = api.put(
+                                f"/users/{selected_id}", params=params, invalidates=USER_PATHS
+                            )
                             if resp.status_code == 200:
                                 st.success("User updated!")
                                 st.rerun()
@@ -160,7 +293,7 @@ if choice == "User Management":
                         st.info("No changes to update.")
             if st.button("Delete User", key=f"delete_{selected_id}"):
                 try:
-                    resp = requests.delete(f"{API_URL}/users/{selected_id}")
+                    resp = api.delete(f"/users/{selected_id}", invalidates=USER_PATHS)
                     if resp.status_code == 204:
                         st.success("User deleted!")
                         st.rerun()
@@ -168,39 +301,45 @@ if choice == "User Management":
                         st.error(resp.json().get("detail", "Failed to delete user."))
                 except Exception as e:
                     st.error(f"Error deleting user: {e}")
-    else:
-        st.info("No users found.")
 
 
 if choice == "Dashboard":
     st.header(":bar_chart: Dashboard")
     help_requests = get_help_requests()
-    if help_requests:
-        # Simulate "helped" status: even IDs are helped, odd IDs are not
-        for r in help_requests:
-            r["status"] = "Helped" if r["id"] % 2 == 0 else "Unhelped"
+    stats = get_stats()
+    if help_requests and stats:
         df = pd.DataFrame([
             {
                 "Title": r["title"],
                 "User": r["creator"]["username"],
-                "Status": r["status"],
                 "Created At": r["created_at"]
             }
             for r in help_requests
         ])
         st.dataframe(df)
-        # Pie chart: Helped vs Unhelped
-        status_counts = df["Status"].value_counts().reset_index()
-        status_counts.columns = ["Status", "Count"]
-        fig = px.pie(status_counts, names="Status", values="Count", title="Helped vs Unhelped Requests")
+        st.metric("Total Requests", stats["total_requests"])
+        # Pie chart: requests by status
+        fig = px.pie(requests_by_status_df(stats), names="Status", values="Count", title="Requests by Status")
         st.plotly_chart(fig, use_container_width=True)
         # Bar chart: Requests per user
-        user_counts = df["User"].value_counts().reset_index()
-        user_counts.columns = ["User", "Requests"]
-        fig2 = px.bar(user_counts, x="User", y="Requests", title="Requests by User")
+        fig2 = px.bar(requests_by_user_df(stats), x="User", y="Requests", title="Requests by User")
         st.plotly_chart(fig2, use_container_width=True)
+        # Line chart: Requests per day
+        day_counts = pd.DataFrame(
+            [{"Day": d["day"], "Requests": d["count"]} for d in stats["requests_by_day"]]
+        )
+        fig3 = px.line(day_counts, x="Day", y="Requests", markers=True, title="Requests per Day")
+        st.plotly_chart(fig3, use_container_width=True)
     else:
         st.info("No help requests yet.")
+    # Top helpers, ranked by the API
+    try:
+        resp = api.get("/users/leaderboard", params={"limit": 10})
+        if resp.status_code == 200 and resp.json():
+            st.subheader("Top Helpers")
+            st.dataframe(pd.DataFrame(resp.json()).set_index("rank"))
+    except Exception as e:
+        st.error(f"Error fetching leaderboard: {e}")
 
 elif choice == "Home":
     st.header("Welcome to TrustLoop!")
@@ -220,10 +359,10 @@ elif choice == "Home":
         st.subheader("Recent Help Requests")
         st.dataframe(df)
         # Pie chart: requests per user
-        user_counts = df["User"].value_counts().reset_index()
-        user_counts.columns = ["User", "Requests"]
-        fig = px.pie(user_counts, names="User", values="Requests", title="Help Requests by User")
-        st.plotly_chart(fig, use_container_width=True)
+        stats = get_stats()
+        if stats:
+            fig = px.pie(requests_by_user_df(stats), names="User", values="Requests", title="Help Requests by User")
+            st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No help requests yet.")
 
@@ -258,6 +397,7 @@ elif choice == "Register":
 elif choice == "Logout":
     st.session_state.pop("access_token", None)
     st.session_state.pop("user", None)
+    api.invalidate()
     st.success("Logged out successfully.")
     st.rerun()
 
@@ -271,24 +411,52 @@ elif choice == "Profile":
             st.write(f"**Username:** {profile['username']}")
             st.write(f"**Email:** {profile['email']}")
             st.write(f"**Reputation:** {profile['reputation']}")
+            try:
+                resp = api.get(f"/users/{profile['id']}/rank")
+                if resp.status_code == 200:
+                    rank = resp.json()
+                    st.write(f"**Rank:** {rank['rank']} of {rank['total_users']}")
+            except Exception:
+                pass
             st.write(f"**Joined:** {profile['created_at']}")
-            # Pie chart: user's help requests vs others
-            help_requests = get_help_requests()
-            user_requests = [r for r in help_requests if r["creator"]["username"] == profile["username"]]
-            others = len(help_requests) - len(user_requests)
-            pie_df = pd.DataFrame({
-                "Type": ["Your Requests", "Others' Requests"],
-                "Count": [len(user_requests), others]
-            })
-            fig = px.pie(pie_df, names="Type", values="Count", title="Your Requests vs Others")
-            st.plotly_chart(fig, use_container_width=True)
-            # Bar chart: Helped vs Unhelped for this user
-            for r in user_requests:
-                r["status"] = "Helped" if r["id"] % 2 == 0 else "Unhelped"
-            status_counts = pd.Series([r["status"] for r in user_requests]).value_counts().reset_index()
-            status_counts.columns = ["Status", "Count"]
-            fig2 = px.bar(status_counts, x="Status", y="Count", title="Your Helped vs Unhelped Requests")
-            st.plotly_chart(fig2, use_container_width=True)
+            st.subheader("Your Help Requests")
+            my_requests = windowed_table("my_requests", "/users/me/requests", {}, lambda r: {
+                "ID": r["id"],
+                "Title": r["title"],
+                "Status": r["status"],
+                "Created At": r["created_at"]
+            }, auth=True)
+            if my_requests:
+                with st.form("request_status_form"):
+                    request_col, status_col = st.columns([3, 1])
+                    selected_id = request_col.selectbox("Request", [r["id"] for r in my_requests])
+                    new_status = status_col.selectbox("Status", REQUEST_STATUSES)
+                    if st.form_submit_button("Update Status"):
+                        resp = update_request_status(selected_id, new_status)
+                        if resp is not None and resp.status_code == 200:
+                            st.success("Status updated!")
+                            st.rerun()
+                        elif resp is not None:
+                            st.error(resp.json().get("detail", "Failed to update status."))
+            summary = get_summary()
+            if summary:
+                # Pie chart: user's help requests vs others
+                pie_df = pd.DataFrame({
+                    "Type": ["Your Requests", "Others' Requests"],
+                    "Count": [
+                        summary["total_requests"],
+                        summary["platform_requests"] - summary["total_requests"]
+                    ]
+                })
+                fig = px.pie(pie_df, names="Type", values="Count", title="Your Requests vs Others")
+                st.plotly_chart(fig, use_container_width=True)
+                # Bar chart: this user's requests by status
+                status_counts = pd.DataFrame(
+                    [{"Status": name, "Count": count} for name, count in summary["requests_by_status"].items()]
+                )
+                if not status_counts.empty:
+                    fig2 = px.bar(status_counts, x="Status", y="Count", title="Your Requests by Status")
+                    st.plotly_chart(fig2, use_container_width=True)
         else:
             st.error("Could not load profile. Please log in again.")
 
@@ -311,31 +479,26 @@ elif choice == "Help Requests":
                         st.error(resp.json().get("detail", "Failed to create help request."))
     else:
         st.info("Login to create a help request.")
-    help_requests = get_help_requests()
-    if help_requests:
-        for r in help_requests:
-            r["status"] = "Helped" if r["id"] % 2 == 0 else "Unhelped"
-        df = pd.DataFrame([
-            {
-                "Title": r["title"],
-                "Description": r["description"],
-                "User": r["creator"]["username"],
-                "Reputation": r["creator"]["reputation"],
-                "Status": r["status"],
-                "Created At": r["created_at"]
-            }
-            for r in help_requests
-        ])
-        st.dataframe(df)
+    help_requests = help_request_window("help_requests", lambda r: {
+        "Title": r["title"],
+        "Description": r["description"],
+        "User": r["creator"]["username"],
+        "Reputation": r["creator"]["reputation"],
+        "Status": r["status"],
+        "Created At": r["created_at"]
+    }, fields="title,description,created_at,status,creator.username,creator.reputation")
+    stats = get_stats()
+    if help_requests and stats:
         # Bar chart: requests per user
-        user_counts = df["User"].value_counts().reset_index()
-        user_counts.columns = ["User", "Requests"]
-        fig = px.bar(user_counts, x="User", y="Requests", title="Help Requests by User")
+        fig = px.bar(requests_by_user_df(stats), x="User", y="Requests", title="Help Requests by User")
         st.plotly_chart(fig, use_container_width=True)
-        # Pie chart: Helped vs Unhelped
-        status_counts = df["Status"].value_counts().reset_index()
-        status_counts.columns = ["Status", "Count"]
-        fig2 = px.pie(status_counts, names="Status", values="Count", title="Helped vs Unhelped Requests")
+        # Pie chart: requests by status
+        fig2 = px.pie(requests_by_status_df(stats), names="Status", values="Count", title="Requests by Status")
         st.plotly_chart(fig2, use_container_width=True)
-    else:
-        st.info("No help requests yet.")
+
+# Warm the cache with the next window of every table shown above
+for path, params, auth in _prefetch:
+    try:
+        api.get(path, params=params, auth=auth)
+    except Exception:
+        pass
@@ -1,18 +1,26 @@
 import streamlit as st
-import requests
+import trustloop_client as api
 import pandas as pd
 import plotly.express as px
 from datetime import datetime
 
-API_URL = "http://localhost:8000"
+# Cached paths that change when a user is updated or deleted
+USER_PATHS = ("/users", "/requests", "/stats")
+
+# Help requests shown, newest first
+RECENT_REQUESTS = 100
+
+# Users fetched per call while paging through GET /users (the API's maximum)
+USER_PAGE_SIZE = 1000
 
 def is_logged_in():
     return "access_token" in st.session_state and st.session_state.get("access_token")
 
 def login(username, password):
-    resp = requests.post(f"{API_URL}/login", json={"username": username, "password": password})
+    resp = api.post("/login", json={"username": username, "password": password})
     if resp.status_code == 200:
         data = resp.json()
+        api.invalidate()
         st.session_state["access_token"] = data["access_token"]
         st.session_state["user"] = data["user"]
         return True, "Login successful!"
@@ -20,7 +28,11 @@ def login(username, password):
         return False, resp.json().get("detail", "Login failed.")
 
 def register(username, email, password):
-    resp = requests.post(f"{API_URL}/register", json={"username": username, "email": email, "password": password})
+    resp = api.post(
+        "/register",
+        json={"username": username, "email": email, "password": password},
+        invalidates=("/users", "/stats"),
+    )
     if resp.status_code == 201:
         return True, "Registration successful! Please log in."
     else:
@@ -29,9 +41,8 @@ def register(username, email, password):
 def get_profile():
     if not is_logged_in():
         return None
-    headers = {"Authorization": f"Bearer {st.session_state['access_token']}"}
     try:
-        resp = requests.get(f"{API_URL}/users/me", headers=headers)
+        resp = api.get("/users/me", auth=True)
         if resp.status_code == 200:
             return resp.json()
         elif resp.status_code == 401:
@@ -43,8 +54,9 @@ def get_profile():
     return None
 
 def get_help_requests():
+    """The newest help requests, newest first."""
     try:
-        resp = requests.get(f"{API_URL}/requests")
+        resp = api.get("/requests", params={"order": "desc", "limit": RECENT_REQUESTS})
         if resp.status_code == 200:
             return resp.json()
     except Exception as e:
@@ -54,26 +66,39 @@ def get_help_requests():
 def create_help_request(title, description):
     if not is_logged_in():
         return None
-    headers = {"Authorization": f"Bearer {st.session_state['access_token']}"}
     try:
-        resp = requests.post(f"{API_URL}/requests", json={"title": title, "description": description}, headers=headers)
+        resp = api.post(
+            "/requests",
+            json={"title": title, "description": description},
+            auth=True,
+            invalidates=("/requests", "/stats"),
+        )
         return resp
     except Exception as e:
         st.error(f"Error creating help request: {e}")
         return None
 
 def get_all_users():
+    """Every user, following X-Next-Cursor through GET /users."""
+    users = []
+    params = {"limit": USER_PAGE_SIZE}
     try:
-        resp = requests.get(f"{API_URL}/users")
-        if resp.status_code == 200:
-            return resp.json()
+        while True:
+            resp = api.get("/users", params=params)
+            if resp.status_code != 200:
+                break
+            users.extend(resp.json())
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params = {"limit": USER_PAGE_SIZE, "cursor": cursor}
     except Exception as e:
         st.error(f"Error fetching users: {e}")
-    return []
+    return users
 
 def delete_user(user_id):
     try:
-        resp = requests.delete(f"{API_URL}/users/{user_id}")
+        resp = api.delete(f"/users/{user_id}", invalidates=USER_PATHS)
         return resp.status_code == 204
     except Exception as e:
         st.error(f"Error deleting user: {e}")
@@ -88,7 +113,7 @@ def update_user(user_id, username=None, email=None, reputation=None):
     if reputation is not None:
         data["reputation"] = reputation
     try:
-        resp = requests.put(f"{API_URL}/users/{user_id}", params=data)
+        resp = api.put(f"/users/{user_id}", params=data, invalidates=USER_PATHS)
         if resp.status_code == 200:
             return resp.json()
         else: